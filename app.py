@@ -1,390 +1,575 @@
 # app.py - MULTIPLAYER WITH ADVANCED TIMER SYSTEM
 # CRITICAL: Single-player mode fully preserved and working
-from flask import Flask, render_template, jsonify, request
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask import Flask, Response, g, render_template, jsonify, request, session
+from flask_socketio import SocketIO, disconnect, emit, join_room, leave_room
+import functools
+import os
 import random
+import secrets
 import string
-import threading
 import time
 
+import client_json
+from board_generator import BoardPool, create_board_executor, shutdown_executor
+from board_geometry import GRID_SIZE, cell_index, index_to_coords, is_connected_path
+from boards import (LETTER_SCORES, MULTIPLAYER_LETTERS, SINGLE_PLAYER_LETTERS, calculate_score_with_multipliers,
+                    deal_multiplayer_letters, deal_single_player_tiles, words)
+from game_store import MemoryGameStore, pack_game_state, unpack_game_state
+from broadcast import RoomBroadcaster
+from client_json import RawJSON
+from definitions import create_definition_service
+from event_log import create_event_log
+from logs import get_logger
+from path_index import BoardPathCache
+from reaper import RoomReaper
+from ratelimit import ADMIT, DISCONNECT, RATE_LIMITS, EventRateLimiter, parse_budgets
+from metrics import MetricsRegistry
+from models import Player, Room, RoundState, Settings, Submission, TurnState, rebind_player, to_client
+from room_store import create_room_store
+from scheduler import TimerScheduler
+from snapshots import create_room_snapshotter
+from solver import SolverCache, best_word, subtree_info
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'spellcast-multiplayer-secret-key-2024'
 
-# Initialize SocketIO with eventlet for production compatibility
-socketio = SocketIO(app, cors_allowed_origins="*")
+# SCALE-OUT: with SPELLCAST_REDIS_URL set, rooms live in Redis and Socket.IO
+# fans room emits out through Redis pub/sub, so several workers (or nodes) can
+# serve the same rooms. Without it everything stays in this process.
+REDIS_URL = os.environ.get('SPELLCAST_REDIS_URL')
 
-# ===== MULTIPLAYER STATE (Phase 1 + Timer System) =====
-game_rooms = {}  # Room code -> room data
-player_sessions = {}  # Session ID -> player data
-timer_threads = {}  # Room code -> timer thread tracking
-game_rooms_lock = threading.Lock()  # CRITICAL: Prevent race conditions
+# Initialize SocketIO with eventlet for production compatibility. Packets are
+# encoded by client_json so rooms go out as their cached JSON (see serialize_room)
+socketio = SocketIO(app, cors_allowed_origins="*", message_queue=REDIS_URL, json=client_json)
 
-# ===== SINGLE PLAYER STATE (PRESERVED) =====
-game_state = {}
+# ===== MULTIPLAYER STATE (Phase 1 + Timer System) =====
+room_store = create_room_store(REDIS_URL)  # Room code -> room data (see room_store.py)
+player_sessions = {}  # Session ID -> player data (a socket stays on one worker)
+timer_scheduler = TimerScheduler()  # Every room timer as a keyed deadline (key = room code)
+room_events = create_event_log()  # Append-only log of everything rooms do (see event_log.py)
+room_snapshots = create_room_snapshotter(room_store)  # Periodic crash-safe copy of every room (see snapshots.py)
+
+# Room-wide events are queued and flushed once per frame window (see broadcast.py)
+BROADCAST_WINDOW_SECONDS = 0.03
+broadcaster = RoomBroadcaster(socketio, timer_scheduler, BROADCAST_WINDOW_SECONDS)
+
+def merge_tile_swaps(older, newer):
+    """Fold several tile_swapped payloads into one: every swap in order, spanning both versions"""
+    swaps = older.get('swaps') or [{k: older[k] for k in ('position', 'old_letter', 'new_letter')}]
+    merged = dict(newer)
+    merged['swaps'] = swaps + [{k: newer[k] for k in ('position', 'old_letter', 'new_letter')}]
+    merged['base_version'] = older['base_version']
+    return merged
+
+# Only the newest highlight per dragging player matters; swaps merge into one board update
+broadcaster.coalesce('opponent_tile_highlight', lambda data: data['player_id'])
+broadcaster.merge('tile_swapped', merge_tile_swaps)
+
+# Token buckets per socket and event (see ratelimit.py): over budget an event
+# is dropped (tile highlights merge), and a socket that keeps at it is cut off
+event_limiter = EventRateLimiter(parse_budgets(RATE_LIMITS), timer_scheduler)
+
+# ===== SINGLE PLAYER STATE (PER SESSION) =====
+# Each browser session's game lives in the store under the 'game_id' cookie key
+SINGLE_PLAYER_MAX_GAMES = 10000
+SINGLE_PLAYER_GAME_TTL = 2 * 3600  # Seconds since the game was last touched
+game_store = MemoryGameStore(SINGLE_PLAYER_MAX_GAMES, SINGLE_PLAYER_GAME_TTL)
+
+# ===== OBSERVABILITY =====
+# Level-gated logging off the request thread (see logs.py) and Prometheus
+# metrics served at /metrics (see metrics.py)
+timer_log = get_logger('TIMER')
+room_log = get_logger('MULTIPLAYER')
+game_log = get_logger('GAME')
+swap_log = get_logger('SWAP')
+validation_log = get_logger('VALIDATION')
+turn_log = get_logger('TURNBASED')
+
+metrics = MetricsRegistry()
+socket_latency = metrics.histogram('spellcast_socketio_event_seconds',
+                                   'Socket.IO handler latency (its _count is the number of calls)', ('event',))
+socket_errors = metrics.counter('spellcast_socketio_event_errors_total',
+                                'Socket.IO handlers that raised', ('event',))
+http_latency = metrics.histogram('spellcast_http_request_seconds',
+                                 'HTTP request latency (its _count is the number of requests)', ('route', 'method'))
+http_responses = metrics.counter('spellcast_http_responses_total', 'HTTP responses', ('route', 'method', 'status'))
+rooms_reaped = metrics.counter('spellcast_rooms_reaped_total', 'Rooms closed by the reaper', ('reason',))
+word_rejections = metrics.counter('spellcast_word_rejections_total',
+                                  'Word submissions rejected by validation', ('event', 'reason'))
+rate_limited = metrics.counter('spellcast_socketio_rate_limited_total',
+                               'Socket.IO events refused by the rate limiter', ('event', 'action'))
+definition_lookups = metrics.counter('spellcast_definition_lookups_total',
+                                     'Definition lookups by where the answer came from', ('source',))
+room_serializations = metrics.counter('spellcast_room_serializations_total',
+                                      'Rooms sent to clients, by whether their cached JSON was current', ('cache',))
+metrics.gauge('spellcast_rooms', 'Live multiplayer rooms', lambda: len(room_store))
+metrics.gauge('spellcast_socket_sessions', 'Connected Socket.IO sessions on this worker', lambda: len(player_sessions))
+metrics.gauge('spellcast_single_player_games', 'Single-player games held in memory', lambda: len(game_store))
+metrics.gauge('spellcast_timer_tasks', 'Room timers pending in the scheduler', lambda: timer_scheduler.pending())
+metrics.gauge('spellcast_board_pool_single_player', 'Ready single-player boards', lambda: len(single_player_boards))
+metrics.gauge('spellcast_board_pool_multiplayer', 'Ready multiplayer boards', lambda: len(multiplayer_boards))
+metrics.gauge('spellcast_path_cache_boards', 'Boards with cached word paths', lambda: len(board_paths))
+metrics.gauge('spellcast_room_snapshot_seconds', 'Time the last room snapshot took',
+              lambda: room_snapshots.last_duration if room_snapshots else 0)
+metrics.gauge('spellcast_reaper_reclaimed_bytes', 'Approximate memory freed by the reaper since start',
+              lambda: room_reaper.reclaimed_bytes)
+metrics.gauge('spellcast_reaper_single_player_games', 'Expired single-player games dropped by the reaper',
+              lambda: room_reaper.reaped.get('single_player', 0))
+metrics.gauge('spellcast_definitions_cached', 'Definitions held in memory', lambda: len(word_definitions))
+metrics.gauge('spellcast_hint_solvers', 'Single-player boards with a maintained solution', lambda: len(hint_solvers))
+
+def socket_event(event):
+    """socketio.on(event) behind the rate limiter, recording the handler's latency and errors under that event"""
+    def decorator(handler):
+        arg_count = handler.__code__.co_argcount
+        limited = event not in ('connect', 'disconnect')
+        
+        @functools.wraps(handler)
+        def instrumented(*args):
+            if limited:
+                verdict = event_limiter.admit(request.sid, event, args[0] if args else None)
+                if verdict != ADMIT:
+                    rate_limited.inc(event=event, action=verdict)
+                    if verdict == DISCONNECT:
+                        room_log.warning('Disconnecting %s: kept flooding %s', request.sid, event)
+                        disconnect()
+                    return
+            start = time.perf_counter()
+            try:
+                # Flask-SocketIO passes extra args (e.g. connect auth) the handler may not take
+                return handler(*args[:arg_count])
+            except Exception:
+                socket_errors.inc(event=event)
+                raise
+            finally:
+                socket_latency.observe(time.perf_counter() - start, event=event)
+        return socketio.on(event)(instrumented)
+    return decorator
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    if 'request_start' in g:
+        http_latency.observe(time.perf_counter() - g.request_start, route=route, method=request.method)
+    http_responses.inc(route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def reject_word(event, payload):
+    """Send word_rejected to the submitting player and count it by reason"""
+    word_rejections.inc(event=event, reason=payload['reason'])
+    emit('word_rejected', payload)
 
-GRID_SIZE = 5
 MAX_ROUNDS = 5
-# Scrabble-style letter values (Phase 2 spec-compliant)
-# Legacy LETTER_SCORES maintained for single-player backward compatibility
-
-# PHASE 2 GAP #3: Proper Scrabble-style letter scores
-LETTER_VALUES = {
-    'A':1, 'B':4, 'C':5, 'D':3, 'E':1, 'F':5, 'G':3, 'H':4, 'I':1, 'J':7,
-    'K':6, 'L':3, 'M':4, 'N':2, 'O':1, 'P':4, 'Q':8, 'R':2, 'S':2, 'T':2,
-    'U':4, 'V':5, 'W':5, 'X':7, 'Y':4, 'Z':8
-}
-
-# Legacy LETTER_SCORES maintained for single-player backward compatibility (alias)
-LETTER_SCORES = LETTER_VALUES
-
-# PHASE 2 GAP #2: Proper weighted letter frequency map (English language distribution)
-FREQUENCY_MAP = {
-    'E': 127, 'T': 91, 'A': 82, 'O': 75, 'I': 70, 'N': 67, 'S': 63, 'H': 61,
-    'R': 60, 'D': 43, 'L': 40, 'U': 28, 'C': 28, 'M': 24, 'W': 24, 'F': 22,
-    'G': 20, 'Y': 20, 'P': 19, 'B': 15, 'V': 10, 'K': 8, 'X': 2, 'J': 2,
-    'Q': 1, 'Z': 1
-}
-VOWELS = "AEIOU"
-LETTER_FREQUENCIES = "E"*12+"A"*9+"I"*9+"O"*8+"N"*6+"R"*6+"T"*6+"L"*4+"S"*4+"U"*4+"D"*4+"G"*3+"B"*2+"C"*2+"M"*2+"P"*2+"F"*2+"H"*2+"V"*2+"W"*2+"Y"*2+"K"*1+"J"*1+"X"*1+"Q"*1+"Z"*1
 GEM_COSTS = {"shuffle": 1, "swap": 3, "hint": 4}
 
 def load_words():
-    with open("static/words_alpha.txt") as word_file:
-        return set(word_file.read().split())
+    # Memory-mapped DAWG compiled from static/words_alpha.txt (see dictionary.py).
+    # Shared between workers via the page cache; supports `word in english_words`.
+    return words()
 english_words = load_words()
 
+# ===== BOARD POOL =====
+# Ready boards for both modes, vetted by the solver (see board_generator.py)
+# and dealt by worker processes (recipes in boards.py), so neither / nor
+# start_game ever generates a board on the request path.
+BOARD_WORKERS = int(os.environ.get('SPELLCAST_BOARD_WORKERS', 1))  # 0 = a background thread instead
+board_executor = create_board_executor(BOARD_WORKERS)
+single_player_boards = BoardPool(deal_single_player_tiles, board_executor, name='single-player')
+multiplayer_boards = BoardPool(deal_multiplayer_letters, board_executor, name='multiplayer')
+single_player_boards.refill()
+multiplayer_boards.refill()
+
+def close_board_pools():
+    """Worker shutting down (gunicorn.conf.py): stop refilling and drop queued boards"""
+    single_player_boards.close()
+    multiplayer_boards.close()
+    shutdown_executor(board_executor)
+
+# Word -> paths per board, so repeat validations are hash lookups (see path_index.py)
+board_paths = BoardPathCache(max_boards=4096)
+
+# Each single-player game's solved board, kept current as tiles change, so a
+# hint re-searches only around the tiles replaced since the last one
+hint_solvers = SolverCache(english_words, max_solvers=256, diagonal=True)
+subtree_info(english_words)  # One pass over the dictionary; pay it at startup, not on the first hint
+
+# ===== WORD DEFINITIONS =====
+# Browsers ask /define/<word>; answers come from memory, then the local
+# definitions file, then the dictionary API (see definitions.py)
+word_definitions = create_definition_service(is_word=lambda word: word in english_words)
+
+@app.route("/define/<word>")
+def define_word(word):
+    word = word.lower()
+    if word not in english_words:  # Never spend an upstream call on a non-word
+        definition_lookups.inc(source='not_a_word')
+        return jsonify({"error": "Not a word"}), 404
+    
+    body, source = word_definitions.lookup(word)
+    definition_lookups.inc(source=source)
+    if body is None:
+        if source == 'error':
+            return jsonify({"error": "Definitions unavailable, try again"}), 503
+        return jsonify({"error": "No definition found"}), 404
+    response = Response(body, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
 # ===== MULTIPLAYER HELPER FUNCTIONS =====
 
 def generate_room_code():
     """Generate unique 6-character room code"""
     while True:
-        code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        if code not in game_rooms:
+        code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(6))
+        if not room_store.exists(code):
             return code
 
-def serialize_room(room_code):
+def serialize_room(room):
     """
-    Convert a room object to JSON-serializable format.
-    Converts Python sets to lists for Socket.IO emission.
+    The room as clients see it (see models.to_client: no seeds, seats or round
+    in progress), as its cached JSON: encoded again only if the room changed
+    since, and spliced into the packet as is.
     """
-    if room_code not in game_rooms:
+    if room is None:
         return None
-    
-    room = game_rooms[room_code]
-    
-    # Convert votes set to list
-    timer_state = room['timer_state'].copy()
-    timer_state['votes'] = list(timer_state['votes']) if isinstance(timer_state['votes'], set) else timer_state['votes']
-    
-    return {
-        'room_code': room['room_code'],
-        'host': room['host'],
-        'players': room['players'],
-        'settings': room['settings'],
-        'status': room['status'],
-        'timer_state': timer_state
-    }
+    room_serializations.inc(cache='stale' if room.dirty else 'hit')
+    return RawJSON(room.client_json())
 
-# ===== TIMER SYSTEM FUNCTIONS =====
+# ===== SEATS =====
+# Every player gets a secret seat token with room_created/room_joined (never in
+# serialize_room). A client that comes back on a new socket - after the server
+# restarted from a snapshot - sends it with 'rejoin_room' to take its seat back,
+# and models.rebind_player moves its state over. Room.remove_player gives the
+# seat up with the player.
+
+def issue_seat(room, player):
+    player.seat = secrets.token_urlsafe(16)
+    room.seats[player.seat] = player.id
+    return player.seat
 
-def start_grace_period_voting(room_code, mode):
+# ===== TIMER SYSTEM FUNCTIONS =====
+# Timers are deadlines in the shared timer_scheduler, not per-room sleep loops.
+# The server only emits when a timer starts or fires; clients count down
+# locally from the 'duration' sent in the *_started event.
+#
+# Each scheduled timer remembers the room's timer token (the slot's TimerState field) at
+# the time it was set. stop_timer bumps the tokens, so a timer that fires after
+# being stopped - even one scheduled by another worker - does nothing.
+
+GRACE_PERIOD_SECONDS = 30
+VOTING_COUNTDOWN_SECONDS = 30
+TURN_TIMER = 'timer_id'  # Grace/vote/turn timers
+ROUND_TIMER = 'round_timer_id'  # Shared-board fixed round timer
+
+def schedule_room_timer(room, slot, delay, callback, *args):
+    """Run callback(room, *args) under the room's update lock after delay, unless superseded"""
+    timer_id = getattr(room.timer_state, slot) + 1
+    setattr(room.timer_state, slot, timer_id)
+    timer_scheduler.call_later(delay, run_room_timer, room.room_code, slot, timer_id,
+                               callback, args, key=room.room_code)
+
+def run_room_timer(room_code, slot, timer_id, callback, args):
+    with room_store.update(room_code) as room:
+        if room is None or getattr(room.timer_state, slot) != timer_id:
+            return  # Room gone, or timer stopped/replaced since it was scheduled
+        callback(room, *args)
+
+def start_grace_period_voting(room, mode):
     """
     CRITICAL FIX #4: Start 30-second grace period for voting timer.
     After grace expires, voting window opens (if applicable).
     """
-    room = game_rooms.get(room_code)
-    if not room:
-        return
-    
-    room['timer_state']['grace_active'] = True
-    room['timer_state']['voting_active'] = False
-    room['timer_state']['countdown_active'] = False
-    room['timer_state']['votes'] = set()
-    
-    socketio.emit('timer_grace_started', {
-        'duration': 30,
+    room_code = room.room_code
+    room.timer_state.grace_active = True
+    room.timer_state.voting_active = False
+    room.timer_state.countdown_active = False
+    room.timer_state.votes = set()
+    room.timer_state.expires_at = time.time() + GRACE_PERIOD_SECONDS
+    room_events.record(room, 'timer', {'kind': 'grace', 'duration': GRACE_PERIOD_SECONDS})
+    
+    broadcaster.emit(room_code, 'timer_grace_started', {
+        'duration': GRACE_PERIOD_SECONDS,
         'mode': mode
-    }, room=room_code)
-    
-    print(f'[TIMER] Grace period started for room {room_code} ({mode} mode)')
-    
-    # Grace period countdown
-    for i in range(30, 0, -1):
-        if room_code not in game_rooms or not game_rooms[room_code]['timer_state']['grace_active']:
-            return
-        
-        socketio.emit('timer_grace_tick', {'seconds': i}, room=room_code)
-        time.sleep(1)
+    })
     
-    # Grace period ended - enable voting based on mode
-    if room_code in game_rooms:
-        room['timer_state']['grace_active'] = False
-        
-        if mode == 'randomized_per_word':
-            # Always enable voting in randomized mode
-            room['timer_state']['voting_active'] = True
-            socketio.emit('timer_voting_enabled', {}, room=room_code)
-            print(f'[TIMER] Voting enabled for room {room_code} (randomized mode)')
-        
-        elif mode == 'shared_board':
-            # CRITICAL: Voting only if exactly ONE player hasn't submitted
-            round_state = room.get('round_state', {})
-            submissions = round_state.get('submissions', {})
-            
-            players_submitted = sum(1 for sub in submissions.values() if len(sub.get('words', [])) > 0)
-            total_players = len(room['players'])
-            
-            if players_submitted == total_players - 1:
-                room['timer_state']['voting_active'] = True
-                socketio.emit('timer_voting_enabled', {}, room=room_code)
-                print(f'[TIMER] Voting enabled for room {room_code} (1 slow player)')
+    schedule_room_timer(room, TURN_TIMER, GRACE_PERIOD_SECONDS, end_grace_period_voting, mode)
+    timer_log.debug('Grace period started for room %s (%s mode)', room_code, mode)
 
-def start_voting_countdown(room_code):
-    """Start 30-second countdown after all players have voted"""
-    room = game_rooms.get(room_code)
-    if not room:
+def end_grace_period_voting(room, mode):
+    """Grace period deadline - enable voting based on mode"""
+    room_code = room.room_code
+    if not room.timer_state.grace_active:
         return
     
-    room['timer_state']['voting_active'] = False
-    room['timer_state']['countdown_active'] = True
-    room['timer_state']['time_remaining'] = 30
-    
-    socketio.emit('timer_countdown_started', {
-        'duration': 30
-    }, room=room_code)
+    room.timer_state.grace_active = False
+    room.timer_state.expires_at = None
     
-    print(f'[TIMER] Countdown started for room {room_code}')
+    if mode == 'randomized_per_word':
+        # Always enable voting in randomized mode
+        room.timer_state.voting_active = True
+        broadcaster.emit(room_code, 'timer_voting_enabled', {})
+        timer_log.debug('Voting enabled for room %s (randomized mode)', room_code)
     
-    # Countdown
-    for i in range(30, 0, -1):
-        if room_code not in game_rooms or not game_rooms[room_code]['timer_state']['countdown_active']:
-            return
+    elif mode == 'shared_board':
+        # CRITICAL: Voting only if exactly ONE player hasn't submitted
+        submissions = room.round_state.submissions if room.round_state else {}
+        
+        players_submitted = sum(1 for sub in submissions.values() if sub.words)
+        total_players = len(room.players)
         
-        room['timer_state']['time_remaining'] = i
-        socketio.emit('timer_countdown_tick', {'seconds': i}, room=room_code)
-        time.sleep(1)
+        if players_submitted == total_players - 1:
+            room.timer_state.voting_active = True
+            broadcaster.emit(room_code, 'timer_voting_enabled', {})
+            timer_log.debug('Voting enabled for room %s (1 slow player)', room_code)
+
+def start_voting_countdown(room):
+    """Start 30-second countdown after all players have voted"""
+    room_code = room.room_code
+    room.timer_state.voting_active = False
+    room.timer_state.countdown_active = True
+    room.timer_state.time_remaining = VOTING_COUNTDOWN_SECONDS
+    room.timer_state.expires_at = time.time() + VOTING_COUNTDOWN_SECONDS
+    room_events.record(room, 'timer', {'kind': 'countdown', 'duration': VOTING_COUNTDOWN_SECONDS})
+    
+    broadcaster.emit(room_code, 'timer_countdown_started', {
+        'duration': VOTING_COUNTDOWN_SECONDS
+    })
     
-    # Countdown ended, force end turn
-    if room_code in game_rooms:
-        room['timer_state']['countdown_active'] = False
-        current_player = room['timer_state']['current_player_turn']
-        socketio.emit('timer_expired', {'player_id': current_player}, room=room_code)
-        print(f'[TIMER] Turn timeout for player {current_player} in room {room_code}')
+    schedule_room_timer(room, TURN_TIMER, VOTING_COUNTDOWN_SECONDS, expire_turn_timer)
+    timer_log.debug('Countdown started for room %s', room_code)
 
-def start_fixed_timer(room_code, minutes):
+def start_fixed_timer(room, minutes):
     """Start fixed timer countdown"""
-    room = game_rooms.get(room_code)
-    if not room:
-        return
-    
-    total_seconds = minutes * 60
-    room['timer_state']['countdown_active'] = True
-    room['timer_state']['time_remaining'] = total_seconds
-    
-    socketio.emit('timer_fixed_started', {
+    room_code = room.room_code
+    total_seconds = int(minutes * 60)
+    room.timer_state.countdown_active = True
+    room.timer_state.time_remaining = total_seconds
+    room.timer_state.expires_at = time.time() + total_seconds
+    room_events.record(room, 'timer', {'kind': 'fixed', 'duration': total_seconds})
+    
+    broadcaster.emit(room_code, 'timer_fixed_started', {
         'duration': total_seconds
-    }, room=room_code)
-    
-    print(f'[TIMER] Fixed timer started for room {room_code}: {minutes} minutes')
+    })
     
-    # Countdown
-    for i in range(total_seconds, 0, -1):
-        if room_code not in game_rooms or not game_rooms[room_code]['timer_state']['countdown_active']:
-            return
-        
-        room['timer_state']['time_remaining'] = i
-        socketio.emit('timer_fixed_tick', {'seconds': i}, room=room_code)
-        time.sleep(1)
+    schedule_room_timer(room, TURN_TIMER, total_seconds, expire_turn_timer)
+    timer_log.debug('Fixed timer started for room %s: %s minutes', room_code, minutes)
+
+def expire_turn_timer(room):
+    """Countdown/fixed timer deadline - force end turn"""
+    if not room.timer_state.countdown_active:
+        return
     
-    # Timer expired, force end turn
-    if room_code in game_rooms:
-        room['timer_state']['countdown_active'] = False
-        current_player = room['timer_state']['current_player_turn']
-        socketio.emit('timer_expired', {'player_id': current_player}, room=room_code)
-        print(f'[TIMER] Turn timeout for player {current_player} in room {room_code}')
+    room.timer_state.countdown_active = False
+    room.timer_state.time_remaining = 0
+    room.timer_state.expires_at = None
+    current_player = room.timer_state.current_player_turn
+    room_events.record(room, 'timer', {'kind': 'expired', 'player': current_player})
+    broadcaster.emit(room.room_code, 'timer_expired', {'player_id': current_player})
+    timer_log.info('Turn timeout for player %s in room %s', current_player, room.room_code)
 
-def stop_timer(room_code):
+def stop_timer(room):
     """Stop all active timers for a room"""
-    if room_code in game_rooms:
-        room = game_rooms[room_code]
-        room['timer_state']['grace_active'] = False
-        room['timer_state']['voting_active'] = False
-        room['timer_state']['countdown_active'] = False
-        room['timer_state']['votes'] = set()
-        room['timer_state']['time_remaining'] = 0
-    
-    if room_code in timer_threads:
-        timer_threads[room_code]['stop'] = True
-        del timer_threads[room_code]
+    timer_state = room.timer_state
+    timer_state.grace_active = False
+    timer_state.voting_active = False
+    timer_state.countdown_active = False
+    timer_state.votes = set()
+    timer_state.time_remaining = 0
+    timer_state.expires_at = None
+    
+    # Invalidate timers scheduled anywhere, then drop the ones queued in this process
+    for slot in (TURN_TIMER, ROUND_TIMER):
+        setattr(timer_state, slot, getattr(timer_state, slot) + 1)
+    timer_scheduler.cancel_key(room.room_code)
+
+# ===== ROOM REAPER =====
+# Rooms idle past their status TTL, orphaned, or beyond MAX_ROOMS are closed
+# from a background sweep, and expired single-player games dropped with them
+# (see reaper.py). Sockets beyond MAX_SOCKET_SESSIONS are refused at connect.
+MAX_SOCKET_SESSIONS = int(os.environ.get('SPELLCAST_MAX_SESSIONS', 20000))
+
+def close_idle_room(room, reason):
+    """Reaper callback, under the room's update: tell anyone left, stop its timers, close the Socket.IO room"""
+    room_code = room.room_code
+    stop_timer(room)
+    room_events.record(room, 'deleted', {'reason': reason})
+    # Straight to the sockets: a frame-window broadcast would flush after the room is gone
+    socketio.emit('room_closed', {'room_code': room_code, 'reason': reason}, to=room_code)
+    socketio.close_room(room_code)
+    for player_id in room.players:
+        session = player_sessions.get(player_id)
+        if session is not None and session.get('room_code') == room_code:
+            session['room_code'] = None
+    rooms_reaped.inc(reason=reason)
+
+# Only this worker's sockets are in player_sessions, so orphans are only spotted without Redis
+room_reaper = RoomReaper(room_store, close_idle_room, game_store=game_store,
+                         is_connected=None if REDIS_URL else (lambda player_id: player_id in player_sessions))
+room_reaper.start()
+
+# ===== PER-GAME RANDOMNESS =====
+# Every room and single-player game records its own seed in its state and
+# draws from its own random.Random, derived from that seed and a step number.
+# Nothing touches (or reseeds) the global random module, so games never
+# correlate with each other, and a game's draws replay exactly from its record.
+# The dealt board's pool seed is recorded alongside ('board_seed').
+
+def new_seed():
+    return secrets.randbits(64)
+
+def game_rng(seed, step):
+    """random.Random for one step of a game: the same seed and step always give the same draws"""
+    return random.Random(f'{seed}:{step}')
+
+def room_rng(room):
+    """The room's generator for its next step (caller holds the room's update)"""
+    room.rng_step += 1
+    return game_rng(room.seed, room.rng_step)
 
 # ===== SINGLE PLAYER FUNCTIONS (PRESERVED) =====
 
-def get_valid_single_letter(current_board_tiles):
-    """Pulls a random letter, ensuring no letter appears more than 5 times on the current board."""
-    # Count the letters currently on the board
-    letter_counts = {}
-    for tile in current_board_tiles:
-        if tile and tile.get("letter"):
-            l = tile["letter"]
-            letter_counts[l] = letter_counts.get(l, 0) + 1
-
-    # Try 100 times to find a letter that hasn't hit the cap
-    for _ in range(100):
-        candidate = random.choice(LETTER_FREQUENCIES)
-        if letter_counts.get(candidate, 0) < 5:
-            return candidate
-            
-    # Fallback if we somehow fail 100 times
-    available = [l for l in set(LETTER_FREQUENCIES) if letter_counts.get(l, 0) < 5]
-    if available:
-        return random.choice(available)
-    return random.choice(LETTER_FREQUENCIES)
-
-def get_balanced_board():
-    board_tiles = []
-    letter_counts = {}
-    
-    for i in range(GRID_SIZE * GRID_SIZE):
-        attempts = 0
-        while attempts < 100:
-            letter = random.choice(LETTER_FREQUENCIES)
-            if letter_counts.get(letter, 0) < 5:
-                board_tiles.append({"letter": letter, "special": None, "gem": False})
-                letter_counts[letter] = letter_counts.get(letter, 0) + 1
-                break
-            attempts += 1
-        else:
-            available = [l for l in set(LETTER_FREQUENCIES) if letter_counts.get(l, 0) < 5]
-            if available:
-                letter = random.choice(available)
-            else:
-                letter = random.choice(LETTER_FREQUENCIES)
-            board_tiles.append({"letter": letter, "special": None, "gem": False})
-            letter_counts[letter] = letter_counts.get(letter, 0) + 1
-    
-    return board_tiles
-
-def is_path_valid(path, word, board_tiles):
+def is_path_valid(path, word, board):
     if len(path) != len(word): return False
-    seen_coords = set()
-    for r, c in path:
-        coord_tuple = (r, c)
-        if coord_tuple in seen_coords: return False
-        seen_coords.add(coord_tuple)
-        
-    for i in range(len(path)):
-        r, c = path[i]
-        index = r * GRID_SIZE + c
-        
-        # --- NEW SAFETY NET ---
-        # If the server woke up from sleep and lost the board, 
-        # or the index is somehow out of bounds, gracefully reject the move.
-        if not board_tiles or index >= len(board_tiles): 
-            return False 
-        # ----------------------
-        
-        if board_tiles[index]['letter'].lower() != word[i].lower(): return False
-        
-        if i > 0:
-            prev_r, prev_c = path[i-1]
-            if abs(r - prev_r) > 1 or abs(c - prev_c) > 1: return False
-            
-    return True
+    
+    # --- NEW SAFETY NET ---
+    # If the server woke up from sleep and lost the board, gracefully reject the move.
+    if board is None or len(board) < GRID_SIZE * GRID_SIZE:
+        return False
+    # ----------------------
+    
+    # Bounds, repeats, 8-way adjacency and letters: one lookup in this board's cached paths
+    return board_paths.has_path(board, word, path, diagonal=True)
 
 def start_new_game():
-    global game_state
-    board_tiles = get_balanced_board()
-    
-    # Add special tiles
-    special_tile_type = "DL" if random.random() < 0.75 else "TL"
-    special_tile_index = random.randint(0, len(board_tiles) - 1)
-    board_tiles[special_tile_index]["special"] = special_tile_type
-    
-    # Add 10 gems
-    empty_indices = list(range(len(board_tiles)))
-    random.shuffle(empty_indices)
-    for i in range(min(10, len(empty_indices))):
-        board_tiles[empty_indices[i]]["gem"] = True
-
-    game_state = {
-        "board_tiles": board_tiles,
+    """Deal a fresh single-player game (tiles, DL/TL and gems from the board pool) and return its state"""
+    board_seed, board = single_player_boards.take()
+    return {
+        "board_tiles": board,
+        "seed": new_seed(),  # Draws for each change come from game_rng(seed, version)
+        "board_seed": board_seed,
         "round": 1,
         "score": 0,
         "found_words": [],
         "dp_pos": None,
         "game_over": False,
-        "gems": 3
+        "gems": 3,
+        "version": 0  # Bumped on every change; clients apply deltas against it
     }
 
-def advance_to_next_round():
+def shuffle_board_tiles(board, rng):
+    """
+    Shuffle entire tiles (letter + special + gem together) in place.
+    Returns the order used: new index i holds the tile that was at order[i].
+    """
+    order = list(range(len(board)))
+    rng.shuffle(order)
+    board.permute(order)
+    return order
+
+def advance_to_next_round(state, rng):
+    """Move to the next round; returns the shuffle order, or None once the game is over"""
     # BUG FIX: Only set game_over AFTER completing round 5, not when entering it
-    game_state["round"] += 1
-    if game_state["round"] > MAX_ROUNDS:
-        game_state["game_over"] = True
-        return
+    state["round"] += 1
+    if state["round"] > MAX_ROUNDS:
+        state["game_over"] = True
+        return None
     
     # Shuffle entire tiles (letter + special + gem together) to preserve powerups
-    tiles_data = [{"letter": tile["letter"], "special": tile["special"], "gem": tile["gem"]} 
-                  for tile in game_state["board_tiles"]]
-    random.shuffle(tiles_data)
-    
-    # Update board with shuffled data
-    for i, tile_data in enumerate(tiles_data):
-        game_state["board_tiles"][i]["letter"] = tile_data["letter"]
-        game_state["board_tiles"][i]["special"] = tile_data["special"]
-        game_state["board_tiles"][i]["gem"] = tile_data["gem"]
+    order = shuffle_board_tiles(state["board_tiles"], rng)
     
     # Add DP tile
-    available_indices = [i for i, tile in enumerate(game_state["board_tiles"]) if tile["special"] not in ["DL", "TL"]]
+    available_indices = state["board_tiles"].special_indices(False)
     if available_indices:
-        dp_index = random.choice(available_indices)
-        game_state["dp_pos"] = [dp_index // GRID_SIZE, dp_index % GRID_SIZE]
+        dp_index = rng.choice(available_indices)
+        state["dp_pos"] = [dp_index // GRID_SIZE, dp_index % GRID_SIZE]
     else:
-        game_state["dp_pos"] = None
+        state["dp_pos"] = None
+    return order
+
+# ===== SINGLE PLAYER DELTA PROTOCOL =====
+# Responses carry only what changed since the client's copy (identified by
+# "version"); a client whose copy is stale fetches a full snapshot from /state.
 
-def get_current_board_letters():
-    return [[game_state["board_tiles"][r*GRID_SIZE + c]['letter'] for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
+DELTA_FIELDS = ("round", "score", "gems", "dp_pos", "game_over")
+
+def snapshot_for_delta(state):
+    """Capture what build_state_delta diffs against, before mutating state"""
+    return state["board_tiles"].snapshot(), len(state["found_words"])
+
+def build_state_delta(state, snapshot, order=None):
+    """
+    Bump the game's version and describe the change since snapshot.
+    order is the shuffle order applied after the snapshot was taken, if any.
+    """
+    before_board, before_word_count = snapshot
+    board = state["board_tiles"]
+    changed = {i: board.tile(i) for i in board.changed_cells(before_board, order)}
+    
+    base_version = state["version"]
+    state["version"] = base_version + 1
+    delta = {
+        "base_version": base_version,
+        "version": base_version + 1,
+        "tiles": changed,
+        "found_words_added": state["found_words"][before_word_count:],
+        "fields": {field: state[field] for field in DELTA_FIELDS}
+    }
+    if order is not None:
+        delta["order"] = order
+    return delta
+
+def get_current_board_letters(state):
+    # The Board itself reads as rows of letters (board[row][col]); no copy needed
+    return state["board_tiles"]
+
+CLIENT_HIDDEN_FIELDS = ("seed", "board_seed")  # Knowing the seed would reveal upcoming tiles
+
+def state_to_json(state):
+    """The game_state as the client sees it (board as tile dicts, no seeds)"""
+    client_state = {key: value for key, value in state.items() if key not in CLIENT_HIDDEN_FIELDS}
+    client_state["board_tiles"] = state["board_tiles"].to_tiles()
+    return client_state
 
 def find_all_paths(board_letters, word):
-    word = word.upper()
-    paths = []
-    for r in range(GRID_SIZE):
-        for c in range(GRID_SIZE):
-            if board_letters[r][c] == word[0]:
-                find_paths_recursive(board_letters, word, [[r, c]], paths)
-    return paths
-
-def find_paths_recursive(board_letters, word, current_path, all_paths):
-    if len(current_path) == len(word):
-        all_paths.append(current_path)
-        return
-    last_r, last_c = current_path[-1]
-    next_letter = word[len(current_path)]
-    for dr in [-1, 0, 1]:
-        for dc in [-1, 0, 1]:
-            if dr == 0 and dc == 0: continue
-            nr, nc = last_r + dr, last_c + dc
-            if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                if not any(p[0] == nr and p[1] == nc for p in current_path):
-                    if board_letters[nr][nc] == next_letter:
-                        find_paths_recursive(board_letters, word, current_path + [[nr, nc]], all_paths)
-
-def calculate_score_for_path(path, word):
+    """Every 8-way path of word on the board, as [[row, col], ...] lists"""
+    return [[index_to_coords(i) for i in path] for path in board_paths.paths(board_letters, word, diagonal=True)]
+
+def calculate_score_for_path(path, word, state):
     base_score, word_multiplier = 0, 1
+    board = state["board_tiles"]
     for r, c in path:
         index = r * GRID_SIZE + c
-        tile = game_state["board_tiles"][index]
+        special = board.special(index)
         letter_multiplier = 1
-        if tile["special"] == "DL": letter_multiplier = 2
-        elif tile["special"] == "TL": letter_multiplier = 3
-        if game_state["dp_pos"] and game_state["dp_pos"] == [r, c]: word_multiplier *= 2
-        base_score += LETTER_SCORES.get(tile["letter"].upper(), 0) * letter_multiplier
+        if special == "DL": letter_multiplier = 2
+        elif special == "TL": letter_multiplier = 3
+        if state["dp_pos"] and state["dp_pos"] == [r, c]: word_multiplier *= 2
+        base_score += LETTER_SCORES.get(board.letter(index), 0) * letter_multiplier
     final_score = base_score * word_multiplier
     if len(word) >= 6: final_score += 10
     return final_score
 
 # ===== SINGLE PLAYER ROUTES (PRESERVED) =====
 
+def load_game():
+    """This session's single-player state, or None if it has none (or it was evicted)"""
+    game_id = session.get('game_id')
+    record = game_store.get(game_id) if game_id else None
+    return unpack_game_state(record) if record else None
+
+def save_game(state):
+    if 'game_id' not in session:
+        session['game_id'] = secrets.token_urlsafe(16)
+    game_store.put(session['game_id'], pack_game_state(state))
+
 @app.route("/")
 def homepage():
     # CRITICAL FIX: Prevent Render's 5-second bot pings from destroying the board!
@@ -392,63 +577,91 @@ def homepage():
     if 'Go-http-client' in user_agent or request.method == 'HEAD':
         return "OK", 200
         
-    start_new_game()
-    return render_template("index.html", initial_state=game_state, letter_scores=LETTER_SCORES)
+    state = start_new_game()
+    save_game(state)
+    return render_template("index.html", initial_state=state_to_json(state), letter_scores=LETTER_SCORES)
+
+@app.route("/state")
+def get_state():
+    """Full snapshot for clients that missed a delta (deals a new game if this one expired)"""
+    state = load_game()
+    if state is None:
+        state = start_new_game()
+        save_game(state)
+    return jsonify({"state": state_to_json(state)})
+
+def reject_submission(reason, payload):
+    """JSON rejection for /submit-word, counted under the same reasons as multiplayer"""
+    word_rejections.inc(event='submit-word', reason=reason)
+    return jsonify(payload)
 
 @app.route("/submit-word", methods=['POST'])
 def submit_word():
     data = request.get_json()
     word, path = data.get("word", "").lower(), data.get("path", [])
     
+    state = load_game()
+    if state is None:
+        return reject_submission("expired", {"valid": False, "reason": "Game expired! Dealing a new board...", "resync": True})
+    
     # Split up the validations so the game tells us EXACTLY what is wrong
     if len(word) < 3:
-        return jsonify({"valid": False, "reason": "Word too short"})
+        return reject_submission("invalid_length", {"valid": False, "reason": "Word too short"})
     
-    if word in game_state.get("found_words", []):
-        return jsonify({"valid": False, "reason": "Word already found"})
+    if word in state.get("found_words", []):
+        return reject_submission("duplicate_word", {"valid": False, "reason": "Word already found"})
         
     if word not in english_words:
-        return jsonify({"valid": False, "reason": "Word not in dictionary"})
+        return reject_submission("invalid_word", {"valid": False, "reason": "Word not in dictionary"})
         
-    if not is_path_valid(path, word, game_state.get("board_tiles", [])):
-        return jsonify({"valid": False, "reason": "Board out of sync! Refresh the page."})
+    if not is_path_valid(path, word, state.get("board_tiles")):
+        return reject_submission("invalid_path", {"valid": False, "reason": "Board out of sync! Re-syncing...", "resync": True})
+
+    snapshot = snapshot_for_delta(state)
+    board_paths.forget(get_current_board_letters(state))
+    rng = game_rng(state["seed"], state["version"])
 
     # If it passes all checks, give them points!
-    final_score = calculate_score_for_path(path, word)
-    game_state["score"] += final_score
-    game_state["found_words"].append(word)
+    final_score = calculate_score_for_path(path, word, state)
+    state["score"] += final_score
+    state["found_words"].append(word)
 
     gems_collected = 0
     new_letter_indices = []
+    board = state["board_tiles"]
     
     for r, c in path:
         index = r * GRID_SIZE + c
         
-        if game_state["board_tiles"][index]["gem"]:
+        if board.has_gem(index):
             gems_collected += 1
-            game_state["board_tiles"][index]["gem"] = False
+            board.set_gem(index, False)
         
-        if game_state["board_tiles"][index]["special"]:
-            special_type = game_state["board_tiles"][index]["special"]
-            available_indices = [i for i, t in enumerate(game_state["board_tiles"]) if not t["special"] and i != index]
+        special_type = board.special(index)
+        if special_type:
+            available_indices = [i for i in board.special_indices(False) if i != index]
             if available_indices: 
-                game_state["board_tiles"][random.choice(available_indices)]["special"] = special_type
+                board.set_special(rng.choice(available_indices), special_type)
         
-        # Instead of random.choice, use the bouncer so replacement tiles obey the 5-max rule!
-        game_state["board_tiles"][index]["letter"] = get_valid_single_letter(game_state["board_tiles"])
-        game_state["board_tiles"][index]["special"] = None
+        board.set_special(index, None)
         new_letter_indices.append(index)
     
-    game_state["gems"] += gems_collected
+    # Instead of random.choice, use the bouncer so replacement tiles obey the 5-max rule!
+    # One batch for the whole word (see boards.LetterSampler)
+    SINGLE_PLAYER_LETTERS.refill(board, new_letter_indices, rng)
+    
+    state["gems"] += gems_collected
     
     for _ in range(gems_collected):
         if new_letter_indices:
-            respawn_index = random.choice(new_letter_indices)
-            game_state["board_tiles"][respawn_index]["gem"] = True
+            respawn_index = rng.choice(new_letter_indices)
+            board.set_gem(respawn_index)
             new_letter_indices.remove(respawn_index)
             
-    advance_to_next_round()
-    return jsonify({"valid": True, "new_state": game_state, "score_added": final_score})
+    order = advance_to_next_round(state, rng)
+    delta = build_state_delta(state, snapshot, order)
+    save_game(state)
+    return jsonify({"valid": True, "delta": delta, "score_added": final_score})
 
 @app.route("/use-ability", methods=['POST'])
 def use_ability():
@@ -456,71 +669,58 @@ def use_ability():
     ability = data.get("ability")
     cost = GEM_COSTS.get(ability)
     
-    if cost is None or game_state["gems"] < cost:
+    state = load_game()
+    if state is None:
+        return jsonify({"success": False, "reason": "Game expired! Refresh the page."})
+    
+    if cost is None or state["gems"] < cost:
         return jsonify({"success": False, "reason": "Not enough gems!"})
 
-    game_state["gems"] -= cost
+    snapshot = snapshot_for_delta(state)
+    order = None
+    state["gems"] -= cost
 
     if ability == "shuffle":
-        # Create list of tile objects (letter + special + gem) to shuffle together
-        tiles_data = [{"letter": tile["letter"], "special": tile["special"], "gem": tile["gem"]} 
-                      for tile in game_state["board_tiles"]]
-        random.shuffle(tiles_data)
-        
-        # Update board with shuffled data
-        for i, tile_data in enumerate(tiles_data):
-            game_state["board_tiles"][i]["letter"] = tile_data["letter"]
-            game_state["board_tiles"][i]["special"] = tile_data["special"]
-            game_state["board_tiles"][i]["gem"] = tile_data["gem"]
+        # Shuffle tile objects (letter + special + gem) together
+        order = shuffle_board_tiles(state["board_tiles"], game_rng(state["seed"], state["version"]))
     
     elif ability == "swap":
         index = data.get("index")
         new_letter = data.get("new_letter", "").upper()
-        if index is not None and new_letter and 'A' <= new_letter <= 'Z':
-            game_state["board_tiles"][index]["letter"] = new_letter
+        if isinstance(index, int) and 0 <= index < len(state["board_tiles"]) and len(new_letter) == 1 and 'A' <= new_letter <= 'Z':
+            state["board_tiles"].set_letter(index, new_letter)
         else:
-            game_state["gems"] += cost
+            state["gems"] += cost
             return jsonify({"success": False, "reason": "Invalid swap data."})
 
     elif ability == "hint":
-        board_letters = get_current_board_letters()
-        best_word, best_path, best_score = "", [], -1
-        
-        for word in english_words:
-            if len(word) < 3 or word in game_state["found_words"]: continue
-            paths = find_all_paths(board_letters, word)
-            if paths:
-                score = calculate_score_for_path(paths[0], word)
-                if score > best_score:
-                    best_word, best_path, best_score = word, paths[0], score
-        
-        if best_word:
-            return jsonify({"success": True, "new_state": game_state, "hint": {"word": best_word, "path": best_path}})
+        if 'game_id' not in session:
+            session['game_id'] = secrets.token_urlsafe(16)
+        solver = hint_solvers.solver(session['game_id'], get_current_board_letters(state))
+        solutions = solver.solutions(score_fn=lambda path, word: calculate_score_for_path(path, word, state))
+        hint = best_word(solutions, exclude=set(state["found_words"]))
+        
+        if hint:
+            hint_word, hint_path, _ = hint
+            delta = build_state_delta(state, snapshot)
+            save_game(state)
+            return jsonify({"success": True, "delta": delta, "hint": {"word": hint_word, "path": hint_path}})
         else:
-            game_state["gems"] += cost
+            state["gems"] += cost
             return jsonify({"success": False, "reason": "No hint found!"})
 
-    return jsonify({"success": True, "new_state": game_state})
+    delta = build_state_delta(state, snapshot, order)
+    save_game(state)
+    return jsonify({"success": True, "delta": delta})
 
 # ===== PHASE 2 CRITICAL VALIDATION FUNCTIONS =====
 
 # GAP #1: STRICT ADJACENCY VALIDATION (NO DIAGONALS)
 def is_valid_path_strict(positions):
     """Validate path with NO diagonal movement (Manhattan distance = 1 only)"""
-    if len(positions) < 2:
-        return True
-    
-    for i in range(1, len(positions)):
-        r1, c1 = positions[i-1]
-        r2, c2 = positions[i]
-        manhattan_distance = abs(r1 - r2) + abs(c1 - c2)
-        
-        # CRITICAL: Must be exactly 1 (adjacent horizontally or vertically)
-        # manhattan_distance = 2 means diagonal OR gap
-        if manhattan_distance != 1:
-            return False
-    
-    return True
+    # CRITICAL: Each step must be to a horizontal/vertical neighbour, and no tile
+    # may be used twice - both checked against the precomputed 4-way table
+    return is_connected_path(positions, diagonal=False)
 
 # GAP #7: BOARD TILE CONSISTENCY VALIDATION
 def validate_board_tiles(word, positions, board_state):
@@ -529,7 +729,7 @@ def validate_board_tiles(word, positions, board_state):
         return False, 'Length mismatch'
     
     for i, (row, col) in enumerate(positions):
-        if row < 0 or row >= GRID_SIZE or col < 0 or col >= GRID_SIZE:
+        if cell_index(row, col) < 0:
             return False, 'Out of bounds'
         
         board_letter = board_state[row][col].upper()
@@ -540,78 +740,36 @@ def validate_board_tiles(word, positions, board_state):
     
     return True, None
 
+# BOARD VERSIONING: multiplayer boards carry 'board_version'; updates send only
+# changed cells plus the version they apply to, and clients that fall behind
+# ask for a full snapshot with 'request_board_sync'.
+def bump_board_version(state):
+    """Advance a RoundState/TurnState board version; returns (base_version, version)"""
+    base_version = state.board_version
+    state.board_version = base_version + 1
+    return base_version, base_version + 1
+
+def board_changes(before, after):
+    """[[row, col, letter]] for every cell that differs between two boards"""
+    return [[*index_to_coords(i), after.letter(i)] for i in after.changed_cells(before)]
+
 # GAP #2: PROPER WEIGHTED BOARD GENERATION
-def generate_weighted_board(room_code):
-    """Generate 5x5 board with proper English letter frequency weighting"""
-    # Deterministic seeding for reproducibility
-    random.seed(hash(room_code) % (2**32))
-    
-    letters = list(FREQUENCY_MAP.keys())
-    weights = list(FREQUENCY_MAP.values())
-    
-    # Generate 25 letters using weighted random selection
-    flat_board = random.choices(letters, weights=weights, k=25)
-    
-    # Convert to 2D array
-    board_2d = [flat_board[i*5:(i+1)*5] for i in range(5)]
-    
-    return board_2d
-
-# GAP #3: PROPER SCORING WITH MULTIPLIERS
-def calculate_score_with_multipliers(word):
-    """Calculate score with proper Scrabble-style letter values and length multipliers"""
-    # Base score from letter values
-    base_score = sum(LETTER_VALUES.get(c.upper(), 0) for c in word)
-    
-    # Length multipliers per Phase 2 spec
-    word_len = len(word)
-    if word_len <= 3:
-        multiplier = 1.0
-    elif word_len <= 5:
-        multiplier = 1.2
-    elif word_len <= 7:
-        multiplier = 1.5
-    else:
-        multiplier = 2.0
-    
-    final_score = int(base_score * multiplier)
-    return final_score
+def generate_weighted_board(room):
+    """5x5 FREQUENCY_MAP-weighted board, vetted for playable 4-way words (from the board pool)"""
+    room.board_seed, board = multiplayer_boards.take()
+    return board
 
 # GAP #4: ROW-BASED BOARD REFRESH
 
-def get_valid_multiplayer_letter(board_state):
-    """Multiplayer Bouncer: ensures no letter appears > 5 times using weighted frequencies."""
-    letter_counts = {}
-    for row in board_state:
-        for letter in row:
-            if letter:
-                l = letter.upper()
-                letter_counts[l] = letter_counts.get(l, 0) + 1
-
-    letters = list(FREQUENCY_MAP.keys())
-    weights = list(FREQUENCY_MAP.values())
-
-    # Try 100 times to pull a letter that hasn't hit the 5-cap
-    for _ in range(100):
-        candidate = random.choices(letters, weights=weights, k=1)[0]
-        if letter_counts.get(candidate, 0) < 5:
-            return candidate
-            
-    # Fallback if the board is somehow completely full
-    available = [l for l in letters if letter_counts.get(l, 0) < 5]
-    if available:
-        return random.choice(available)
-    return random.choices(letters, weights=weights, k=1)[0]
-
-def refresh_consumed_positions(board_state, consumed_positions):
+def refresh_consumed_positions(board_state, consumed_positions, rng):
     """
     CRITICAL FIX #1: Refresh ONLY the specific consumed positions with new random letters.
     Now equipped with the Maximum-5-Letters Bouncer!
     """
-    for row, col in consumed_positions:
-        if 0 <= row < 5 and 0 <= col < 5: # Assuming GRID_SIZE is 5
-            # We use the bouncer instead of raw random!
-            board_state[row][col] = get_valid_multiplayer_letter(board_state)
+    board_paths.forget(board_state)
+    # We use the bouncer instead of raw random! All consumed cells in one batch
+    indices = [cell_index(row, col) for row, col in sorted(consumed_positions)]
+    MULTIPLAYER_LETTERS.refill(board_state, [i for i in indices if i >= 0], rng)
     
     return board_state
 
@@ -622,11 +780,10 @@ def get_all_consumed_positions(submissions):
     """
     consumed = set()
     
-    for player_id, submission in submissions.items():
-        if 'positions' in submission:
-            for word_positions in submission['positions']:
-                for row, col in word_positions:
-                    consumed.add((row, col))
+    for submission in submissions.values():
+        for word_positions in submission.positions:
+            for row, col in word_positions:
+                consumed.add((row, col))
     
     return consumed
 
@@ -635,12 +792,13 @@ def apply_tile_swap(board_state, swap_history):
     CRITICAL FIX #2: Apply tile swaps with proper persistence.
     Swapped tiles that are NOT used in words persist to next round.
     """
+    board_paths.forget(board_state)
     for swap in swap_history:
         if not swap.get('used', False):
             row, col = swap['position']
             new_letter = swap['new_letter']
-            board_state[row][col] = new_letter
-            print(f'[SWAP] Persisting unused swap at ({row},{col}): {swap["old_letter"]} → {new_letter}')
+            board_state.set_letter(cell_index(row, col), new_letter)
+            swap_log.debug('Persisting unused swap at (%s,%s): %s → %s', row, col, swap['old_letter'], new_letter)
     
     return board_state
 
@@ -680,16 +838,15 @@ def calculate_word_score(word, positions, board_state):
 def compile_round_results(room):
     """Compile all player scores and words for round end"""
     results = {}
-    round_state = room.get('round_state', {})
-    submissions = round_state.get('submissions', {})
+    submissions = room.round_state.submissions if room.round_state else {}
     
     for player_id, submission in submissions.items():
-        player_name = next((p['name'] for p in room['players'] if p['id'] == player_id), 'Unknown')
+        player = room.players.get(player_id)
         results[player_id] = {
-            'name': player_name,
-            'score': submission.get('score', 0),
-            'word_count': len(submission.get('words', [])),
-            'words': submission.get('words', [])
+            'name': player.name if player else 'Unknown',
+            'score': submission.score,
+            'word_count': len(submission.words),
+            'words': submission.words
         }
     
     return results
@@ -697,80 +854,86 @@ def compile_round_results(room):
 # ===== HELPER FUNCTIONS FOR GAME LOGIC =====
 
 # ===== MULTIPLAYER SOCKET.IO EVENTS =====
+# Rooms are only changed inside `with room_store.update(room_code) as room:`,
+# which is atomic per room across every worker (see room_store.py). Helpers
+# called from inside such a block take the room itself and must not open
+# another update for the same room.
 
-@socketio.on('connect')
+@socket_event('connect')
 def handle_connect():
     """Handle new player connection"""
     session_id = request.sid
+    if len(player_sessions) >= MAX_SOCKET_SESSIONS:
+        room_log.warning('Refusing connection %s: %d sessions open', session_id, len(player_sessions))
+        return False
     player_sessions[session_id] = {'room_code': None, 'name': None}
     emit('connected', {'session_id': session_id})
-    print(f'[MULTIPLAYER] Player connected: {session_id}')
+    room_log.info('Player connected: %s', session_id)
 
-@socketio.on('disconnect')
+@socket_event('disconnect')
 def handle_disconnect():
     """Handle player disconnection"""
     session_id = request.sid
     if session_id in player_sessions:
         room_code = player_sessions[session_id].get('room_code')
-        if room_code and room_code in game_rooms:
-            # Remove player from room
-            room = game_rooms[room_code]
-            room['players'] = [p for p in room['players'] if p['id'] != session_id]
-            
-            # Stop any active timers
-            stop_timer(room_code)
-            
-            # Notify others
-            socketio.emit('player_left', {
-                'player_id': session_id,
-                'player_count': len(room['players'])
-            }, room=room_code)
-            
-            # Delete room if empty
-            if not room['players']:
-                del game_rooms[room_code]
-                print(f'[MULTIPLAYER] Room {room_code} deleted (empty)')
+        if room_code:
+            with room_store.update(room_code) as room:
+                if room is not None:
+                    # Remove player from room
+                    room.remove_player(session_id)
+                    room_events.record(room, 'left', {'player': session_id})
+                    
+                    # Stop any active timers
+                    stop_timer(room)
+                    
+                    # Notify others
+                    broadcaster.emit(room_code, 'player_left', {
+                        'player_id': session_id,
+                        'player_count': len(room.players)
+                    })
+                    
+                    # Delete room if empty
+                    if not room.players:
+                        room_events.record(room, 'deleted')
+                        room_store.delete(room_code)
+                        room_log.info('Room %s deleted (empty)', room_code)
         
         del player_sessions[session_id]
-    print(f'[MULTIPLAYER] Player disconnected: {session_id}')
+    event_limiter.forget(session_id)
+    room_log.info('Player disconnected: %s', session_id)
 
-@socketio.on('create_room')
+@socket_event('create_room')
 def handle_create_room(data):
     """Create new game room with timer settings"""
     session_id = request.sid
     player_name = data.get('player_name', 'Player')
     max_players = min(data.get('max_players', 4), 5)  # Max 5 players
     
-    room_code = generate_room_code()
+    room_log.debug('Room create event from %s (player name: %s, max_players: %s)', session_id, player_name, max_players)
     
-    print(f'[MULTIPLAYER] Room create event from {session_id}')
-    print(f'[MULTIPLAYER] Player name: {player_name}, max_players: {max_players}')
+    # ROOM CAP: make space from overdue rooms, else refuse (live games are never evicted for a new lobby)
+    if not room_reaper.admit():
+        room_log.warning('Refusing room for %s: %d rooms open', session_id, len(room_store))
+        emit('error', {'message': 'Server is full, try again in a few minutes'})
+        return
     
-    game_rooms[room_code] = {
-        'room_code': room_code,
-        'host': session_id,
-        'players': [{
-            'id': session_id,
-            'name': player_name,
-            'score': 0,
-            'ready': False
-        }],
-        'settings': {
-            'max_players': max_players,
-            'rounds_per_player': 5,  # Always 5 rounds
-            'timer_type': 'voting',  # Default: voting-based
-            'fixed_minutes': 2  # Default: 2 minutes for fixed timer
-        },
-        'status': 'waiting',  # waiting, playing, finished
-        'timer_state': {
-            'grace_active': False,
-            'voting_active': False,
-            'countdown_active': False,
-            'votes': set(),  # Keep as set internally for fast lookups
-            'time_remaining': 0,
-            'current_player_turn': None
-        }
-    }
+    while True:
+        room_code = generate_room_code()
+        host = Player(session_id, player_name)
+        room = Room(room_code, session_id,
+                    settings=Settings(max_players=max_players),
+                    seed=new_seed(),
+                    event_seq=1,  # 'created' below is event 1
+                    last_activity=time.time())
+        room.add_player(host)
+        seat_token = issue_seat(room, host)
+        # Another worker may have taken the same code since generate_room_code checked
+        if room_store.create(room_code, room):
+            break
+    room_reaper.track(room_code, room)
+    room_events.append(room_code, 1, 'created', {
+        'host': session_id, 'name': player_name, 'seed': room.seed, 'settings': to_client(room.settings)
+    })
     
     player_sessions[session_id]['room_code'] = room_code
     player_sessions[session_id]['name'] = player_name
@@ -778,273 +941,337 @@ def handle_create_room(data):
     join_room(room_code)
     
     # FIX: Use serialize_room to convert set to list for JSON
-    room_data = serialize_room(room_code)
+    room_data = serialize_room(room)
     
-    print(f'[MULTIPLAYER] Room {room_code} created by {player_name}')
-    print(f'[MULTIPLAYER] Emitting room_created with serialized data')
+    room_log.info('Room %s created by %s', room_code, player_name)
     
     emit('room_created', {
         'room_code': room_code,
-        'room': room_data  # Send JSON-serializable version
+        'room': room_data,  # Send JSON-serializable version
+        'seat_token': seat_token  # Only ever sent to the seat's own player
     })
-    
-    print(f'[MULTIPLAYER] room_created event emitted successfully')
 
-@socketio.on('join_room')
+@socket_event('join_room')
 def handle_join_room(data):
     """Join existing room with code"""
     session_id = request.sid
     room_code = data.get('room_code', '').upper().strip()
     player_name = data.get('player_name', 'Player')
     
-    print(f'[MULTIPLAYER] join_room request: room={room_code}, player={player_name}, sid={session_id}')
+    room_log.debug('join_room request: room=%s, player=%s, sid=%s', room_code, player_name, session_id)
     
     if not room_code:
         emit('error', {'message': 'Please enter a room code'})
         return
     
-    if room_code not in game_rooms:
-        print(f'[MULTIPLAYER] Room {room_code} not found')
-        emit('error', {'message': 'Room not found'})
-        return
-    
-    room = game_rooms[room_code]
-    
-    # FIX #4: Check if player already in room (prevent duplicates from spam-joining)
-    player_already_in = any(p['id'] == session_id for p in room['players'])
-    if player_already_in:
-        print(f'[MULTIPLAYER] Player {session_id} already in room {room_code}, ignoring duplicate join')
-        # Send room state to client anyway (idempotent)
-        room_data = serialize_room(room_code)
-        emit('room_joined', {
-            'room_code': room_code,
-            'room': room_data,
-            'is_host': (session_id == room['host']),
-            'status': 'already_joined'
-        })
-        return
-    
-    if room['status'] != 'waiting':
-        emit('error', {'message': 'Game already started'})
-        return
-    
-    if len(room['players']) >= room['settings']['max_players']:
-        emit('error', {'message': 'Room is full'})
-        return
-    
-    # Add player to room
-    new_player = {
-        'id': session_id,
-        'name': player_name,
-        'score': 0,
-        'ready': False
-    }
-    room['players'].append(new_player)
-    print(f'[MULTIPLAYER] Player {player_name} ({session_id}) added to room {room_code}')
+    with room_store.update(room_code) as room:
+        if room is None:
+            room_log.debug('Room %s not found', room_code)
+            emit('error', {'message': 'Room not found'})
+            return
+        
+        # FIX #4: Check if player already in room (prevent duplicates from spam-joining)
+        if session_id in room.players:
+            room_log.debug('Player %s already in room %s, ignoring duplicate join', session_id, room_code)
+            # Send room state to client anyway (idempotent)
+            room_data = serialize_room(room)
+            emit('room_joined', {
+                'room_code': room_code,
+                'room': room_data,
+                'is_host': (session_id == room.host),
+                'seat_token': room.players[session_id].seat,
+                'status': 'already_joined'
+            })
+            return
+        
+        if room.status != 'waiting':
+            emit('error', {'message': 'Game already started'})
+            return
+        
+        if len(room.players) >= room.settings.max_players:
+            emit('error', {'message': 'Room is full'})
+            return
+        
+        # Add player to room
+        new_player = Player(session_id, player_name)
+        room.add_player(new_player)
+        seat_token = issue_seat(room, new_player)
+        room_events.record(room, 'joined', {'player': session_id, 'name': player_name})
+        room_log.info('Player %s (%s) added to room %s', player_name, session_id, room_code)
+        
+        # FIX #3: Use serialize_room to convert set to list for JSON
+        room_data = serialize_room(room)
     
     player_sessions[session_id]['room_code'] = room_code
     player_sessions[session_id]['name'] = player_name
     
     join_room(room_code)
     
-    # FIX #3: Use serialize_room to convert set to list for JSON
-    room_data = serialize_room(room_code)
-    
     # FIX #3A: Send join confirmation DIRECTLY TO THIS PLAYER (guest)
     emit('room_joined', {
         'room_code': room_code,
         'room': room_data,
         'is_host': False,  # Joining player is never host
+        'seat_token': seat_token,
         'status': 'success'
     })
-    print(f'[MULTIPLAYER] Sent room_joined event to guest {player_name}')
     
     # FIX #3B: THEN broadcast to ALL players that someone joined
-    socketio.emit('player_joined', {
-        'player': new_player,
+    broadcaster.emit(room_code, 'player_joined', {
+        'player': to_client(new_player),
         'room': room_data,
         'new_player_name': player_name
-    }, room=room_code)
-    print(f'[MULTIPLAYER] Broadcast player_joined to room {room_code}')
+    })
 
-@socketio.on('leave_room')
+@socket_event('leave_room')
 def handle_leave_room():
     """Player voluntarily leaves room"""
     session_id = request.sid
     if session_id in player_sessions:
         room_code = player_sessions[session_id].get('room_code')
-        if room_code and room_code in game_rooms:
-            room = game_rooms[room_code]
+        if not room_code:
+            return
+        with room_store.update(room_code) as room:
+            if room is None:
+                return
             player_name = player_sessions[session_id].get('name', 'Player')
             
             # Remove player
-            room['players'] = [p for p in room['players'] if p['id'] != session_id]
+            room.remove_player(session_id)
+            room_events.record(room, 'left', {'player': session_id})
             
             # Stop timers
-            stop_timer(room_code)
+            stop_timer(room)
             
             # Notify others
-            socketio.emit('player_left', {
+            broadcaster.emit(room_code, 'player_left', {
                 'player_id': session_id,
                 'player_name': player_name,
-                'player_count': len(room['players'])
-            }, room=room_code)
+                'player_count': len(room.players)
+            })
             
             leave_room(room_code)
             
             # Delete room if empty
-            if not room['players']:
-                del game_rooms[room_code]
-            
-            # Clear player session
-            player_sessions[session_id]['room_code'] = None
-            
-            print(f'[MULTIPLAYER] {player_name} left room {room_code}')
+            if not room.players:
+                room_events.record(room, 'deleted')
+                room_store.delete(room_code)
+        
+        # Clear player session
+        player_sessions[session_id]['room_code'] = None
+        
+        room_log.info('%s left room %s', player_name, room_code)
 
-@socketio.on('get_room_info')
+@socket_event('rejoin_room')
+def handle_rejoin_room(data):
+    """Take back a seat from an earlier socket (e.g. after a server restart) with its seat token"""
+    session_id = request.sid
+    room_code = str(data.get('room_code') or '').upper().strip()
+    seat_token = data.get('seat_token')
+    
+    with room_store.update(room_code) as room:
+        old_id = room.seats.get(seat_token) if room is not None else None
+        if old_id is None:
+            emit('rejoin_failed', {'room_code': room_code})
+            return
+        
+        if old_id != session_id:
+            rebind_player(room, old_id, session_id)
+            room_events.record(room, 'rejoined', {'player': session_id, 'previous': old_id})
+        player_name = room.players[session_id].name
+        room_data = serialize_room(room)
+        state = room.round_state or room.game_state
+        rejoined = {
+            'room_code': room_code,
+            'room': room_data,
+            'is_host': room.host == session_id,
+            'board_mode': room.settings.board_mode,
+            'board_state': state.board_state.to_rows() if state else None,
+            'board_version': state.board_version if state else 0,
+            'active_player_id': room.game_state.active_player_id if room.game_state else None
+        }
+    
+    # The old socket, if it is still connected here, no longer speaks for this seat
+    if old_id in player_sessions and old_id != session_id:
+        player_sessions[old_id]['room_code'] = None
+        leave_room(room_code, sid=old_id)
+    
+    player_sessions[session_id] = {'room_code': room_code, 'name': player_name}
+    join_room(room_code)
+    emit('room_rejoined', rejoined)
+    broadcaster.emit(room_code, 'player_rejoined', {
+        'previous_id': old_id,
+        'player_id': session_id,
+        'room': room_data
+    }, skip_sid=session_id)
+    room_log.info('%s rejoined room %s (%s -> %s)', player_name, room_code, old_id, session_id)
+
+@socket_event('get_room_info')
 def handle_get_room_info():
     """Get current room information"""
     session_id = request.sid
     if session_id in player_sessions:
         room_code = player_sessions[session_id].get('room_code')
-        if room_code and room_code in game_rooms:
+        room = room_store.get(room_code) if room_code else None
+        if room is not None:
             # FIX: Use serialize_room to convert set to list for JSON
-            room_data = serialize_room(room_code)
+            room_data = serialize_room(room)
             emit('room_info', {'room': room_data})
 
-@socketio.on('update_timer_settings')
-def handle_update_timer_settings(data):
-    """Host updates timer settings in lobby"""
+@socket_event('request_board_sync')
+def handle_request_board_sync():
+    """Full board snapshot for a client that missed a versioned update"""
     session_id = request.sid
     if session_id not in player_sessions:
         return
     
     room_code = player_sessions[session_id].get('room_code')
-    if not room_code or room_code not in game_rooms:
+    room = room_store.get(room_code) if room_code else None
+    if room is None:
         return
     
-    room = game_rooms[room_code]
-    
-    # Only host can update settings
-    if room['host'] != session_id:
-        emit('error', {'message': 'Only host can change timer settings'})
+    state = room.round_state or room.game_state
+    if not state:
         return
     
-    # Update timer settings
-    timer_type = data.get('timer_type', 'voting')
-    if timer_type not in ['voting', 'fixed']:
-        timer_type = 'voting'
-    
-    room['settings']['timer_type'] = timer_type
-    
-    if timer_type == 'fixed':
-        fixed_minutes = data.get('fixed_minutes', 2)
-        fixed_minutes = max(1, min(10, int(fixed_minutes)))  # Clamp 1-10
-        room['settings']['fixed_minutes'] = fixed_minutes
-    
-    # Notify all players
-    socketio.emit('timer_settings_updated', {
-        'timer_type': timer_type,
-        'fixed_minutes': room['settings'].get('fixed_minutes', 2)
-    }, room=room_code)
-    
-    print(f'[TIMER] Settings updated in room {room_code}: {timer_type}')
+    emit('board_sync', {
+        'board_state': state.board_state.to_rows(),
+        'version': state.board_version
+    })
 
-@socketio.on('start_game')
-def handle_start_game(data):
-    """Start multiplayer game with timer settings"""
+@socket_event('update_timer_settings')
+def handle_update_timer_settings(data):
+    """Host updates timer settings in lobby"""
     session_id = request.sid
     if session_id not in player_sessions:
         return
     
     room_code = player_sessions[session_id].get('room_code')
-    if not room_code or room_code not in game_rooms:
+    if not room_code:
         return
     
-    room = game_rooms[room_code]
+    with room_store.update(room_code) as room:
+        if room is None:
+            return
+        
+        # Only host can update settings
+        if room.host != session_id:
+            emit('error', {'message': 'Only host can change timer settings'})
+            return
+        
+        # Update timer settings
+        timer_type = data.get('timer_type', 'voting')
+        if timer_type not in ['voting', 'fixed']:
+            timer_type = 'voting'
+        
+        room.settings.timer_type = timer_type
+        
+        if timer_type == 'fixed':
+            fixed_minutes = data.get('fixed_minutes', 2)
+            fixed_minutes = max(1, min(10, int(fixed_minutes)))  # Clamp 1-10
+            room.settings.fixed_minutes = fixed_minutes
+        room_events.record(room, 'settings', {'timer_type': timer_type,
+                                              'fixed_minutes': room.settings.fixed_minutes})
+        
+        # Notify all players
+        broadcaster.emit(room_code, 'timer_settings_updated', {
+            'timer_type': timer_type,
+            'fixed_minutes': room.settings.fixed_minutes
+        })
     
-    # Only host can start
-    if room['host'] != session_id:
-        emit('error', {'message': 'Only host can start game'})
+    timer_log.debug('Settings updated in room %s: %s', room_code, timer_type)
+
+@socket_event('start_game')
+def handle_start_game(data):
+    """Start multiplayer game with timer settings"""
+    session_id = request.sid
+    if session_id not in player_sessions:
         return
     
-    # Need at least 2 players
-    if len(room['players']) < 2:
-        emit('error', {'message': 'Need at least 2 players'})
+    room_code = player_sessions[session_id].get('room_code')
+    if not room_code:
         return
     
-    # Update timer settings from data
-    timer_type = data.get('timerType', 'voting')
-    board_mode = data.get('boardMode', 'shared')
-    
-    if timer_type not in ['voting', 'fixed']:
-        timer_type = 'voting'
-    
-    room['settings']['timer_type'] = timer_type
-    room['settings']['board_mode'] = board_mode
-    
-    if timer_type == 'fixed':
-        fixed_minutes = data.get('timerDuration', 2)
-        fixed_minutes = max(0.5, min(10, float(fixed_minutes)))
-        room['settings']['fixed_minutes'] = fixed_minutes
-    
-    room['status'] = 'playing'
-    
-    # Generate shared board for both modes
-    shared_board = generate_weighted_board(room_code)
-    
-    # Initialize game state based on mode
-    if board_mode == 'shared':
-        # SHARED BOARD MODE: Simultaneous play
-        room['round_state'] = {
-            'round_number': 1,
-            'board_state': shared_board,
-            'submissions': {player['id']: {'words': [], 'positions': [], 'score': 0, 'done': False} for player in room['players']},
-            'timer_start': time.time(),
-            'timer_expires': time.time() + (fixed_minutes * 60 if timer_type == 'fixed' else 120),
-            'all_done': False,
-            'timer_active': True,
-            'swap_history': []  # FEATURE #2: Track tile swaps for persistence
-        }
-    else:
-        # RANDOMIZED PER WORD MODE: Turn-based play
-        room['game_state'] = {
-            'mode': 'randomized_per_word',
-            'board_state': shared_board,
-            'current_round': 1,
-            'turn_number': 1,
-            'active_player_id': room['players'][0]['id'],  # First player starts
-            'words_played': [],
-            'timer_active': True
-        }
-    
-    # FIX: Use serialize_room to convert set to list for JSON
-    room_data = serialize_room(room_code)
-    
-    # Calculate timer duration
-    duration_seconds = int(room['settings'].get('fixed_minutes', 2) * 60) if timer_type == 'fixed' else 120
+    with room_store.update(room_code) as room:
+        if room is None:
+            return
+        
+        # Only host can start
+        if room.host != session_id:
+            emit('error', {'message': 'Only host can start game'})
+            return
+        
+        # Need at least 2 players
+        if len(room.players) < 2:
+            emit('error', {'message': 'Need at least 2 players'})
+            return
+        
+        # Update timer settings from data
+        timer_type = data.get('timerType', 'voting')
+        board_mode = data.get('boardMode', 'shared')
+        
+        if timer_type not in ['voting', 'fixed']:
+            timer_type = 'voting'
+        
+        room.settings.timer_type = timer_type
+        room.settings.board_mode = board_mode
+        
+        if timer_type == 'fixed':
+            fixed_minutes = data.get('timerDuration', 2)
+            fixed_minutes = max(0.5, min(10, float(fixed_minutes)))
+            room.settings.fixed_minutes = fixed_minutes
+        
+        room.status = 'playing'
+        room_reaper.track(room_code, room)  # A playing room expires sooner than a waiting one
+        
+        # Generate shared board for both modes
+        shared_board = generate_weighted_board(room)
+        
+        # Initialize game state based on mode
+        if board_mode == 'shared':
+            # SHARED BOARD MODE: Simultaneous play
+            room.round_state = RoundState(
+                shared_board,
+                timer_start=time.time(),
+                timer_expires=time.time() + (fixed_minutes * 60 if timer_type == 'fixed' else 120)
+            )
+            room.round_state.reset_submissions(room.players)
+        else:
+            # RANDOMIZED PER WORD MODE: Turn-based play
+            room.game_state = TurnState(shared_board, next(iter(room.players)))  # First player starts
+        
+        room_events.record(room, 'started', {
+            'mode': board_mode, 'board': shared_board.letter_string(), 'board_seed': room.board_seed,
+            'settings': {'timer_type': timer_type, 'fixed_minutes': room.settings.fixed_minutes},
+            'players': list(room.players)
+        })
+        
+        # FIX: Use serialize_room to convert set to list for JSON
+        room_data = serialize_room(room)
+        
+        # Calculate timer duration
+        duration_seconds = int(room.settings.fixed_minutes * 60) if timer_type == 'fixed' else 120
+        
+        # Notify all players game is starting - FEATURE #6: Do NOT send player scores here
+        broadcaster.emit(room_code, 'game_started', {
+            'room': room_data,
+            'timer_type': timer_type,
+            'board_mode': board_mode,
+            'duration': duration_seconds,
+            'board_state': room.round_state.board_state.to_rows() if board_mode == 'shared' else None,
+            'board_version': 0,
+            'active_player_id': room.game_state.active_player_id if board_mode == 'randomized' else None,  # FEATURE #7: Include active_player_id
+            'fixed_minutes': room.settings.fixed_minutes if timer_type == 'fixed' else None
+            # FEATURE #6: Do NOT send player_scores here - they're hidden during gameplay
+        })
+        
+        # Start fixed timer if configured
+        if timer_type == 'fixed' and board_mode == 'shared':
+            fixed_timer_countdown(room, duration_seconds)
     
-    # Notify all players game is starting - FEATURE #6: Do NOT send player scores here
-    socketio.emit('game_started', {
-        'room': room_data,
-        'timer_type': timer_type,
-        'board_mode': board_mode,
-        'duration': duration_seconds,
-        'board_state': room['round_state']['board_state'] if board_mode == 'shared' else None,
-        'active_player_id': room['game_state']['active_player_id'] if board_mode == 'randomized' else None,  # FEATURE #7: Include active_player_id
-        'fixed_minutes': room['settings'].get('fixed_minutes', 2) if timer_type == 'fixed' else None
-        # FEATURE #6: Do NOT send player_scores here - they're hidden during gameplay
-    }, room=room_code)
-    
-    # Start fixed timer if configured
-    if timer_type == 'fixed' and board_mode == 'shared':
-        thread = threading.Thread(target=fixed_timer_countdown, args=(room_code, duration_seconds))
-        thread.daemon = True
-        thread.start()
-    
-    print(f'[MULTIPLAYER] Game started in room {room_code} with {timer_type} timer, {board_mode} board')
-
-@socketio.on('start_turn')
+    room_log.info('Game started in room %s with %s timer, %s board', room_code, timer_type, board_mode)
+
+@socket_event('start_turn')
 def handle_start_turn(data):
     """Start a player's turn with appropriate timer"""
     session_id = request.sid
@@ -1052,33 +1279,27 @@ def handle_start_turn(data):
         return
     
     room_code = player_sessions[session_id].get('room_code')
-    if not room_code or room_code not in game_rooms:
+    if not room_code:
         return
     
-    room = game_rooms[room_code]
-    player_id = data.get('player_id')
-    
-    room['timer_state']['current_player_turn'] = player_id
-    
-    # Stop any existing timer
-    stop_timer(room_code)
-    
-    # Start appropriate timer based on settings
-    if room['settings']['timer_type'] == 'voting':
-        # Start grace period in background thread
-        thread = threading.Thread(target=start_grace_period, args=(room_code,))
-        thread.daemon = True
-        thread.start()
-        timer_threads[room_code] = {'thread': thread, 'stop': False}
-    else:
-        # Start fixed timer
-        minutes = room['settings']['fixed_minutes']
-        thread = threading.Thread(target=start_fixed_timer, args=(room_code, minutes))
-        thread.daemon = True
-        thread.start()
-        timer_threads[room_code] = {'thread': thread, 'stop': False}
-
-@socketio.on('swap_tile')
+    with room_store.update(room_code) as room:
+        if room is None:
+            return
+        player_id = data.get('player_id')
+        
+        room.timer_state.current_player_turn = player_id
+        
+        # Stop any existing timer
+        stop_timer(room)
+        
+        # Start appropriate timer based on settings
+        if room.settings.timer_type == 'voting':
+            mode = 'shared_board' if room.settings.board_mode == 'shared' else 'randomized_per_word'
+            start_grace_period_voting(room, mode)
+        else:
+            start_fixed_timer(room, room.settings.fixed_minutes)
+
+@socket_event('swap_tile')
 def handle_swap_tile(data):
     """CRITICAL FIX #2: Handle tile swap requests with persistence"""
     session_id = request.sid
@@ -1088,33 +1309,38 @@ def handle_swap_tile(data):
     room_code = data.get('room_code')
     position = data.get('position')  # [row, col]
     
-    if not room_code or room_code not in game_rooms:
+    if not room_code:
         emit('error', {'message': 'Room not found'})
         return
     
-    with game_rooms_lock:
-        room = game_rooms[room_code]
-        round_state = room.get('round_state', {})
-        board_state = round_state.get('board_state', [])
+    if not isinstance(position, list) or len(position) != 2 or cell_index(*position) < 0:
+        emit('error', {'message': 'Invalid tile position'})
+        return
+    
+    with room_store.update(room_code) as room:
+        if room is None:
+            emit('error', {'message': 'Room not found'})
+            return
+        round_state = room.round_state
+        if not round_state:
+            emit('error', {'message': 'No shared board in this room'})
+            return
+        board_state = round_state.board_state
         
         row, col = position
         
         # Store old letter
         old_letter = board_state[row][col]
         
-        # Generate new random letter with weighted frequency
-        letters = list(FREQUENCY_MAP.keys())
-        weights = list(FREQUENCY_MAP.values())
-        new_letter = random.choices(letters, weights=weights, k=1)[0]
-        
-        # Update board
-        board_state[row][col] = new_letter
+        # Generate new random letter with weighted frequency (under the 5-cap)
+        board_paths.forget(board_state)
+        MULTIPLAYER_LETTERS.refill(board_state, [cell_index(row, col)], room_rng(room))
+        new_letter = board_state[row][col]
+        base_version, version = bump_board_version(round_state)
+        room_events.record(room, 'swap', {'player': session_id, 'cell': cell_index(row, col), 'letter': new_letter})
         
         # Track this swap in swap_history
-        if 'swap_history' not in round_state:
-            round_state['swap_history'] = []
-        
-        round_state['swap_history'].append({
+        round_state.swap_history.append({
             'position': (row, col),
             'old_letter': old_letter,
             'new_letter': new_letter,
@@ -1122,37 +1348,44 @@ def handle_swap_tile(data):
         })
     
     # Broadcast to all players in room
-    socketio.emit('tile_swapped', {
+    broadcaster.emit(room_code, 'tile_swapped', {
         'position': [row, col],
         'old_letter': old_letter,
         'new_letter': new_letter,
-        'board_state': board_state
-    }, room=room_code)
+        'base_version': base_version,
+        'version': version
+    })
     
-    print(f'[SWAP] Player {session_id} swapped tile at ({row},{col}): {old_letter} → {new_letter}')
+    swap_log.debug('Player %s swapped tile at (%s,%s): %s → %s', session_id, row, col, old_letter, new_letter)
 
-@socketio.on('player_tile_selection')
+@socket_event('player_tile_selection')
 def handle_tile_selection_broadcast(data):
     """
     CRITICAL FIX #5: Broadcast real-time tile selection to other players.
     Used in Randomized Per Word mode so inactive players see active player's tiles.
     """
-    session_id = request.sid
+    broadcast_tile_selection(request.sid, data)
+
+def broadcast_tile_selection(session_id, data):
+    """Also called by the rate limiter with the newest selection it held back"""
     if session_id not in player_sessions:
         return
     
+    # Nothing in the room changes, so the session's room code is enough (no store round trip)
     room_code = player_sessions[session_id].get('room_code')
-    if not room_code or room_code not in game_rooms:
+    if not room_code:
         return
     
     # Broadcast to ALL players EXCEPT the sender
-    socketio.emit('opponent_tile_highlight', {
+    broadcaster.emit(room_code, 'opponent_tile_highlight', {
         'player_id': session_id,
         'positions': data.get('positions', []),
         'action': data.get('action', 'update')  # 'update', 'clear'
-    }, room=room_code, skip_sid=session_id)
+    }, skip_sid=session_id)
 
-@socketio.on('vote_timer')
+event_limiter.merge('player_tile_selection', broadcast_tile_selection)
+
+@socket_event('vote_timer')
 def handle_vote_timer():
     """Player votes to start countdown timer"""
     session_id = request.sid
@@ -1160,49 +1393,48 @@ def handle_vote_timer():
         return
     
     room_code = player_sessions[session_id].get('room_code')
-    if not room_code or room_code not in game_rooms:
-        return
-    
-    room = game_rooms[room_code]
-    
-    # Can't vote during grace period or if countdown already started
-    if room['timer_state']['grace_active']:
-        emit('error', {'message': 'Wait for grace period to end'})
-        return
-    
-    if room['timer_state']['countdown_active']:
-        return
-    
-    # Can't vote if it's your turn
-    if room['timer_state']['current_player_turn'] == session_id:
+    if not room_code:
         return
     
-    # Add vote
-    room['timer_state']['votes'].add(session_id)
-    
-    # Count eligible voters (all players except current turn)
-    eligible_voters = [p['id'] for p in room['players'] if p['id'] != room['timer_state']['current_player_turn']]
-    votes_count = len(room['timer_state']['votes'])
-    required_votes = len(eligible_voters)
-    
-    # Notify all players of vote count
-    socketio.emit('timer_vote_update', {
-        'votes': votes_count,
-        'required': required_votes
-    }, room=room_code)
-    
-    print(f'[TIMER] Vote received in room {room_code}: {votes_count}/{required_votes}')
-    
-    # If all eligible players have voted, start countdown
-    if votes_count >= required_votes:
-        stop_timer(room_code)
-        thread = threading.Thread(target=start_voting_countdown, args=(room_code,))
-        thread.daemon = True
-        thread.start()
-        timer_threads[room_code] = {'thread': thread, 'stop': False}
+    with room_store.update(room_code) as room:
+        if room is None:
+            return
+        
+        # Can't vote during grace period or if countdown already started
+        if room.timer_state.grace_active:
+            emit('error', {'message': 'Wait for grace period to end'})
+            return
+        
+        if room.timer_state.countdown_active:
+            return
+        
+        # Can't vote if it's your turn
+        if room.timer_state.current_player_turn == session_id:
+            return
+        
+        # Add vote
+        room.timer_state.votes.add(session_id)
+        room_events.record(room, 'vote', {'player': session_id})
+        
+        # Count eligible voters (all players except current turn)
+        required_votes = len(room.players) - (room.timer_state.current_player_turn in room.players)
+        votes_count = len(room.timer_state.votes)
+        
+        # Notify all players of vote count
+        broadcaster.emit(room_code, 'timer_vote_update', {
+            'votes': votes_count,
+            'required': required_votes
+        })
+        
+        timer_log.debug('Vote received in room %s: %s/%s', room_code, votes_count, required_votes)
+        
+        # If all eligible players have voted, start countdown
+        if votes_count >= required_votes:
+            stop_timer(room)
+            start_voting_countdown(room)
 
 # FEATURE 1: SIMULTANEOUS PLAY - Word submission with FULL VALIDATION
-@socketio.on('player_submitted_word')
+@socket_event('player_submitted_word')
 def handle_player_submitted_word(data):
     """Handle word submission with complete validation chain"""
     session_id = request.sid
@@ -1214,26 +1446,26 @@ def handle_player_submitted_word(data):
     positions = data.get('positions', [])
     
     # Basic validation
-    if not room_code or room_code not in game_rooms:
-        emit('word_rejected', {'reason': 'invalid_room', 'message': 'Room not found'})
+    if not room_code:
+        reject_word('player_submitted_word', {'reason': 'invalid_room', 'message': 'Room not found'})
         return
     
-    # CRITICAL: Use lock to prevent race conditions
-    with game_rooms_lock:
-        room = game_rooms[room_code]
+    # CRITICAL: Atomic per-room update to prevent race conditions
+    with room_store.update(room_code) as room:
+        if room is None:
+            reject_word('player_submitted_word', {'reason': 'invalid_room', 'message': 'Room not found'})
+            return
         
         # Only for shared board mode
-        if room['settings'].get('board_mode') != 'shared':
+        round_state = room.round_state
+        if room.settings.board_mode != 'shared' or round_state is None or room.status != 'playing':
             return
-        
-        round_state = room.get('round_state', {})
-        board_state = round_state.get('board_state', [])
+        board_state = round_state.board_state
         
         # VALIDATION STEP 1: Check timer expiration
         submission_time = time.time()
-        timer_expires = round_state.get('timer_expires', float('inf'))
-        if submission_time > timer_expires:
-            emit('word_rejected', {
+        if submission_time > round_state.timer_expires:
+            reject_word('player_submitted_word', {
                 'reason': 'turn_expired',
                 'message': 'Time expired! Submission too late.',
                 'word': word
@@ -1242,7 +1474,7 @@ def handle_player_submitted_word(data):
         
         # VALIDATION STEP 2: Word length (minimum 2, maximum 25)
         if len(word) < 2 or len(word) > 25:
-            emit('word_rejected', {
+            reject_word('player_submitted_word', {
                 'reason': 'invalid_length',
                 'message': f'Word must be 2-25 letters (got {len(word)})',
                 'word': word
@@ -1251,16 +1483,19 @@ def handle_player_submitted_word(data):
         
         # VALIDATION STEP 3: Dictionary check
         if word not in english_words:
-            emit('word_rejected', {
+            reject_word('player_submitted_word', {
                 'reason': 'invalid_word',
                 'message': f'"{word}" is not in dictionary',
                 'word': word
             })
             return
         
+        # VALIDATION STEPS 4-5 fast path: positions are a cached path of this word on this board
+        on_board = board_paths.has_path(board_state, word, positions, diagonal=False)
+        
         # VALIDATION STEP 4: Strict adjacency (NO diagonals)
-        if not is_valid_path_strict(positions):
-            emit('word_rejected', {
+        if not on_board and not is_valid_path_strict(positions):
+            reject_word('player_submitted_word', {
                 'reason': 'invalid_path',
                 'message': 'Letters must be adjacent (no diagonals or gaps)',
                 'word': word,
@@ -1269,19 +1504,20 @@ def handle_player_submitted_word(data):
             return
         
         # VALIDATION STEP 5: Board tile consistency
-        tiles_valid, error_msg = validate_board_tiles(word, positions, board_state)
+        tiles_valid, error_msg = (True, None) if on_board else validate_board_tiles(word, positions, board_state)
         if not tiles_valid:
-            emit('word_rejected', {
+            reject_word('player_submitted_word', {
                 'reason': 'board_mismatch',
                 'message': f'Board mismatch: {error_msg}',
                 'word': word
             })
             return
         
-        # VALIDATION STEP 6: Duplicate check
-        if session_id in round_state['submissions']:
-            if word in round_state['submissions'][session_id]['words']:
-                emit('word_rejected', {
+        # VALIDATION STEP 6: Duplicate check (a set lookup)
+        submission = round_state.submissions.get(session_id)
+        if submission is not None:
+            if word in submission:
+                reject_word('player_submitted_word', {
                     'reason': 'duplicate_word',
                     'message': f'You already played "{word}" this round',
                     'word': word
@@ -1292,32 +1528,27 @@ def handle_player_submitted_word(data):
         score = calculate_score_with_multipliers(word)
         
         # Store submission (SECRET - not broadcast)
-        if session_id not in round_state['submissions']:
-            round_state['submissions'][session_id] = {
-                'words': [],
-                'positions': [],
-                'score': 0,
-                'done': False
-            }
-        
-        round_state['submissions'][session_id]['words'].append(word)
-        round_state['submissions'][session_id]['positions'].append(positions)
-        round_state['submissions'][session_id]['score'] += score
-    
-    # Send confirmation ONLY to submitting player (outside lock)
-    emit('word_accepted', {
-        'word': word,
-        'score': score,
-        'message': 'Word submitted! (Score hidden until round ends)'
-    })
-    
-    print(f'[VALIDATION] ✓ Player {session_id} submitted "{word}" (score: {score}, hidden)')
-    
-    # CRITICAL FIX #3: Check if all players have submitted
-    check_and_end_round_if_all_submitted(room_code)
+        if submission is None:
+            submission = round_state.submissions[session_id] = Submission()
+        submission.add(word, positions, score)
+        room_events.record(room, 'word', {'player': session_id, 'word': word, 'score': score,
+                                          'cells': [cell_index(row, col) for row, col in positions]})
+        
+        # Send confirmation ONLY to submitting player
+        emit('word_accepted', {
+            'word': word,
+            'score': score,
+            'message': 'Word submitted! (Score hidden until round ends)'
+        })
+        
+        validation_log.debug('✓ Player %s submitted "%s" (score: %s, hidden)', session_id, word, score)
+        
+        # CRITICAL FIX #3: Check if all players have submitted (same update, so no
+        # other submission can slip in between)
+        check_and_end_round_if_all_submitted(room)
 
 # RANDOMIZED PER WORD MODE: Turn-based word submission
-@socketio.on('player_word_submitted_turnbased')
+@socket_event('player_word_submitted_turnbased')
 def handle_turnbased_word_submission(data):
     """Handle word submission in turn-based Randomized Per Word mode"""
     session_id = request.sid
@@ -1328,32 +1559,32 @@ def handle_turnbased_word_submission(data):
     word = data.get('word', '').lower()
     positions = data.get('positions', [])
     
-    if not room_code or room_code not in game_rooms:
-        emit('word_rejected', {'reason': 'invalid_room', 'message': 'Room not found'})
+    if not room_code:
+        reject_word('player_word_submitted_turnbased', {'reason': 'invalid_room', 'message': 'Room not found'})
         return
     
-    with game_rooms_lock:
-        room = game_rooms[room_code]
-        
-        if room['settings'].get('board_mode') != 'randomized':
+    with room_store.update(room_code) as room:
+        if room is None:
+            reject_word('player_word_submitted_turnbased', {'reason': 'invalid_room', 'message': 'Room not found'})
             return
         
-        game_state = room.get('game_state', {})
-        board_state = game_state.get('board_state', [])
-        active_player_id = game_state.get('active_player_id')
+        game_state = room.game_state
+        if room.settings.board_mode != 'randomized' or game_state is None or room.status != 'playing':
+            return
+        board_state = game_state.board_state
         
         # Check if it's this player's turn
-        if session_id != active_player_id:
-            emit('word_rejected', {
+        if session_id != game_state.active_player_id:
+            reject_word('player_word_submitted_turnbased', {
                 'reason': 'not_your_turn',
                 'message': "It's not your turn!"
             })
             return
         
         # Check timer expiration
-        if 'timer_expires' in game_state:
-            if time.time() > game_state['timer_expires']:
-                emit('word_rejected', {
+        if game_state.timer_expires is not None:
+            if time.time() > game_state.timer_expires:
+                reject_word('player_word_submitted_turnbased', {
                     'reason': 'turn_expired',
                     'message': 'Time expired!'
                 })
@@ -1361,7 +1592,7 @@ def handle_turnbased_word_submission(data):
         
         # Word length validation
         if len(word) < 2 or len(word) > 25:
-            emit('word_rejected', {
+            reject_word('player_word_submitted_turnbased', {
                 'reason': 'invalid_length',
                 'message': f'Word must be 2-25 letters'
             })
@@ -1369,24 +1600,25 @@ def handle_turnbased_word_submission(data):
         
         # Dictionary check
         if word not in english_words:
-            emit('word_rejected', {
+            reject_word('player_word_submitted_turnbased', {
                 'reason': 'invalid_word',
                 'message': f'"{word}" not in dictionary'
             })
             return
         
-        # Strict adjacency
-        if not is_valid_path_strict(positions):
-            emit('word_rejected', {
+        # Strict adjacency and board tiles in one lookup when the path is cached
+        on_board = board_paths.has_path(board_state, word, positions, diagonal=False)
+        if not on_board and not is_valid_path_strict(positions):
+            reject_word('player_word_submitted_turnbased', {
                 'reason': 'invalid_path',
                 'message': 'No diagonals or gaps allowed'
             })
             return
         
         # Board tile consistency
-        tiles_valid, error_msg = validate_board_tiles(word, positions, board_state)
+        tiles_valid, error_msg = (True, None) if on_board else validate_board_tiles(word, positions, board_state)
         if not tiles_valid:
-            emit('word_rejected', {
+            reject_word('player_word_submitted_turnbased', {
                 'reason': 'board_mismatch',
                 'message': f'Board mismatch: {error_msg}'
             })
@@ -1396,89 +1628,87 @@ def handle_turnbased_word_submission(data):
         score = calculate_score_with_multipliers(word)
         
         # Update player score
-        for player in room['players']:
-            if player['id'] == session_id:
-                player['score'] = player.get('score', 0) + score
-                break
+        room.players[session_id].score += score
         
         # Refresh consumed positions on board
-        for row, col in positions:
-            letters = list(FREQUENCY_MAP.keys())
-            weights = list(FREQUENCY_MAP.values())
-            board_state[row][col] = random.choices(letters, weights=weights, k=1)[0]
+        board_paths.forget(board_state)
+        MULTIPLAYER_LETTERS.refill(board_state, [cell_index(row, col) for row, col in positions], room_rng(room))
+        changes = [[row, col, board_state[row][col]] for row, col in positions]
+        base_version, version = bump_board_version(game_state)
         
         # Record word played
-        game_state['words_played'].append({
+        game_state.words_played.append({
             'player_id': session_id,
             'word': word,
             'score': score,
-            'turn': game_state['turn_number']
+            'turn': game_state.turn_number
         })
         
         # Switch to next player
-        player_ids = [p['id'] for p in room['players']]
-        current_index = player_ids.index(session_id)
-        next_player_id = player_ids[(current_index + 1) % len(player_ids)]
-        
-        game_state['active_player_id'] = next_player_id
-        game_state['turn_number'] += 1
-        game_state['timer_expires'] = time.time() + (room['settings'].get('fixed_minutes', 1) * 60)
-    
-    # Broadcast word accepted to ALL players
-    socketio.emit('word_accepted_turnbased', {
-        'player_id': session_id,
-        'word': word,
-        'score': score,
-        'board_state': board_state,
-        'consumed_positions': positions,
-        'next_player_id': next_player_id,
-        'turn_number': game_state['turn_number']
-    }, room=room_code)
-    
-    # Start new turn timer
-    if room['settings']['timer_type'] == 'fixed':
-        duration = int(room['settings'].get('fixed_minutes', 1) * 60)
-        thread = threading.Thread(target=fixed_timer_countdown_turnbased, args=(room_code, duration))
-        thread.daemon = True
-        thread.start()
-    
-    print(f'[TURNBASED] Player {session_id} played "{word}" for {score} points, turn passed to {next_player_id}')
-
-def fixed_timer_countdown_turnbased(room_code, duration_seconds):
-    """Timer countdown for turn-based mode"""
-    for remaining in range(duration_seconds, 0, -1):
-        if room_code not in game_rooms:
-            return
+        next_player_id = room.next_player_id(session_id)
+        
+        game_state.active_player_id = next_player_id
+        game_state.turn_number += 1
+        game_state.timer_expires = time.time() + (room.settings.fixed_minutes * 60)
+        room_events.record(room, 'word', {
+            'player': session_id, 'word': word, 'score': score,
+            'cells': [cell_index(row, col) for row, col in positions],
+            'changes': [[cell_index(row, col), letter] for row, col, letter in changes], 'next': next_player_id
+        })
         
-        room = game_rooms[room_code]
-        if room['status'] != 'playing':
-            return
+        # Broadcast word accepted to ALL players
+        broadcaster.emit(room_code, 'word_accepted_turnbased', {
+            'player_id': session_id,
+            'word': word,
+            'score': score,
+            'changes': changes,
+            'base_version': base_version,
+            'version': version,
+            'consumed_positions': positions,
+            'next_player_id': next_player_id,
+            'turn_number': game_state.turn_number
+        })
         
-        socketio.emit('timer_fixed_tick', {'seconds': remaining}, room=room_code)
-        time.sleep(1)
+        # Start new turn timer, unless that was the last turn
+        if turns_used_up(room):
+            finish_game(room)
+        elif room.settings.timer_type == 'fixed':
+            duration = int(room.settings.fixed_minutes * 60)
+            fixed_timer_countdown_turnbased(room, duration)
     
-    # Timer expired - skip turn
-    if room_code in game_rooms:
-        with game_rooms_lock:
-            room = game_rooms[room_code]
-            game_state = room.get('game_state', {})
-            
-            # Get next player
-            player_ids = [p['id'] for p in room['players']]
-            active_id = game_state.get('active_player_id')
-            if active_id in player_ids:
-                current_index = player_ids.index(active_id)
-                next_player_id = player_ids[(current_index + 1) % len(player_ids)]
-                game_state['active_player_id'] = next_player_id
-                game_state['turn_number'] += 1
-        
-        socketio.emit('turn_timeout', {
-            'skipped_player_id': active_id,
-            'next_player_id': next_player_id
-        }, room=room_code)
+    turn_log.debug('Player %s played "%s" for %s points, turn passed to %s', session_id, word, score, next_player_id)
+
+def fixed_timer_countdown_turnbased(room, duration_seconds):
+    """Timer countdown for turn-based mode (replaces the previous turn's timer)"""
+    timer_scheduler.cancel_key(room.room_code)
+    broadcaster.emit(room.room_code, 'timer_fixed_started', {'duration': duration_seconds})
+    schedule_room_timer(room, TURN_TIMER, duration_seconds, expire_turnbased_timer)
+
+def expire_turnbased_timer(room):
+    """Turn deadline reached - skip turn"""
+    if room.status != 'playing':
+        return
+    game_state = room.game_state
+    if game_state is None:
+        return
+    
+    # Get next player
+    active_id = game_state.active_player_id
+    next_player_id = room.next_player_id(active_id)
+    if next_player_id is not None:
+        game_state.active_player_id = next_player_id
+        game_state.turn_number += 1
+    
+    room_events.record(room, 'timer', {'kind': 'turn_timeout', 'player': active_id, 'next': next_player_id})
+    broadcaster.emit(room.room_code, 'turn_timeout', {
+        'skipped_player_id': active_id,
+        'next_player_id': next_player_id
+    })
+    if turns_used_up(room):
+        finish_game(room)
 
 # FEATURE 1: Player marks themselves as done
-@socketio.on('player_done')
+@socket_event('player_done')
 def handle_player_done(data):
     """Handle player clicking 'I'm Done' button"""
     session_id = request.sid
@@ -1486,136 +1716,147 @@ def handle_player_done(data):
         return
     
     room_code = data.get('room_code')
-    if not room_code or room_code not in game_rooms:
+    if not room_code:
         return
     
-    room = game_rooms[room_code]
-    round_state = room.get('round_state', {})
-    
-    # Mark player as done
-    if session_id in round_state['submissions']:
-        round_state['submissions'][session_id]['done'] = True
-    
-    # Check if all players are done
-    all_done = all(sub['done'] for sub in round_state['submissions'].values())
-    
-    if all_done:
-        # End round immediately
-        end_round(room_code)
-    else:
-        # Notify others that this player is done
-        player_name = next((p['name'] for p in room['players'] if p['id'] == session_id), 'Player')
-        socketio.emit('player_marked_done', {
-            'player_name': player_name,
-            'players_done': sum(1 for sub in round_state['submissions'].values() if sub['done']),
-            'total_players': len(room['players'])
-        }, room=room_code)
+    with room_store.update(room_code) as room:
+        if room is None or not room.round_state or room.status != 'playing':
+            return
+        round_state = room.round_state
+        
+        # Mark player as done
+        if session_id in round_state.submissions:
+            round_state.submissions[session_id].done = True
+            room_events.record(room, 'done', {'player': session_id})
+        
+        # Check if all players are done
+        all_done = all(sub.done for sub in round_state.submissions.values())
+        
+        if all_done:
+            # End round immediately
+            end_round(room)
+        else:
+            # Notify others that this player is done
+            player = room.players.get(session_id)
+            broadcaster.emit(room_code, 'player_marked_done', {
+                'player_name': player.name if player else 'Player',
+                'players_done': sum(1 for sub in round_state.submissions.values() if sub.done),
+                'total_players': len(room.players)
+            })
     
-    print(f'[GAME] Player {session_id} marked done. All done: {all_done}')
+    game_log.debug('Player %s marked done. All done: %s', session_id, all_done)
 
-def check_and_end_round_if_all_submitted(room_code):
+def check_and_end_round_if_all_submitted(room):
     """
     CRITICAL FIX #3: Check if ALL players have submitted in Shared Board mode.
     If yes, end round immediately (no waiting, no "Done" button).
     """
-    room = game_rooms.get(room_code)
-    if not room or room['settings'].get('board_mode') != 'shared':
+    if room.settings.board_mode != 'shared' or room.round_state is None:
         return False
     
-    round_state = room.get('round_state', {})
-    submissions = round_state.get('submissions', {})
-    
     # Check if all players have submitted at least one word
-    all_submitted = all(
-        len(submission.get('words', [])) > 0 
-        for submission in submissions.values()
-    )
+    all_submitted = all(submission.words for submission in room.round_state.submissions.values())
     
     if all_submitted:
-        print(f'[GAME] All players submitted in room {room_code}, ending round immediately')
-        stop_timer(room_code)
-        end_round(room_code)
+        game_log.debug('All players submitted in room %s, ending round immediately', room.room_code)
+        stop_timer(room)
+        end_round(room)
         return True
     
     return False
 
 # FEATURE 1 & 4: End round and reveal scores
-def end_round(room_code):
-    """End the current round, reveal scores, refresh board"""
-    if room_code not in game_rooms:
-        return
-    
-    with game_rooms_lock:
-        room = game_rooms[room_code]
-        round_state = room.get('round_state', {})
-        
-        # Compile results
-        results = compile_round_results(room)
-        
-        # CHANGE #1: Use new function
-        consumed_positions = get_all_consumed_positions(round_state['submissions'])
-        
-        # CHANGE #2: Use new function
-        board_state = round_state['board_state']
-        refresh_consumed_positions(board_state, consumed_positions)
-        
-        # CHANGE #3: Add swap persistence (NEW)
-        swap_history = round_state.get('swap_history', [])
-        mark_swaps_as_used(swap_history, consumed_positions)
-        apply_tile_swap(board_state, swap_history)
-        
-        # Update player scores (FEATURE #6: Reveal scores NOW)
-        for player in room['players']:
-            player_id = player['id']
-            if player_id in round_state['submissions']:
-                round_score = round_state['submissions'][player_id]['score']
-                player['score'] = player.get('score', 0) + round_score
-        
-        # CHANGE #4: Clear swap history for next round
-        round_state['swap_history'] = []
+def end_round(room):
+    """End the current round, reveal scores, refresh board (caller holds the room's update)"""
+    round_state = room.round_state
+    
+    # Compile results
+    results = compile_round_results(room)
+    
+    # CHANGE #1: Use new function
+    consumed_positions = get_all_consumed_positions(round_state.submissions)
+    
+    # CHANGE #2: Use new function
+    board_state = round_state.board_state
+    board_before = board_state.snapshot()
+    refresh_consumed_positions(board_state, consumed_positions, room_rng(room))
+    
+    # CHANGE #3: Add swap persistence (NEW)
+    swap_history = round_state.swap_history
+    mark_swaps_as_used(swap_history, consumed_positions)
+    apply_tile_swap(board_state, swap_history)
+    changes = board_changes(board_before, board_state)
+    base_version, version = bump_board_version(round_state)
+    
+    last_round = round_state.round_number >= room.settings.rounds_per_player
+    
+    # Update player scores (FEATURE #6: Reveal scores NOW)
+    for player_id, submission in round_state.submissions.items():
+        player = room.players.get(player_id)
+        if player is not None:
+            player.score += submission.score
+    player_scores = {player_id: player.score for player_id, player in room.players.items()}
+    
+    room_events.record(room, 'round_end', {
+        'round': round_state.round_number,
+        'changes': [[cell_index(row, col), letter] for row, col, letter in changes],
+        'scores': player_scores
+    })
     
-    # Broadcast results (OUTSIDE lock) - FEATURE #6: Send scores in round_ended
-    socketio.emit('round_ended', {
+    # Broadcast results - FEATURE #6: Send scores in round_ended
+    broadcaster.emit(room.room_code, 'round_ended', {
         'results': results,
-        'round_number': round_state['round_number'],
-        'board_state': board_state,
+        'round_number': round_state.round_number,
+        'changes': changes,  # Only cells that changed, applied on top of base_version
+        'base_version': base_version,
+        'version': version,
         'consumed_positions': list(consumed_positions),  # CHANGE #5: Send positions not rows
-        'player_scores': {p['id']: p.get('score', 0) for p in room['players']}  # FEATURE #6: Scores revealed here
-    }, room=room_code)
+        'player_scores': player_scores,  # FEATURE #6: Scores revealed here
+        'game_over': last_round
+    })
+    if last_round:
+        finish_game(room)
+        return
     
     # Prepare next round
-    with game_rooms_lock:
-        round_state['round_number'] += 1
-        round_state['submissions'] = {
-            player['id']: {'words': [], 'positions': [], 'score': 0, 'done': False} 
-            for player in room['players']
-        }
-        round_state['all_done'] = False
-        round_state['swap_history'] = []  # FEATURE #2: Reset swap history for new round
+    round_state.round_number += 1
+    round_state.reset_submissions(room.players)
+    round_state.all_done = False
+    round_state.swap_history = []  # FEATURE #2: Reset swap history for new round
+
+# GAME END: a shared-board game ends after rounds_per_player rounds, a
+# turn-based one once every player has had rounds_per_player turns
+def turns_used_up(room):
+    game_state = room.game_state
+    return game_state.turn_number > room.settings.rounds_per_player * max(1, len(room.players))
+
+def finish_game(room):
+    """Last round played (caller holds the room's update): stop the clocks, announce final scores"""
+    room.status = 'finished'
+    stop_timer(room)
+    player_scores = {player_id: player.score for player_id, player in room.players.items()}
+    room_events.record(room, 'finished', {'scores': player_scores})
+    broadcaster.emit(room.room_code, 'game_finished', {
+        'player_scores': player_scores,
+        'room': serialize_room(room)
+    })
+    room_reaper.track(room.room_code, room)  # Finished rooms get the reaper's shortest TTL
+    game_log.info('Game finished in room %s', room.room_code)
 
 # FEATURE 3: Fixed timer countdown - ENHANCED
-def fixed_timer_countdown(room_code, duration_seconds):
-    """Server-side countdown for fixed timer with per-second updates"""
-    for remaining in range(duration_seconds, 0, -1):
-        if room_code not in game_rooms:
-            return
-        
-        room = game_rooms[room_code]
-        if room['status'] != 'playing' or not room['round_state'].get('timer_active', True):
-            return
-        
-        # Emit tick every second
-        socketio.emit('timer_fixed_tick', {'seconds': remaining}, room=room_code)
-        time.sleep(1)
+def fixed_timer_countdown(room, duration_seconds):
+    """Schedule the end of a fixed-timer round (clients count down from game_started's duration)"""
+    schedule_room_timer(room, ROUND_TIMER, duration_seconds, expire_round_timer)
+
+def expire_round_timer(room):
+    """Fixed round timer deadline - end round"""
+    if room.status != 'playing' or not room.round_state.timer_active:
+        return
     
-    # Timer expired - end round
-    if room_code in game_rooms:
-        room = game_rooms[room_code]
-        if room['status'] == 'playing':
-            print(f'[TIMER] Fixed timer expired for room {room_code}')
-            end_round(room_code)
+    timer_log.info('Fixed timer expired for room %s', room.room_code)
+    end_round(room)
 
-@socketio.on('end_turn')
+@socket_event('end_turn')
 def handle_end_turn():
     """Player ends their turn, stop timer"""
     session_id = request.sid
@@ -1623,26 +1864,63 @@ def handle_end_turn():
         return
     
     room_code = player_sessions[session_id].get('room_code')
-    if not room_code or room_code not in game_rooms:
+    if not room_code:
         return
     
-    room = game_rooms[room_code]
-    
-    # Only current player can end their turn
-    if room['timer_state']['current_player_turn'] != session_id:
+    with room_store.update(room_code) as room:
+        if room is None:
+            return
+        
+        # Only current player can end their turn
+        if room.timer_state.current_player_turn != session_id:
+            return
+        
+        # Stop timer
+        stop_timer(room)
+        room_events.record(room, 'turn_end', {'player': session_id})
+        
+        # Notify all players
+        broadcaster.emit(room_code, 'turn_ended', {'player_id': session_id})
+    timer_log.debug('Turn ended by player %s in room %s', session_id, room_code)
+
+# ===== CRASH RECOVERY =====
+# Rooms come back from the last snapshot (see snapshots.py) before the first
+# connection. Their players' sockets died with the old process, so each client
+# takes its seat back with 'rejoin_room'; running timers are re-armed with
+# whatever time they had left.
+
+def rearm_room_timers(room, taken_at):
+    """Reschedule a restored room's timers (caller holds the room's update)"""
+    now = time.time()
+    timer_state = room.timer_state
+    expires_at = timer_state.expires_at
+    if expires_at is not None and timer_state.grace_active:
+        mode = 'shared_board' if room.settings.board_mode == 'shared' else 'randomized_per_word'
+        schedule_room_timer(room, TURN_TIMER, max(0, expires_at - now), end_grace_period_voting, mode)
+    elif expires_at is not None and timer_state.countdown_active:
+        schedule_room_timer(room, TURN_TIMER, max(0, expires_at - now), expire_turn_timer)
+    
+    if room.status != 'playing' or room.settings.timer_type != 'fixed':
         return
-    
-    # Stop timer
-    stop_timer(room_code)
-    
-    # Notify all players
-    socketio.emit('turn_ended', {'player_id': session_id}, room=room_code)
-    print(f'[TIMER] Turn ended by player {session_id} in room {room_code}')
+    # Round/turn deadlines are left in place once they fire; only re-arm those still pending at snapshot time
+    round_state = room.round_state
+    if round_state and round_state.timer_active and round_state.timer_expires > taken_at:
+        schedule_room_timer(room, ROUND_TIMER, max(0, round_state.timer_expires - now), expire_round_timer)
+    game_state = room.game_state
+    if game_state and expires_at is None and (game_state.timer_expires or 0) > taken_at:
+        schedule_room_timer(room, TURN_TIMER, max(0, game_state.timer_expires - now), expire_turnbased_timer)
+
+if room_snapshots is not None:
+    snapshot_taken_at, restored_rooms = room_snapshots.restore()
+    for restored_code in restored_rooms:
+        with room_store.update(restored_code) as restored_room:
+            rearm_room_timers(restored_room, snapshot_taken_at)
+            room_reaper.track(restored_code, restored_room)
+    room_snapshots.start()
 
 # ===== SERVER STARTUP =====
 
 if __name__ == "__main__":
-    import os
     print("="*50)
     print("SPELLCAST - Multiplayer with Advanced Timer System")
     print("="*50)
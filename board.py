@@ -0,0 +1,173 @@
+# board.py - Compact array-backed game boards
+"""
+One Board type for both modes, in place of 25 tile dicts (single-player) or
+a list of row lists (multiplayer). A board is three bytearrays over the
+GRID_SIZE x GRID_SIZE cells, row-major:
+
+    letters   ASCII uppercase letter per cell
+    specials  one of SPECIAL_CODES per cell ('.' plain, 'D' DL, 'T' TL)
+    gems      1 where the cell holds a gem (stored as a bitmask, see gem_mask())
+
+board[row][col] reads a letter (rows come back as strings), so the solver,
+path cache and validators take a Board wherever they took a 2D list. Cells
+change through set_letter/set_special/set_gem; permute() reorders every cell
+in one gather per array; snapshot() shares the arrays copy-on-write, so
+taking one before a move copies nothing unless the board is then written.
+Boards become JSON only where they leave the server: to_tiles() for the
+single-player client, to_rows() for multiplayer.
+"""
+from collections import Counter
+from operator import itemgetter
+
+from board_geometry import GRID_SIZE
+
+SPECIAL_CODES = {None: '.', 'DL': 'D', 'TL': 'T'}
+_SPECIAL_NAMES = {ord(code): name for name, code in SPECIAL_CODES.items()}
+_PLAIN = ord('.')
+
+
+class Board:
+    __slots__ = ('_letters', '_specials', '_gems', '_shared')
+
+    def __init__(self, letters, specials=None, gem_mask=0):
+        """letters (and specials) as strings of GRID_SIZE * GRID_SIZE characters"""
+        self._letters = bytearray(letters.upper(), 'ascii')
+        cells = len(self._letters)
+        self._specials = bytearray(specials, 'ascii') if specials is not None else bytearray(b'.' * cells)
+        self._gems = bytearray(gem_mask >> i & 1 for i in range(cells))
+        self._shared = False
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Board from a 2D list of letters"""
+        return cls(''.join(''.join(row) for row in rows))
+
+    @classmethod
+    def from_tiles(cls, tiles):
+        """Board from single-player tile dicts {"letter", "special", "gem"}"""
+        gems = 0
+        for i, tile in enumerate(tiles):
+            if tile["gem"]:
+                gems |= 1 << i
+        return cls(''.join(tile["letter"] for tile in tiles),
+                   ''.join(SPECIAL_CODES[tile["special"]] for tile in tiles), gems)
+
+    # ----- reads -----
+
+    def __len__(self):
+        return len(self._letters)
+
+    def __getitem__(self, row):
+        """Row `row` as a string, so board[row][col] is that cell's letter"""
+        if not 0 <= row < GRID_SIZE:
+            raise IndexError(row)
+        return self._letters[row * GRID_SIZE:(row + 1) * GRID_SIZE].decode('ascii')
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (self._letters == other._letters and self._specials == other._specials
+                and self._gems == other._gems)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Board({self.letter_string()!r}, {self.special_string()!r}, {self.gem_mask():#x})'
+
+    def letter(self, index):
+        return chr(self._letters[index])
+
+    def special(self, index):
+        """'DL', 'TL' or None"""
+        return _SPECIAL_NAMES[self._specials[index]]
+
+    def has_gem(self, index):
+        return bool(self._gems[index])
+
+    def cell(self, index):
+        """Comparable (letter, special, gem) for one cell"""
+        return self._letters[index], self._specials[index], self._gems[index]
+
+    def letter_string(self):
+        return self._letters.decode('ascii')
+
+    def special_string(self):
+        return self._specials.decode('ascii')
+
+    def gem_mask(self):
+        """Bit i set when cell i holds a gem"""
+        return sum(1 << i for i, gem in enumerate(self._gems) if gem)
+
+    def letter_counts(self):
+        """Counter of letter -> cells holding it"""
+        return Counter(self.letter_string())
+
+    def special_indices(self, special=True):
+        """Cells with a DL/TL (special=True) or without one (special=False)"""
+        return [i for i, code in enumerate(self._specials) if (code != _PLAIN) == special]
+
+    # ----- writes -----
+
+    def _own(self):
+        if self._shared:
+            self._letters = bytearray(self._letters)
+            self._specials = bytearray(self._specials)
+            self._gems = bytearray(self._gems)
+            self._shared = False
+
+    def set_letter(self, index, letter):
+        self._own()
+        self._letters[index] = ord(letter.upper())
+
+    def set_special(self, index, special):
+        self._own()
+        self._specials[index] = ord(SPECIAL_CODES[special])
+
+    def set_gem(self, index, gem=True):
+        self._own()
+        self._gems[index] = 1 if gem else 0
+
+    def permute(self, order):
+        """Reorder cells: new index i holds the cell that was at order[i]"""
+        gather = itemgetter(*order)
+        self._letters = bytearray(gather(self._letters))
+        self._specials = bytearray(gather(self._specials))
+        self._gems = bytearray(gather(self._gems))
+        self._shared = False
+
+    def snapshot(self):
+        """Copy that shares this board's arrays until either side is written"""
+        copy = Board.__new__(Board)
+        copy._letters, copy._specials, copy._gems = self._letters, self._specials, self._gems
+        copy._shared = self._shared = True
+        return copy
+
+    def changed_cells(self, before, order=None):
+        """
+        Indices whose cell differs from `before`. order is a permute() applied
+        since before was taken: cell i is compared with before's order[i].
+        """
+        sources = order if order is not None else range(len(self._letters))
+        return [i for i, src in enumerate(sources) if self.cell(i) != before.cell(src)]
+
+    # ----- JSON edges -----
+
+    def tile(self, index):
+        """One cell as the single-player client's tile dict"""
+        return {"letter": self.letter(index), "special": self.special(index), "gem": self.has_gem(index)}
+
+    def to_tiles(self):
+        return [self.tile(i) for i in range(len(self._letters))]
+
+    def to_rows(self):
+        """Letters as a 2D list (the multiplayer client's board_state)"""
+        letters = self.letter_string()
+        return [list(letters[r * GRID_SIZE:(r + 1) * GRID_SIZE]) for r in range(len(letters) // GRID_SIZE)]
+
+    # ----- pickling (Redis room store, worker processes) -----
+
+    def __getstate__(self):
+        return self.letter_string(), self.special_string(), self.gem_mask()
+
+    def __setstate__(self, state):
+        self.__init__(*state)
@@ -0,0 +1,236 @@
+# board_generator.py - Boards vetted by the solver, served from a warm pool
+"""
+Random letters under a frequency table and a per-letter cap can still deal a
+dead board. Here every board is checked with solver.board_stats before it is
+handed out: enough playable words, a high enough best word, and a sane
+number of vowels (BoardQuality). Candidates are sampled, and once one is
+close, locally improved one tile at a time, until a board passes or the time
+budget (BOARD_BUDGET_SECONDS, SPELLCAST_BOARD_BUDGET_MS) runs out - then the
+best candidate seen is used.
+
+BoardPool keeps a bounded queue of vetted boards refilled by a process pool,
+so dealing a game only pops a ready board and generation never runs on the
+request path. A pool that has run dry deals a copy of the last board it
+handed out, or before it has handed any out, the board for FALLBACK_SEED
+that it had a worker deal when it was created. A pool whose recipe keeps failing to vet backs off
+between retries rather than spinning, but never stops. The recipes
+themselves live in boards.py.
+
+The executor is shut down without waiting when the process exits (or when
+the server closes the pools, see gunicorn.conf.py): queued recipe runs are
+cancelled rather than joined, which under eventlet would never finish.
+"""
+import atexit
+import copy
+import functools
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from board_geometry import GRID_SIZE
+from logs import get_logger
+from solver import board_stats
+
+log = get_logger('BOARDS')
+
+VOWELS = frozenset('AEIOU')
+# Per board, spent in the pool's workers rather than on the request path. One
+# full board_stats solve of a dense board takes ~10-15 ms, so this leaves room
+# for the dozens of candidates a demanding BoardQuality can need
+BOARD_BUDGET_SECONDS = int(os.environ.get('SPELLCAST_BOARD_BUDGET_MS', 250)) / 1000
+BOARD_POOL_SIZE = 32
+FALLBACK_SEED = 0  # Dealt by a pool that runs dry before it has handed out a board
+UNVETTED_RUNS_BEFORE_BACKOFF = 32  # Recipe runs in a row that found no vetted board before retries slow down
+RETRY_BACKOFF_SECONDS = 0.5  # First delay once backing off; doubles per further miss...
+MAX_RETRY_BACKOFF_SECONDS = 30  # ...up to this
+
+BoardQuality = namedtuple('BoardQuality', [
+    'min_words',       # distinct playable words of 3+ letters
+    'min_best_score',  # score of the best word, by the caller's word_score
+    'min_vowels', 'max_vowels',
+])
+
+
+def count_vowels(letters):
+    return sum(1 for row in letters for letter in row if letter.upper() in VOWELS)
+
+
+def _rank(stats):
+    return (stats['words'], stats['best_score']) if stats else (-1, -1)
+
+
+def generate_board(sample_board, draw_letter, dictionary, quality, word_score=None,
+                   diagonal=True, budget=BOARD_BUDGET_SECONDS, rng=random):
+    """
+    Returns (letters, stats, vetted). sample_board(rng) deals a whole 2D board;
+    draw_letter(rng, letters) draws one replacement letter for it.
+    """
+    deadline = time.perf_counter() + budget
+    best = best_stats = None
+    while True:
+        if best is None or rng.random() < 0.5:
+            candidate = sample_board(rng)
+        else:
+            # Local step: re-draw one tile of the best board so far
+            candidate = [row[:] for row in best]
+            row, col = rng.randrange(GRID_SIZE), rng.randrange(GRID_SIZE)
+            candidate[row][col] = draw_letter(rng, candidate)
+
+        stats = None
+        if quality.min_vowels <= count_vowels(candidate) <= quality.max_vowels:
+            stats = board_stats(candidate, dictionary, word_score, diagonal=diagonal,
+                                enough_words=quality.min_words, enough_score=quality.min_best_score,
+                                deadline=deadline)
+            if stats['words'] >= quality.min_words and stats['best_score'] >= quality.min_best_score:
+                return candidate, stats, True
+
+        if best is None or _rank(stats) > _rank(best_stats):
+            best, best_stats = candidate, stats
+        if time.perf_counter() >= deadline:
+            return best, best_stats, False
+
+
+def create_board_executor(workers=1):
+    """
+    Process pool for board recipes (spawned, so children never inherit the
+    server's threads or sockets). workers <= 0, or a platform that cannot
+    start one, falls back to a single background thread.
+    """
+    executor = None
+    if workers > 0:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        except (OSError, NotImplementedError, ImportError) as e:
+            log.warning('Board worker processes unavailable (%s); generating in a thread', e)
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='board-pool')
+    _register_exit(functools.partial(shutdown_executor, executor))
+    return executor
+
+
+def shutdown_executor(executor):
+    """Stop an executor without waiting, dropping the recipe runs still queued"""
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _register_exit(callback):
+    # concurrent.futures joins its workers from one of threading's exit hooks,
+    # which run before atexit's; register alongside it (hooks run last-first)
+    register = getattr(threading, '_register_atexit', atexit.register)
+    register(callback)
+
+
+class BoardPool:
+    """
+    A bounded queue of up to `size` ready boards made by recipe(seed,
+    require_vetted=True) on executor. take() is a deque pop returning
+    (seed, board), so callers can record what dealt the board; every take
+    (and refill()) tops the queue back up in the background.
+    """
+
+    def __init__(self, recipe, executor, size=BOARD_POOL_SIZE, name='boards'):
+        self.recipe = recipe
+        self.executor = executor
+        self.size = size
+        self.name = name
+        self._boards = deque()  # (seed, board)
+        self._last = None  # (seed, untouched copy of the board) last handed out, dealt again if the pool runs dry
+        self._in_flight = 0
+        self._unvetted_runs = 0  # In a row; past UNVETTED_RUNS_BEFORE_BACKOFF retries wait
+        self._retry_timer = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._seeds = random.SystemRandom()
+        self._fallback = executor.submit(recipe, FALLBACK_SEED)  # Board for a pool that runs dry before its first
+
+    def __len__(self):
+        return len(self._boards)
+
+    def take(self):
+        """(seed, board) for a ready board; a copy of the last one when the pool ran dry"""
+        try:
+            dealt = self._boards.popleft()
+            self._last = (dealt[0], copy.copy(dealt[1]))  # The game changes the board it was dealt
+        except IndexError:
+            if self._last is None:
+                log.warning('%s board pool empty before its first board, dealing seed %d', self.name, FALLBACK_SEED)
+                self._last = (FALLBACK_SEED, self._fallback.result())
+            else:
+                log.warning('%s board pool empty, dealing the last board again', self.name)
+            seed, board = self._last
+            dealt = (seed, copy.copy(board))
+        self.refill()
+        return dealt
+
+    def refill(self):
+        """Submit enough recipe runs to bring the pool back to size"""
+        with self._lock:
+            if self._closed:
+                return
+            missing = max(0, self.size - len(self._boards) - self._in_flight)
+            self._in_flight += missing
+        for submitted in range(missing):
+            seed = self._seeds.getrandbits(64)
+            try:
+                future = self.executor.submit(self.recipe, seed, require_vetted=True)
+            except RuntimeError as e:  # Executor shut down (pool closed, or interpreter exiting)
+                with self._lock:
+                    self._in_flight -= missing - submitted  # Only the runs never submitted
+                    closing, self._closed = self._closed, True
+                if not closing:
+                    log.warning('%s board pool cannot refill: %s', self.name, e)
+                return
+            future.add_done_callback(functools.partial(self._collect, seed))
+
+    def close(self):
+        """Stop refilling; boards already made can still be taken"""
+        with self._lock:
+            self._closed = True
+            timer, self._retry_timer = self._retry_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _retry(self):
+        with self._lock:
+            self._retry_timer = None
+        self.refill()
+
+    def _collect(self, seed, future):
+        with self._lock:
+            self._in_flight -= 1
+        if future.cancelled():
+            return
+        try:
+            board = future.result()
+        except Exception as e:
+            log.exception('Generating a board for the %s pool failed: %s', self.name, e)
+            return
+        if board is not None:
+            with self._lock:
+                self._unvetted_runs = 0
+            self._boards.append((seed, board))
+            return
+        # Not vetted within the budget: try another seed, at once for a while,
+        # then (the recipe keeps failing, e.g. on a slow host) after a growing delay
+        with self._lock:
+            self._unvetted_runs += 1
+            misses = self._unvetted_runs - UNVETTED_RUNS_BEFORE_BACKOFF
+            if misses < 0:
+                delay = 0
+            elif self._retry_timer is not None or self._closed:
+                return  # A retry is already scheduled
+            else:
+                delay = min(MAX_RETRY_BACKOFF_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** min(misses, 16))
+                timer = self._retry_timer = threading.Timer(delay, self._retry)
+                timer.daemon = True
+        if not delay:
+            self.refill()
+            return
+        if misses == 0:
+            log.warning('%s board pool: %d boards in a row failed vetting, retrying with backoff',
+                        self.name, UNVETTED_RUNS_BEFORE_BACKOFF)
+        timer.start()
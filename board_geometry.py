@@ -0,0 +1,97 @@
+# board_geometry.py - Precomputed board adjacency shared by every path check
+"""
+Cells are addressed by flat index (row * grid_size + col). For each grid size
+and movement rule the neighbour lists and neighbour bitmasks are computed once,
+so a path step is a table lookup and a visited set is a single int.
+
+8-way movement (diagonals allowed) is the single-player rule; 4-way movement
+is the strict multiplayer rule.
+"""
+from functools import lru_cache
+
+GRID_SIZE = 5
+
+_STEPS_8 = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+_STEPS_4 = ((-1, 0), (0, -1), (0, 1), (1, 0))
+
+
+@lru_cache(maxsize=None)
+def neighbour_table(grid_size=GRID_SIZE, diagonal=True):
+    """Tuple indexed by cell: the flat indices of that cell's neighbours."""
+    steps = _STEPS_8 if diagonal else _STEPS_4
+    table = []
+    for r in range(grid_size):
+        for c in range(grid_size):
+            table.append(tuple(
+                (r + dr) * grid_size + (c + dc)
+                for dr, dc in steps
+                if 0 <= r + dr < grid_size and 0 <= c + dc < grid_size
+            ))
+    return tuple(table)
+
+
+@lru_cache(maxsize=None)
+def neighbour_masks(grid_size=GRID_SIZE, diagonal=True):
+    """Tuple indexed by cell: a bitmask with one bit set per neighbour."""
+    masks = []
+    for cells in neighbour_table(grid_size, diagonal):
+        mask = 0
+        for cell in cells:
+            mask |= 1 << cell
+        masks.append(mask)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def step_distances(grid_size=GRID_SIZE, diagonal=True):
+    """Tuple of tuples: [a][b] is the fewest moves from cell a to cell b on an empty board."""
+    cells = grid_size * grid_size
+    table = []
+    for a in range(cells):
+        dr = [abs(a // grid_size - b // grid_size) for b in range(cells)]
+        dc = [abs(a % grid_size - b % grid_size) for b in range(cells)]
+        table.append(tuple(max(r, c) if diagonal else r + c for r, c in zip(dr, dc)))
+    return tuple(table)
+
+
+NEIGHBOURS_8 = neighbour_table(GRID_SIZE, True)
+NEIGHBOURS_4 = neighbour_table(GRID_SIZE, False)
+
+
+def cell_index(row, col, grid_size=GRID_SIZE):
+    """Flat index of (row, col), or -1 when it is off the board or not an int."""
+    if type(row) is not int or type(col) is not int:
+        return -1
+    if 0 <= row < grid_size and 0 <= col < grid_size:
+        return row * grid_size + col
+    return -1
+
+
+def index_to_coords(index, grid_size=GRID_SIZE):
+    return [index // grid_size, index % grid_size]
+
+
+def is_connected_path(path, diagonal=True, grid_size=GRID_SIZE):
+    """
+    True when every [row, col] in path is on the board, no cell repeats and
+    each step moves to a neighbour under the chosen movement rule.
+    """
+    masks = neighbour_masks(grid_size, diagonal)
+    visited = 0
+    prev = -1
+    for cell in path:
+        try:
+            row, col = cell
+        except (TypeError, ValueError):
+            return False
+        index = cell_index(row, col, grid_size)
+        if index < 0:
+            return False
+        bit = 1 << index
+        if visited & bit:
+            return False
+        if prev >= 0 and not masks[prev] & bit:
+            return False
+        visited |= bit
+        prev = index
+    return True
@@ -0,0 +1,199 @@
+# boards.py - Letter tables and the recipes that deal new boards
+"""
+Everything needed to deal a board without the Flask app: the letter tables,
+word scoring, and one recipe per game mode. The recipes are plain functions
+of a seed so BoardPool can run them in worker processes (see
+board_generator.py); each process opens the shared memory-mapped word list
+on first use.
+
+    deal_single_player_tiles(seed)  -> Board with one DL/TL and 10 gems
+    deal_multiplayer_letters(seed)  -> Board of letters only
+
+Both return None when require_vetted is set and no board met its quality
+thresholds within the budget. Letters are drawn through the LetterSampler for
+each mode, which the app also uses for replacement tiles.
+"""
+import random
+from collections import Counter
+
+from board import Board
+from board_generator import BOARD_BUDGET_SECONDS, BoardQuality, generate_board
+from board_geometry import GRID_SIZE
+from dictionary import WORDS_DAWG_PATH, WORDS_TXT_PATH, load_dictionary
+
+# Scrabble-style letter values (Phase 2 spec-compliant)
+# Legacy LETTER_SCORES maintained for single-player backward compatibility
+
+# PHASE 2 GAP #3: Proper Scrabble-style letter scores
+LETTER_VALUES = {
+    'A':1, 'B':4, 'C':5, 'D':3, 'E':1, 'F':5, 'G':3, 'H':4, 'I':1, 'J':7,
+    'K':6, 'L':3, 'M':4, 'N':2, 'O':1, 'P':4, 'Q':8, 'R':2, 'S':2, 'T':2,
+    'U':4, 'V':5, 'W':5, 'X':7, 'Y':4, 'Z':8
+}
+
+# Legacy LETTER_SCORES maintained for single-player backward compatibility (alias)
+LETTER_SCORES = LETTER_VALUES
+
+# PHASE 2 GAP #2: Proper weighted letter frequency map (English language distribution)
+FREQUENCY_MAP = {
+    'E': 127, 'T': 91, 'A': 82, 'O': 75, 'I': 70, 'N': 67, 'S': 63, 'H': 61,
+    'R': 60, 'D': 43, 'L': 40, 'U': 28, 'C': 28, 'M': 24, 'W': 24, 'F': 22,
+    'G': 20, 'Y': 20, 'P': 19, 'B': 15, 'V': 10, 'K': 8, 'X': 2, 'J': 2,
+    'Q': 1, 'Z': 1
+}
+VOWELS = "AEIOU"
+LETTER_FREQUENCIES = "E"*12+"A"*9+"I"*9+"O"*8+"N"*6+"R"*6+"T"*6+"L"*4+"S"*4+"U"*4+"D"*4+"G"*3+"B"*2+"C"*2+"M"*2+"P"*2+"F"*2+"H"*2+"V"*2+"W"*2+"Y"*2+"K"*1+"J"*1+"X"*1+"Q"*1+"Z"*1
+
+# GAP #3: PROPER SCORING WITH MULTIPLIERS
+def calculate_score_with_multipliers(word):
+    """Calculate score with proper Scrabble-style letter values and length multipliers"""
+    # Base score from letter values
+    base_score = sum(LETTER_VALUES.get(c.upper(), 0) for c in word)
+
+    # Length multipliers per Phase 2 spec
+    word_len = len(word)
+    if word_len <= 3:
+        multiplier = 1.0
+    elif word_len <= 5:
+        multiplier = 1.2
+    elif word_len <= 7:
+        multiplier = 1.5
+    else:
+        multiplier = 2.0
+
+    final_score = int(base_score * multiplier)
+    return final_score
+
+# ===== BOARD QUALITY =====
+
+SINGLE_PLAYER_BOARD_QUALITY = BoardQuality(min_words=60, min_best_score=20, min_vowels=6, max_vowels=11)
+# Multiplayer paths are 4-way only, so far fewer words fit on a board
+MULTIPLAYER_BOARD_QUALITY = BoardQuality(min_words=25, min_best_score=12, min_vowels=6, max_vowels=11)
+
+_words = None
+
+def words():
+    """The word list, opened once per process"""
+    global _words
+    if _words is None:
+        _words = load_dictionary(WORDS_TXT_PATH, WORDS_DAWG_PATH)
+    return _words
+
+# ===== SAMPLERS =====
+
+MAX_LETTER_COUNT = 5  # No letter more than 5 times on a board
+
+class LetterSampler:
+    """
+    Weighted letter draws under a per-letter cap. Weights are small integers,
+    so each draw table is the letters repeated by weight (like
+    LETTER_FREQUENCIES) and a draw is one index into it. The table for each
+    set of capped letters is built once and kept, so a capped letter is never
+    drawn at all rather than drawn and retried. Pass a seeded random.Random as
+    rng for reproducible draws.
+    """
+
+    def __init__(self, weights, cap=MAX_LETTER_COUNT):
+        self.weights = dict(weights)
+        self.cap = cap
+        self._tables = {}  # frozenset of capped letters -> (draw table, cap still applies)
+
+    def _table(self, counts):
+        capped = frozenset(l for l, n in counts.items() if n >= self.cap)
+        table = self._tables.get(capped)
+        if table is None:
+            letters = [l for l in self.weights if l not in capped]
+            enforce = bool(letters)
+            if not enforce:  # Every letter capped (a board bigger than the cap allows): ignore the cap
+                letters = list(self.weights)
+            if len(self._tables) >= 1024:
+                self._tables.clear()
+            table = self._tables[capped] = (''.join(l * self.weights[l] for l in letters), enforce)
+        return table
+
+    def draw(self, rng, counts, k=1):
+        """
+        k letters, each under the cap given counts (letter -> count on the
+        board, updated in place as letters are drawn). The batch is one
+        choices() call; only when it would push a letter past the cap is it
+        walked letter by letter and the overflow drawn again.
+        """
+        cap = self.cap
+        drawn = []
+        while len(drawn) < k:
+            table, enforce = self._table(counts)
+            batch = rng.choices(table, k=k - len(drawn))
+            added = Counter(batch)
+            if not enforce or all(counts.get(l, 0) + n <= cap for l, n in added.items()):
+                for letter, n in added.items():
+                    counts[letter] = counts.get(letter, 0) + n
+                drawn.extend(batch)
+                continue
+            for letter in batch:
+                n = counts.get(letter, 0)
+                if n < cap:
+                    counts[letter] = n + 1
+                    drawn.append(letter)
+        return drawn
+
+    def draw_one(self, rng, counts):
+        return self.draw(rng, counts)[0]
+
+    def refill(self, board, indices, rng=random):
+        """
+        Draw new letters for a Board's cells at indices in one batch. The
+        letters being replaced no longer count toward the cap.
+        """
+        indices = list(dict.fromkeys(indices))
+        counts = board.letter_counts()
+        for index in indices:
+            counts[board.letter(index)] -= 1
+        for index, letter in zip(indices, self.draw(rng, counts, len(indices))):
+            board.set_letter(index, letter)
+
+    def sample_board(self, rng=random):
+        """A whole 2D board under the cap"""
+        flat = self.draw(rng, {}, GRID_SIZE * GRID_SIZE)
+        return [flat[i * GRID_SIZE:(i + 1) * GRID_SIZE] for i in range(GRID_SIZE)]
+
+    def draw_for_board(self, rng, letters):
+        """One draw that keeps a 2D board under the cap"""
+        return self.draw_one(rng, Counter(letter for row in letters for letter in row))
+
+
+SINGLE_PLAYER_LETTERS = LetterSampler(Counter(LETTER_FREQUENCIES))
+MULTIPLAYER_LETTERS = LetterSampler(FREQUENCY_MAP)
+
+# ===== RECIPES =====
+
+def deal_single_player_tiles(seed=None, require_vetted=False):
+    """Vetted single-player Board with one DL/TL special and 10 gems"""
+    rng = random.Random(seed)
+    letters, _, vetted = generate_board(SINGLE_PLAYER_LETTERS.sample_board, SINGLE_PLAYER_LETTERS.draw_for_board,
+                                        words(), SINGLE_PLAYER_BOARD_QUALITY, word_score=calculate_score_with_multipliers,
+                                        diagonal=True, budget=BOARD_BUDGET_SECONDS, rng=rng)
+    if require_vetted and not vetted:
+        return None
+    board = Board.from_rows(letters)
+
+    # Add special tiles
+    special_tile_type = "DL" if rng.random() < 0.75 else "TL"
+    special_tile_index = rng.randint(0, len(board) - 1)
+    board.set_special(special_tile_index, special_tile_type)
+
+    # Add 10 gems
+    empty_indices = list(range(len(board)))
+    rng.shuffle(empty_indices)
+    for i in range(min(10, len(empty_indices))):
+        board.set_gem(empty_indices[i])
+    return board
+
+def deal_multiplayer_letters(seed=None, require_vetted=False):
+    """Vetted 5x5 Board of FREQUENCY_MAP-weighted letters (4-way paths)"""
+    rng = random.Random(seed)
+    letters, _, vetted = generate_board(MULTIPLAYER_LETTERS.sample_board, MULTIPLAYER_LETTERS.draw_for_board,
+                                        words(), MULTIPLAYER_BOARD_QUALITY, word_score=calculate_score_with_multipliers,
+                                        diagonal=False, budget=BOARD_BUDGET_SECONDS, rng=rng)
+    if require_vetted and not vetted:
+        return None
+    return Board.from_rows(letters)
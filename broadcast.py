@@ -0,0 +1,86 @@
+# broadcast.py - Per-room outbound queue with frame-window coalescing
+"""
+Room-wide events are queued per room and flushed once per frame window
+(a few tens of ms) as a single Socket.IO message, instead of one emit per
+event per handler call.
+
+Within a window:
+  - events registered with a coalesce key keep only their NEWEST payload per
+    key (e.g. one opponent highlight per player while they drag),
+  - events registered with a merge function fold into one payload
+    (e.g. several tile swaps become one board update),
+  - everything else is delivered in order.
+
+A window holding a single event is emitted as that event unchanged. A window
+holding several is emitted as BATCH_EVENT {'events': [{'event', 'data',
+'skip'}, ...]}; the client replays each entry through its normal handler,
+ignoring entries whose 'skip' is its own session id (the skip_sid of the
+original emit).
+"""
+import threading
+
+BATCH_EVENT = 'room_batch'
+
+
+class RoomBroadcaster:
+    def __init__(self, socketio, scheduler, window_seconds=0.03):
+        self.socketio = socketio
+        self.scheduler = scheduler
+        self.window_seconds = window_seconds
+        self._pending = {}  # room -> {'entries': [[event, data, skip]], 'slots': {key: index}}
+        self._coalesce_keys = {}  # event -> payload -> key
+        self._mergers = {}  # event -> (older payload, newer payload) -> merged payload
+        self._lock = threading.Lock()
+
+    def coalesce(self, event, key_fn):
+        """Keep only the newest payload of event per key_fn(payload) within a window."""
+        self._coalesce_keys[event] = key_fn
+
+    def merge(self, event, merge_fn):
+        """Fold every payload of event within a window with merge_fn(older, newer)."""
+        self._mergers[event] = merge_fn
+
+    def emit(self, room, event, data, skip_sid=None):
+        """Queue event for everyone in room (except skip_sid) until the window closes."""
+        with self._lock:
+            pending = self._pending.get(room)
+            if pending is None:
+                pending = self._pending[room] = {'entries': [], 'slots': {}}
+                self.scheduler.call_later(self.window_seconds, self.flush, room)
+
+            slot_key = None
+            if event in self._coalesce_keys:
+                slot_key = (event, skip_sid, self._coalesce_keys[event](data))
+            elif event in self._mergers:
+                slot_key = (event, skip_sid)
+
+            index = pending['slots'].get(slot_key) if slot_key else None
+            if index is None:
+                if slot_key:
+                    pending['slots'][slot_key] = len(pending['entries'])
+                else:
+                    # An ordinary event is a barrier: later updates must not fold in ahead of it
+                    pending['slots'].clear()
+                pending['entries'].append([event, data, skip_sid])
+            elif event in self._mergers:
+                entry = pending['entries'][index]
+                entry[1] = self._mergers[event](entry[1], data)
+            else:
+                pending['entries'][index][1] = data
+
+    def flush(self, room):
+        """Send everything queued for room now. Safe to call with nothing queued."""
+        with self._lock:
+            pending = self._pending.pop(room, None)
+        if not pending:
+            return
+
+        entries = pending['entries']
+        if len(entries) == 1:
+            event, data, skip_sid = entries[0]
+            self.socketio.emit(event, data, room=room, skip_sid=skip_sid)
+            return
+
+        self.socketio.emit(BATCH_EVENT, {
+            'events': [{'event': event, 'data': data, 'skip': skip_sid} for event, data, skip_sid in entries]
+        }, room=room)
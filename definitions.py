@@ -0,0 +1,335 @@
+# definitions.py - Word definitions served from a local cache
+"""
+Definitions for /define/<word>, so browsers never call a dictionary API
+themselves. Three layers, each in front of the next:
+
+    memory   LRU of ready JSON response bodies (a repeat lookup is a dict hit)
+    disk     a SQLite file of word -> entry, prebuilt offline (import below)
+             or filled as words are fetched; misses are stored too. WAL mode,
+             so every worker process reads it while one of them writes
+    upstream a callable word -> entry or None, by default the Free Dictionary
+             API (SPELLCAST_DEFINITIONS_URL; '' serves the disk file only)
+
+An entry is the client's shape: {word, phonetic, partOfSpeech, definition,
+example}. A word with no entry of its own falls back to its base word
+(BERRIES -> berry) the way the client used to, with every candidate fetched
+at once; a lookup waits at most one timeout, base words included.
+
+Disk reads and upstream fetches run on a small thread pool (green threads
+under eventlet), never on the caller, and concurrent lookups of one word
+share a single fetch. Under eventlet the SQLite calls themselves go on to
+eventlet.tpool's OS threads, as a green thread blocked in SQLite would stall
+every other one. Upstream failures are not cached, so the word is tried
+again on its next lookup.
+
+Usage:
+    python definitions.py import definitions.jsonl [definitions.db]
+    python definitions.py bench [definitions.db]
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from logs import get_logger
+
+log = get_logger('DEFINE')
+
+DEFINITIONS_DB_PATH = os.environ.get('SPELLCAST_DEFINITIONS_DB', 'definitions.db')
+DEFINITIONS_URL = os.environ.get('SPELLCAST_DEFINITIONS_URL', 'https://api.dictionaryapi.dev/api/v2/entries/en/{word}')
+FETCH_TIMEOUT_SECONDS = 4.0
+SQLITE_BUSY_TIMEOUT_SECONDS = 0.5  # A write waiting on another process's write gives up after this
+MAX_DEFINITION_CHARS = 1024
+
+
+class DefinitionUnavailable(Exception):
+    """The upstream could not be asked (network error, 5xx, bad payload)"""
+
+
+def base_word_candidates(word):
+    """Likely base words of a lowercase word, by common suffixes and prefixes"""
+    w = word
+    candidates = []
+    if w.endswith('ies'): candidates.append(w[:-3] + 'y')  # berries -> berry
+    if w.endswith('es'): candidates += [w[:-2], w[:-1]]  # boxes -> box
+    if w.endswith('s') and not w.endswith('ss'): candidates.append(w[:-1])  # cats -> cat (not glass)
+    if w.endswith('ing'): candidates += [w[:-3], w[:-3] + 'e']  # playing -> play, making -> make
+    if w.endswith('ed'): candidates += [w[:-2], w[:-1]]  # jumped -> jump, baked -> bake
+    if w.endswith('er') and len(w) > 4: candidates += [w[:-2], w[:-1]]
+    if w.endswith('ly') and len(w) > 4: candidates.append(w[:-2])  # quickly -> quick
+    if w.endswith('able'): candidates += [w[:-4], w[:-4] + 'e']  # lovable -> love
+    if w.endswith('ness') and len(w) > 5: candidates += [w[:-4], w[:-4] + 'y']  # heaviness -> heavy
+    if w.endswith('hood') and len(w) > 5: candidates.append(w[:-4])
+    if w.endswith('less') and len(w) > 5: candidates.append(w[:-4])
+    if w.endswith('ful') and len(w) > 4: candidates.append(w[:-3])
+    if w.endswith('ment') and len(w) > 5: candidates.append(w[:-4])
+    # Prefixes only while 3+ letters remain ("uncle" is not un + cle)
+    if w.startswith('un') and len(w) > 4: candidates.append(w[2:])
+    if w.startswith('dis') and len(w) > 5: candidates.append(w[3:])
+    if w.startswith('re') and len(w) > 4: candidates.append(w[2:])
+    if w.startswith('pre') and len(w) > 5: candidates.append(w[3:])
+    return list(dict.fromkeys(c for c in candidates if c and c != w))
+
+
+def entry_from_api(data):
+    """Free Dictionary API payload -> entry (first meaning, up to 3 definitions numbered)"""
+    entry = data[0]
+    meanings = entry.get('meanings') or []
+    meaning = meanings[0] if meanings else None
+    definitions = meaning.get('definitions') if meaning else None
+    if not definitions:
+        return None
+    shown = [d['definition'] for d in definitions[:3]]
+    text = '\n\n'.join(f'{i + 1}. {d}' for i, d in enumerate(shown)) if len(shown) > 1 else shown[0]
+    phonetics = entry.get('phonetics') or [{}]
+    return {
+        'word': entry.get('word', ''),
+        'phonetic': entry.get('phonetic') or phonetics[0].get('text') or '',
+        'partOfSpeech': meaning.get('partOfSpeech') or 'word',
+        'definition': text[:MAX_DEFINITION_CHARS],
+        'example': next((d['example'] for d in definitions if d.get('example')), ''),
+    }
+
+
+class UrlDefinitionSource:
+    """
+    Fetches from url_template ('{word}' is substituted). Point it at a local
+    stub server to develop offline.
+    """
+
+    def __init__(self, url_template=DEFINITIONS_URL, timeout=FETCH_TIMEOUT_SECONDS):
+        self.url_template = url_template
+        self.timeout = timeout
+
+    def __call__(self, word):
+        url = self.url_template.format(word=urllib.parse.quote(word))
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                data = json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise DefinitionUnavailable(f'{url}: HTTP {e.code}') from e
+        except (OSError, ValueError) as e:
+            raise DefinitionUnavailable(f'{url}: {e}') from e
+        try:
+            return entry_from_api(data)
+        except (LookupError, TypeError, AttributeError) as e:
+            raise DefinitionUnavailable(f'{url}: unexpected payload ({e})') from e
+
+
+def _green_threads():
+    """True once eventlet has monkey-patched threading (as gunicorn's eventlet worker does)"""
+    eventlet = sys.modules.get('eventlet')
+    return eventlet is not None and eventlet.patcher.is_monkey_patched('thread')
+
+
+class DefinitionStore:
+    """
+    word -> entry (or None for a known miss) in a SQLite file. Each process
+    opens its own connection; in WAL mode readers never wait for the writer,
+    and writers queue for up to SQLITE_BUSY_TIMEOUT_SECONDS.
+    """
+
+    def __init__(self, path=DEFINITIONS_DB_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS definitions (word TEXT PRIMARY KEY, entry TEXT NOT NULL)')
+        self._lock = threading.Lock()  # One connection, shared by the lookup threads
+
+    def _call(self, fn, *args):
+        """fn(*args) holding the connection, on an OS thread when threads are green"""
+        with self._lock:
+            if _green_threads():
+                from eventlet import tpool
+                return tpool.execute(fn, *args)
+            return fn(*args)
+
+    def _query(self, sql, params=()):
+        return self._db.execute(sql, params).fetchone()
+
+    def _write(self, rows):
+        with self._db:
+            self._db.execute('BEGIN')
+            self._db.executemany('INSERT OR REPLACE INTO definitions (word, entry) VALUES (?, ?)', rows)
+
+    def get(self, word):
+        """(found, entry): found is False when the word was never stored"""
+        row = self._call(self._query, 'SELECT entry FROM definitions WHERE word = ?', (word,))
+        return (False, None) if row is None else (True, json.loads(row[0]))
+
+    def put(self, word, entry):
+        self.put_many([(word, entry)])
+
+    def put_many(self, items):
+        """Store (word, entry) pairs in one transaction"""
+        rows = [(word, json.dumps(entry, separators=(',', ':'))) for word, entry in items]
+        self._call(self._write, rows)
+
+    def __len__(self):
+        return self._call(self._query, 'SELECT COUNT(*) FROM definitions')[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class DefinitionService:
+    def __init__(self, store, upstream=None, is_word=None, max_entries=4096, workers=8,
+                 timeout=FETCH_TIMEOUT_SECONDS):
+        self.store = store
+        self.upstream = upstream
+        self.is_word = is_word or (lambda word: True)  # Filters base-word candidates
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._bodies = OrderedDict()  # word -> JSON body (b'' when there is no definition)
+        self._in_flight = {}  # word -> Future of (entry, source)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='definitions')
+
+    def __len__(self):
+        return len(self._bodies)
+
+    def lookup(self, word):
+        """
+        (body, source) for a lowercase word. body is the JSON response, or
+        None when there is no definition (or, source 'error', none could be
+        fetched). source is 'memory', 'disk', 'upstream', 'missing' or 'error'.
+        """
+        with self._lock:
+            body = self._bodies.get(word)
+            if body is not None:
+                self._bodies.move_to_end(word)
+                return body or None, 'memory'
+        deadline = time.monotonic() + self.timeout
+        try:
+            entry, source = self._entry(word).result(self.timeout)
+            if entry is None:
+                entry, source = self._base_word_entry(word, deadline)
+        except (DefinitionUnavailable, FutureTimeout) as e:
+            log.warning('No definition for %s right now: %s', word, e)
+            return None, 'error'
+
+        body = json.dumps(entry).encode() if entry else b''
+        with self._lock:
+            self._bodies[word] = body
+            if len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+        return body or None, source
+
+    def _base_word_entry(self, word, deadline):
+        candidates = [c for c in base_word_candidates(word) if self.is_word(c)]
+        futures = [self._entry(c) for c in candidates]  # All in flight at once; first in order wins
+        done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for base, future in zip(candidates, futures):
+            if future not in done:
+                break  # An earlier candidate outranks any later one, so its answer is needed
+            entry, source = future.result()
+            if entry is not None:
+                return dict(entry, word=word, definition=f"*(Base word: {base})* {entry['definition']}"), source
+        if pending:
+            raise FutureTimeout(f'{len(pending)} base word(s) of {word} still loading')
+        return None, 'missing'
+
+    def _entry(self, word):
+        """Future of (entry, source) for word - one load however many callers ask at once"""
+        with self._lock:
+            future = self._in_flight.get(word)
+            if future is None:
+                future = self._in_flight[word] = self._executor.submit(self._load, word)
+        return future
+
+    def _load(self, word):
+        try:
+            found, entry = self.store.get(word)
+            if found:
+                return entry, 'disk'
+            if self.upstream is None:
+                return None, 'missing'
+            entry = self.upstream(word)
+            try:
+                self.store.put(word, entry)
+            except sqlite3.Error as e:  # Still served; fetched again by the next process that asks
+                log.warning('Could not store the definition of %s: %s', word, e)
+            return entry, 'upstream'
+        finally:
+            with self._lock:
+                self._in_flight.pop(word, None)
+
+
+def create_definition_service(is_word=None, path=DEFINITIONS_DB_PATH, url=DEFINITIONS_URL):
+    return DefinitionService(DefinitionStore(path), UrlDefinitionSource(url) if url else None, is_word)
+
+
+def import_definitions(jsonl_path, db_path=DEFINITIONS_DB_PATH):
+    """Load a prebuilt file of one entry per line ({"word": ..., ...}) into the store"""
+    store = DefinitionStore(db_path)
+    with open(jsonl_path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    store.put_many((entry['word'].lower(), entry) for entry in entries)
+    store.close()
+    return len(entries)
+
+
+def benchmark(db_path='bench_definitions.db', words=2000, repeats=50):
+    """Time cold lookups through a stub upstream, then repeat (memory) lookups"""
+    calls = []
+
+    def stub(word):
+        calls.append(word)
+        time.sleep(0.001)
+        return {'word': word, 'phonetic': '', 'partOfSpeech': 'noun', 'definition': f'A {word}.', 'example': ''}
+
+    service = DefinitionService(DefinitionStore(db_path), stub, max_entries=words)
+    names = [f'word{i}' for i in range(words)]
+    t = time.perf_counter()
+    for name in names:
+        service.lookup(name)
+    cold = time.perf_counter() - t
+
+    # Many callers asking for one new word at once make one upstream call
+    before = len(calls)
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(service.lookup('together'))) for _ in range(32)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    shared = len(calls) - before
+    assert all(source in ('upstream', 'memory') for _, source in results)
+
+    t = time.perf_counter()
+    for _ in range(repeats):
+        for name in names:
+            service.lookup(name)
+    warm = time.perf_counter() - t
+    print(f'cold: {cold / words * 1e3:.2f} ms/lookup (stub upstream sleeps 1 ms)')
+    print(f'32 concurrent lookups of one new word: {shared} upstream call(s)')
+    print(f'repeat: {warm / (words * repeats) * 1e6:.1f} us/lookup')
+    service.store.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    if command == 'import' and len(sys.argv) > 2:
+        db = sys.argv[3] if len(sys.argv) > 3 else DEFINITIONS_DB_PATH
+        print(f'Imported {import_definitions(sys.argv[2], db)} definitions into {db}')
+    elif command == 'bench':
+        benchmark(sys.argv[2] if len(sys.argv) > 2 else 'bench_definitions.db')
+    else:
+        print(__doc__)
+        sys.exit(1)
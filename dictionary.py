@@ -0,0 +1,311 @@
+# dictionary.py - Compact memory-mapped word list
+"""
+Compiles static/words_alpha.txt into a minimal DAWG (a trie with identical
+suffix subtrees merged) stored as flat uint32 arrays, and serves membership
+and prefix walks straight out of an mmap of that file.
+
+Every gunicorn worker maps the same file, so the pages are shared through the
+OS page cache instead of each worker holding its own set of ~370k str objects,
+and opening it costs a few syscalls instead of parsing the text file.
+
+File layout (little-endian uint32 unless noted):
+    magic     8 bytes  b'SPDAWG01'
+    header    node_count, edge_count, word_count, reserved
+    nodes     node_count * (mask, first_edge)
+    edges     edge_count * child node id
+
+mask has bit k set when the node has an edge for letter chr(97 + k) and bit 31
+set when the path to the node spells a word. A node's edges are stored in
+letter order starting at first_edge, so the edge for letter k sits at
+first_edge + popcount(mask & ((1 << k) - 1)).
+
+The file is compiled at deploy time by bin/post_compile (slug build), or
+else on first start by whichever worker gets there first (written to a
+temporary file and renamed into place, so workers never see half a file).
+
+Usage:
+    python dictionary.py build [words.txt] [words.dawg]
+    python dictionary.py bench [words.txt] [words.dawg]
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from logs import get_logger
+
+WORDS_TXT_PATH = "static/words_alpha.txt"
+WORDS_DAWG_PATH = "static/words_alpha.dawg"
+
+MAGIC = b'SPDAWG01'
+_HEADER = struct.Struct('<8s4I')
+FINAL_BIT = 1 << 31
+ROOT = 0
+
+log = get_logger('DICTIONARY')
+
+
+# ===== BUILD =====
+
+class _BuildNode:
+    __slots__ = ('final', 'edges')
+
+    def __init__(self):
+        self.final = False
+        self.edges = {}
+
+    def signature(self):
+        # Children are already registered, so their identity is canonical
+        return (self.final, tuple((code, id(child)) for code, child in sorted(self.edges.items())))
+
+
+def _build_dawg(sorted_words):
+    """Incremental minimal-DAWG construction over sorted, unique words."""
+    root = _BuildNode()
+    register = {}
+    unchecked = []  # (parent, letter code, child) along the previous word
+    previous = ''
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, code, child = unchecked.pop()
+            signature = child.signature()
+            existing = register.get(signature)
+            if existing is not None:
+                parent.edges[code] = existing
+            else:
+                register[signature] = child
+
+    for word in sorted_words:
+        common = 0
+        limit = min(len(word), len(previous))
+        while common < limit and word[common] == previous[common]:
+            common += 1
+        minimize(common)
+
+        node = unchecked[-1][2] if unchecked else root
+        for ch in word[common:]:
+            child = _BuildNode()
+            code = ord(ch) - 97
+            node.edges[code] = child
+            unchecked.append((node, code, child))
+            node = child
+        node.final = True
+        previous = word
+
+    minimize(0)
+    return root
+
+
+def _is_plain_word(word):
+    return word.isascii() and word.isalpha() and word.islower()
+
+
+def compile_dictionary(words, dawg_path=WORDS_DAWG_PATH):
+    """Write words (any iterable of str) to dawg_path. Returns the word count."""
+    sorted_words = sorted(set(w for w in words if _is_plain_word(w)))
+    root = _build_dawg(sorted_words)
+
+    # Number nodes breadth-first so the root is node 0
+    ids = {id(root): 0}
+    order = [root]
+    i = 0
+    while i < len(order):
+        for code in sorted(order[i].edges):
+            child = order[i].edges[code]
+            if id(child) not in ids:
+                ids[id(child)] = len(order)
+                order.append(child)
+        i += 1
+
+    nodes = array('I')
+    edges = array('I')
+    for node in order:
+        mask = FINAL_BIT if node.final else 0
+        for code in node.edges:
+            mask |= 1 << code
+        nodes.append(mask)
+        nodes.append(len(edges))
+        for code in sorted(node.edges):
+            edges.append(ids[id(node.edges[code])])
+
+    if sys.byteorder != 'little':
+        nodes.byteswap()
+        edges.byteswap()
+
+    # Write then rename so workers racing to build never map a partial file
+    tmp_path = f'{dawg_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(order), len(edges), len(sorted_words), 0))
+        f.write(nodes.tobytes())
+        f.write(edges.tobytes())
+    os.replace(tmp_path, dawg_path)
+    return len(sorted_words)
+
+
+def read_word_file(txt_path=WORDS_TXT_PATH):
+    with open(txt_path) as word_file:
+        return word_file.read().split()
+
+
+# ===== LOOKUP =====
+
+class PackedDictionary:
+    """
+    Read-only word set backed by an mmap'd DAWG file.
+
+    Supports `word in dictionary`, len() and iteration like the set it
+    replaces, plus child()/is_final() for prefix walks.
+    """
+
+    def __init__(self, dawg_path=WORDS_DAWG_PATH):
+        with open(dawg_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, node_count, edge_count, word_count, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{dawg_path} is not a compiled word list')
+        if sys.byteorder != 'little':
+            raise ValueError('Compiled word lists are little-endian only')
+
+        view = memoryview(self._mmap)
+        start = _HEADER.size
+        self.nodes = view[start:start + node_count * 8].cast('I')
+        start += node_count * 8
+        self.edges = view[start:start + edge_count * 4].cast('I')
+        self.node_count = node_count
+        self.word_count = word_count
+
+    def child(self, node, letter):
+        """Node reached from node by a lowercase letter, or -1."""
+        mask = self.nodes[2 * node]
+        code = ord(letter) - 97
+        if not 0 <= code < 26:
+            return -1
+        bit = 1 << code
+        if not mask & bit:
+            return -1
+        return self.edges[self.nodes[2 * node + 1] + (mask & (bit - 1)).bit_count()]
+
+    def is_final(self, node):
+        return bool(self.nodes[2 * node] & FINAL_BIT)
+
+    def __contains__(self, word):
+        if not isinstance(word, str) or not word:
+            return False
+        node = ROOT
+        for ch in word:
+            node = self.child(node, ch)
+            if node < 0:
+                return False
+        return self.is_final(node)
+
+    def __len__(self):
+        return self.word_count
+
+    def __iter__(self):
+        """Yield every word in sorted order."""
+        nodes, edges = self.nodes, self.edges
+        stack = [(ROOT, '')]
+        while stack:
+            node, prefix = stack.pop()
+            mask = nodes[2 * node]
+            if mask & FINAL_BIT and prefix:
+                yield prefix
+            first = nodes[2 * node + 1]
+            children = []
+            offset = 0
+            for code in range(26):
+                if mask & (1 << code):
+                    children.append((edges[first + offset], prefix + chr(97 + code)))
+                    offset += 1
+            stack.extend(reversed(children))
+
+
+def load_dictionary(txt_path=WORDS_TXT_PATH, dawg_path=WORDS_DAWG_PATH):
+    """Open the compiled word list, (re)building it first if it is missing or stale."""
+    if not os.path.exists(dawg_path) or os.path.getmtime(dawg_path) < os.path.getmtime(txt_path):
+        log.info('Compiling %s -> %s', txt_path, dawg_path)
+        compile_dictionary(read_word_file(txt_path), dawg_path)
+    return PackedDictionary(dawg_path)
+
+
+# ===== BENCHMARK =====
+
+_BENCH_SET = """
+import resource, time
+t = time.perf_counter()
+with open({txt!r}) as f:
+    words = set(f.read().split())
+elapsed = time.perf_counter() - t
+hits = sum(1 for w in ('apple', 'zebra', 'qwxz', 'spell') if w in words)
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, hits)
+"""
+
+_BENCH_DAWG = """
+import resource, sys, time
+sys.path.insert(0, {here!r})
+from dictionary import PackedDictionary
+t = time.perf_counter()
+words = PackedDictionary({dawg!r})
+elapsed = time.perf_counter() - t
+hits = sum(1 for w in ('apple', 'zebra', 'qwxz', 'spell') if w in words)
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, hits)
+"""
+
+_BENCH_BASELINE = """
+import resource
+print(0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 0)
+"""
+
+
+def _run_bench(code):
+    import subprocess
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    elapsed, maxrss_kb, _ = out.split()
+    return float(elapsed), int(maxrss_kb)
+
+
+def benchmark(txt_path=WORDS_TXT_PATH, dawg_path=WORDS_DAWG_PATH, lookups=200000):
+    """Compare load time, peak RSS and lookup speed of the set and the DAWG."""
+    words = read_word_file(txt_path)
+    if not os.path.exists(dawg_path):
+        compile_dictionary(words, dawg_path)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    _, base_rss = _run_bench(_BENCH_BASELINE)
+    set_time, set_rss = _run_bench(_BENCH_SET.format(txt=txt_path))
+    dawg_time, dawg_rss = _run_bench(_BENCH_DAWG.format(here=here, dawg=dawg_path))
+
+    probes = (words * (lookups // max(len(words), 1) + 1))[:lookups]
+    word_set = set(words)
+    packed = PackedDictionary(dawg_path)
+    t = time.perf_counter()
+    for w in probes:
+        w in word_set
+    set_lookup = (time.perf_counter() - t) / len(probes)
+    t = time.perf_counter()
+    for w in probes:
+        w in packed
+    dawg_lookup = (time.perf_counter() - t) / len(probes)
+
+    print(f'words: {len(packed)}  dawg nodes: {packed.node_count}  file: {os.path.getsize(dawg_path) / 1e6:.1f} MB')
+    print(f'{"":8} {"load ms":>10} {"RSS over python MB":>20} {"lookup us":>10}')
+    print(f'{"set":8} {set_time * 1e3:10.1f} {(set_rss - base_rss) / 1024:20.1f} {set_lookup * 1e6:10.2f}')
+    print(f'{"dawg":8} {dawg_time * 1e3:10.1f} {(dawg_rss - base_rss) / 1024:20.1f} {dawg_lookup * 1e6:10.2f}')
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    txt = sys.argv[2] if len(sys.argv) > 2 else WORDS_TXT_PATH
+    dawg = sys.argv[3] if len(sys.argv) > 3 else WORDS_DAWG_PATH
+    if command == 'build':
+        t = time.perf_counter()
+        count = compile_dictionary(read_word_file(txt), dawg)
+        print(f'Compiled {count} words to {dawg} in {time.perf_counter() - t:.1f}s')
+    elif command == 'bench':
+        benchmark(txt, dawg)
+    else:
+        print(__doc__)
+        sys.exit(1)
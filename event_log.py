@@ -0,0 +1,478 @@
+# event_log.py - Append-only per-room event log and replay
+"""
+Everything that happens in a room (joins, swaps, words, round ends, timers)
+is appended to a local log, so a room can be rebuilt after a crash and real
+sessions can be replayed for load tests.
+
+    room_events.record(room, 'word', {'player': sid, 'word': 'cat', ...})
+
+record() runs under the caller's room update, stamps the event with the
+room's next sequence number and only queues it; one background writer
+encodes and appends the queued events in batches and fsyncs at most every
+fsync_interval seconds (and on close). A handler never waits on the disk.
+Data passed to record() must not be mutated afterwards.
+
+File format: a sequence of frames, each a little-endian uint32 length then
+that many bytes of MessagePack (the subset in pack/unpack below, readable by
+any MessagePack library):
+
+    [room_code, seq, timestamp, event, data]
+
+A frame cut short by a crash is ignored on read.
+
+Rotation: once the file reaches max_bytes, or has been open for max_age
+seconds, the writer renames it to '<path>.<n>' (n counting up) and starts a
+new one, keeping the newest `keep` segments. replay() reads the segments in
+order and then the live file; a room whose 'created' event was rotated away
+is skipped.
+
+Usage:
+    python event_log.py replay [room_events.log] [ROOM_CODE]
+    python event_log.py bench [rooms]
+"""
+import atexit
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+from board import Board
+from board_geometry import GRID_SIZE
+from logs import get_logger
+from models import Player, Room, RoundState, Settings, Submission, TurnState, rebind_player
+
+log = get_logger('EVENTS')
+
+EVENT_LOG_PATH = os.environ.get('SPELLCAST_EVENT_LOG', 'room_events.log')  # '' turns the log off
+FSYNC_INTERVAL_SECONDS = 1.0
+BATCH_SIZE = 1024
+MAX_LOG_BYTES = int(os.environ.get('SPELLCAST_EVENT_LOG_MAX_MB', 64)) * 1024 * 1024
+MAX_LOG_AGE_SECONDS = 24 * 3600
+KEEP_LOG_SEGMENTS = 8
+
+_FRAME = struct.Struct('<I')
+
+# ===== ENCODING (MessagePack subset) =====
+
+def pack(obj, out):
+    """Append obj (None, bool, int, float, str, list/tuple, dict) to bytearray out"""
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xff)
+        elif 0 <= obj < 1 << 32:
+            out += struct.pack('>BI', 0xce, obj)
+        elif 0 <= obj < 1 << 64:
+            out += struct.pack('>BQ', 0xcf, obj)
+        else:
+            out += struct.pack('>Bq', 0xd3, obj)
+    elif isinstance(obj, float):
+        out += struct.pack('>Bd', 0xcb, obj)
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        n = len(data)
+        if n < 32:
+            out.append(0xa0 | n)
+        elif n < 1 << 8:
+            out += struct.pack('>BB', 0xd9, n)
+        elif n < 1 << 16:
+            out += struct.pack('>BH', 0xda, n)
+        else:
+            out += struct.pack('>BI', 0xdb, n)
+        out += data
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 1 << 16:
+            out += struct.pack('>BH', 0xdc, n)
+        else:
+            out += struct.pack('>BI', 0xdd, n)
+        for item in obj:
+            pack(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n < 1 << 16:
+            out += struct.pack('>BH', 0xde, n)
+        else:
+            out += struct.pack('>BI', 0xdf, n)
+        for key, value in obj.items():
+            pack(key, out)
+            pack(value, out)
+    else:
+        raise TypeError(f'Cannot log {type(obj).__name__}')
+
+
+_FIXED = {
+    0xcc: struct.Struct('>B'), 0xcd: struct.Struct('>H'), 0xce: struct.Struct('>I'), 0xcf: struct.Struct('>Q'),
+    0xd0: struct.Struct('>b'), 0xd1: struct.Struct('>h'), 0xd2: struct.Struct('>i'), 0xd3: struct.Struct('>q'),
+    0xca: struct.Struct('>f'), 0xcb: struct.Struct('>d'),
+}
+_LENGTHS = {0xd9: _FIXED[0xcc], 0xda: _FIXED[0xcd], 0xdb: _FIXED[0xce],
+            0xdc: _FIXED[0xcd], 0xdd: _FIXED[0xce], 0xde: _FIXED[0xcd], 0xdf: _FIXED[0xce]}
+
+
+def unpack(buf, pos=0):
+    """(object, next position) for the MessagePack value at buf[pos]"""
+    tag = buf[pos]
+    pos += 1
+    if tag < 0x80:
+        return tag, pos
+    if tag >= 0xe0:
+        return tag - 0x100, pos
+    if 0xa0 <= tag < 0xc0:
+        end = pos + (tag & 0x1f)
+        return str(buf[pos:end], 'utf-8'), end
+    if 0x90 <= tag < 0xa0:
+        return _unpack_array(buf, pos, tag & 0x0f)
+    if 0x80 <= tag < 0x90:
+        return _unpack_map(buf, pos, tag & 0x0f)
+    if tag == 0xc0:
+        return None, pos
+    if tag == 0xc2:
+        return False, pos
+    if tag == 0xc3:
+        return True, pos
+    fixed = _FIXED.get(tag)
+    if fixed is not None:
+        return fixed.unpack_from(buf, pos)[0], pos + fixed.size
+    length = _LENGTHS.get(tag)
+    if length is None:
+        raise ValueError(f'Unsupported MessagePack tag {tag:#x}')
+    n = length.unpack_from(buf, pos)[0]
+    pos += length.size
+    if tag <= 0xdb:
+        return str(buf[pos:pos + n], 'utf-8'), pos + n
+    if tag <= 0xdd:
+        return _unpack_array(buf, pos, n)
+    return _unpack_map(buf, pos, n)
+
+
+def _unpack_array(buf, pos, n):
+    items = []
+    for _ in range(n):
+        item, pos = unpack(buf, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(buf, pos, n):
+    result = {}
+    for _ in range(n):
+        key, pos = unpack(buf, pos)
+        result[key], pos = unpack(buf, pos)
+    return result, pos
+
+
+def encode_frame(record, out):
+    """Append one length-prefixed record to bytearray out"""
+    start = len(out)
+    out += b'\0\0\0\0'
+    pack(record, out)
+    _FRAME.pack_into(out, start, len(out) - start - 4)
+
+
+def read_frames(path):
+    """Yield every complete [room_code, seq, timestamp, event, data] record in the file"""
+    with open(path, 'rb') as f:
+        buf = f.read()
+    view = memoryview(buf)
+    pos, end = 0, len(buf)
+    while pos + 4 <= end:
+        (size,) = _FRAME.unpack_from(buf, pos)
+        if pos + 4 + size > end:
+            log.warning('%s ends in a partial record (%d bytes ignored)', path, end - pos)
+            return
+        record, _ = unpack(view, pos + 4)
+        yield record
+        pos += 4 + size
+
+
+def _segment_numbers(path):
+    """Numbers n of the rotated '<path>.<n>' files, oldest first"""
+    directory, name = os.path.split(os.path.abspath(path))
+    numbers = []
+    for entry in os.listdir(directory):
+        suffix = entry[len(name) + 1:]
+        if entry.startswith(name + '.') and suffix.isdigit():
+            numbers.append(int(suffix))
+    return sorted(numbers)
+
+
+def log_segments(path):
+    """The rotated segments of a log, oldest first, then the live file (those that exist)"""
+    segments = [f'{path}.{n}' for n in _segment_numbers(path)]
+    return segments + [path] if os.path.exists(path) else segments
+
+# ===== WRITER =====
+
+class EventLog:
+    """Queues room events and appends them from one background writer."""
+
+    def __init__(self, path, fsync_interval=FSYNC_INTERVAL_SECONDS, batch_size=BATCH_SIZE,
+                 max_bytes=MAX_LOG_BYTES, max_age=MAX_LOG_AGE_SECONDS, keep=KEEP_LOG_SEGMENTS):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.written = 0
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        self._start_lock = threading.Lock()
+
+    def record(self, room, event, data=None):
+        """Queue an event for room (caller holds the room's update)"""
+        room.event_seq += 1
+        self.append(room.room_code, room.event_seq, event, data)
+
+    def append(self, room_code, seq, event, data=None):
+        """Queue an event whose sequence number the caller assigned"""
+        self._queue.put((room_code, seq, time.time(), event, data))
+        if self._writer is None:
+            self._start()
+
+    def _start(self):
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name='event-log', daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        out = bytearray()
+        unsynced = False
+        last_sync = time.monotonic()
+        f = open(self.path, 'ab')
+        opened = time.monotonic()
+        try:
+            while True:
+                # Block until an event arrives, or only until the next fsync is due
+                timeout = max(0.0, self.fsync_interval - (time.monotonic() - last_sync)) if unsynced else None
+                try:
+                    batch = [self._queue.get(timeout=timeout)]
+                except queue.Empty:
+                    batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = None in batch
+                for record in batch:
+                    if record is not None:
+                        encode_frame(record, out)
+                if out:
+                    f.write(out)
+                    f.flush()
+                    self.written += len(out)
+                    out.clear()
+                    unsynced = True
+                if unsynced and (stop or time.monotonic() - last_sync >= self.fsync_interval):
+                    os.fsync(f.fileno())
+                    unsynced = False
+                    last_sync = time.monotonic()
+                if stop:
+                    return
+                if f.tell() >= self.max_bytes or (f.tell() and time.monotonic() - opened >= self.max_age):
+                    if unsynced:
+                        os.fsync(f.fileno())
+                        unsynced = False
+                        last_sync = time.monotonic()
+                    f.close()
+                    self._rotate()
+                    f = open(self.path, 'ab')
+                    opened = time.monotonic()
+        finally:
+            f.close()
+
+    def _rotate(self):
+        """Move the full log aside as the next segment and drop segments past `keep`"""
+        numbers = _segment_numbers(self.path)
+        os.replace(self.path, f'{self.path}.{numbers[-1] + 1 if numbers else 1}')
+        for n in numbers[:max(0, len(numbers) + 1 - self.keep)]:
+            os.remove(f'{self.path}.{n}')
+        log.info('Rotated %s (%d segments kept)', self.path, min(len(numbers) + 1, self.keep))
+
+    def close(self):
+        """Write and fsync everything queued so far, then stop the writer"""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join()
+
+
+class NullEventLog:
+    """Stands in when SPELLCAST_EVENT_LOG is empty"""
+
+    def record(self, room, event, data=None):
+        pass
+
+    def append(self, room_code, seq, event, data=None):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_event_log(path=EVENT_LOG_PATH):
+    return EventLog(path) if path else NullEventLog()
+
+# ===== REPLAY =====
+
+def _board(room):
+    state = room.round_state or room.game_state
+    return state.board_state if state else None
+
+
+def _set_letters(state, changes):
+    for cell, letter in changes:
+        state.board_state.set_letter(cell, letter)
+    state.board_version += 1
+
+
+def apply_event(rooms, record):
+    """Fold one record into rooms (room code -> models.Room)"""
+    room_code, seq, timestamp, event, data = record
+    data = data or {}
+    if event == 'created':
+        room = rooms[room_code] = Room(room_code, data['host'], settings=Settings(**data['settings']),
+                                       seed=data['seed'])
+        room.add_player(Player(data['host'], data['name']))
+    room = rooms.get(room_code)
+    if room is None:  # Log started after the room was created
+        return
+    room.event_seq, room.last_activity = seq, timestamp
+    round_state, game_state = room.round_state, room.game_state
+
+    if event == 'joined':
+        room.add_player(Player(data['player'], data['name']))
+    elif event == 'left':
+        room.remove_player(data['player'])
+    elif event == 'rejoined':  # Same seat, new socket id
+        rebind_player(room, data['previous'], data['player'])
+    elif event == 'deleted':
+        del rooms[room_code]
+    elif event == 'settings':
+        for name, value in data.items():
+            setattr(room.settings, name, value)
+    elif event == 'started':
+        room.status = 'playing'
+        room.board_seed = data.get('board_seed')
+        for name, value in data['settings'].items():
+            setattr(room.settings, name, value)
+        room.settings.board_mode = data['mode']
+        board = Board(data['board'])
+        if data['mode'] == 'shared':
+            room.round_state = RoundState(board, timer_start=timestamp)
+            room.round_state.reset_submissions(room.players)
+        else:
+            room.game_state = TurnState(board, next(iter(room.players)))
+    elif event == 'swap':
+        _set_letters(round_state, [(data['cell'], data['letter'])])
+    elif event == 'word':
+        if 'changes' in data:  # Turn-based: scored and refilled immediately
+            player = room.players.get(data['player'])
+            if player is not None:
+                player.score += data['score']
+            game_state.words_played.append({'player_id': data['player'], 'word': data['word'],
+                                            'score': data['score'], 'turn': game_state.turn_number})
+            game_state.active_player_id = data['next']
+            game_state.turn_number += 1
+            _set_letters(game_state, data['changes'])
+        else:
+            submission = round_state.submissions.setdefault(data['player'], Submission())
+            submission.add(data['word'], [list(divmod(cell, GRID_SIZE)) for cell in data['cells']], data['score'])
+    elif event == 'done':
+        submission = round_state.submissions.get(data['player'])
+        if submission is not None:
+            submission.done = True
+    elif event == 'timer' and data.get('kind') == 'turn_timeout' and data.get('next') is not None:
+        game_state.active_player_id = data['next']
+        game_state.turn_number += 1
+    elif event == 'round_end':
+        _set_letters(round_state, data['changes'])
+        for player_id, score in data['scores'].items():
+            if player_id in room.players:
+                room.players[player_id].score = score
+        round_state.round_number = data['round'] + 1
+        round_state.reset_submissions(room.players)
+        round_state.swap_history = []
+    elif event == 'finished':
+        room.status = 'finished'
+
+
+def replay(path, room_code=None):
+    """
+    Rebuild rooms (all, or just room_code) as models.Room from a log and its
+    rotated segments. Everything the events carry comes back: players, seats
+    in turn order, host, settings, status, scores, the board and the round's
+    words. Timers are not re-armed and seat tokens are not logged, so a live
+    server restores from its snapshot (snapshots.py) instead.
+    """
+    rooms = {}
+    for segment in log_segments(path):
+        for record in read_frames(segment):
+            if room_code is None or record[0] == room_code:
+                apply_event(rooms, record)
+    return rooms
+
+
+def benchmark(room_count=2000, events_per_room=40, path='bench_events.log'):
+    """Write a synthetic log through EventLog, then time replaying it"""
+    if os.path.exists(path):
+        os.remove(path)
+    events = EventLog(path)
+    letters = 'ETAOINSHRDLU' * 3
+    t = time.perf_counter()
+    for n in range(room_count):
+        room = Room(f'R{n:05d}', 'h')
+        events.record(room, 'created', {'host': 'h', 'name': 'Host', 'seed': n, 'settings': {'timer_type': 'voting'}})
+        events.record(room, 'joined', {'player': 'g', 'name': 'Guest'})
+        events.record(room, 'started', {'mode': 'shared', 'board': letters[:GRID_SIZE * GRID_SIZE], 'settings': {}})
+        for i in range(events_per_room - 3):
+            events.record(room, 'word', {'player': 'g', 'word': 'tea', 'cells': [0, 1, 2], 'score': 5})
+    queued = time.perf_counter() - t
+    events.close()
+    written = time.perf_counter() - t
+    size = os.path.getsize(path)
+
+    t = time.perf_counter()
+    rooms = replay(path)
+    replayed = time.perf_counter() - t
+    total = room_count * events_per_room
+    print(f'{total} events, {size / 1e6:.1f} MB ({size / total:.0f} bytes/event)')
+    print(f'record(): {queued / total * 1e6:.1f} us/event   written+fsynced after {written:.2f}s')
+    print(f'replay: {len(rooms)} rooms in {replayed:.2f}s ({total / replayed:,.0f} events/s)')
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    if command == 'replay':
+        path = sys.argv[2] if len(sys.argv) > 2 else EVENT_LOG_PATH
+        only = sys.argv[3].upper() if len(sys.argv) > 3 else None
+        for code, room in replay(path, only).items():
+            players = ', '.join(f'{p.name} {p.score}' for p in room.players.values())
+            board = _board(room)
+            turn = room.round_state.round_number if room.round_state else room.game_state.turn_number if room.game_state else 0
+            print(f"{code} seq={room.event_seq} {room.status} round={turn} "
+                  f"board={board.letter_string() if board else '-'} [{players}]")
+    elif command == 'bench':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,130 @@
+# game_store.py - Session-keyed single-player game storage
+"""
+Each browser session owns one single-player game, keyed by a random game id
+kept in the Flask session cookie.
+
+Games are stored as compact GameRecord tuples (the Board's letters and
+specials as short strings plus its gem bitmask), so a record is plain data
+that any backend can hold. MemoryGameStore keeps them in-process with LRU + TTL
+eviction; another backend only has to implement get/put/delete.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from board import Board
+from board_geometry import GRID_SIZE
+
+GameRecord = namedtuple('GameRecord', [
+    'letters',      # str, one letter per tile
+    'specials',     # str, one of board.SPECIAL_CODES per tile
+    'gem_mask',     # int, bit i set when tile i holds a gem
+    'round', 'score', 'found_words', 'dp_index', 'game_over', 'gems', 'version',
+    'seed', 'board_seed',  # The game's own RNG seed and the seed that dealt its board
+])
+
+def pack_game_state(state):
+    """Single-player game_state dict -> GameRecord"""
+    board = state["board_tiles"]
+    dp_pos = state["dp_pos"]
+    return GameRecord(
+        board.letter_string(),
+        board.special_string(),
+        board.gem_mask(),
+        state["round"],
+        state["score"],
+        tuple(state["found_words"]),
+        dp_pos[0] * GRID_SIZE + dp_pos[1] if dp_pos else -1,
+        state["game_over"],
+        state["gems"],
+        state["version"],
+        state["seed"],
+        state["board_seed"],
+    )
+
+
+def unpack_game_state(record):
+    """GameRecord -> the game_state dict the routes work with"""
+    return {
+        "board_tiles": Board(record.letters, record.specials, record.gem_mask),
+        "round": record.round,
+        "score": record.score,
+        "found_words": list(record.found_words),
+        "dp_pos": [record.dp_index // GRID_SIZE, record.dp_index % GRID_SIZE] if record.dp_index >= 0 else None,
+        "game_over": record.game_over,
+        "gems": record.gems,
+        "version": record.version,
+        "seed": record.seed,
+        "board_seed": record.board_seed,
+    }
+
+
+class GameStore:
+    """Backend interface: game id -> GameRecord."""
+
+    def get(self, game_id):
+        raise NotImplementedError
+
+    def put(self, game_id, record):
+        raise NotImplementedError
+
+    def delete(self, game_id):
+        raise NotImplementedError
+
+
+class MemoryGameStore(GameStore):
+    """
+    In-process store bounded by max_games (least recently used goes first) and
+    ttl_seconds since last access. Entries are kept in access order, so expired
+    ones are always at the front and each sweep stops at the first live entry.
+    """
+
+    def __init__(self, max_games=10000, ttl_seconds=2 * 3600):
+        self.max_games = max_games
+        self.ttl_seconds = ttl_seconds
+        self._games = OrderedDict()  # game id -> (last access, record)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._games)
+
+    def get(self, game_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._games.get(game_id)
+            if entry is None:
+                return None
+            if now - entry[0] > self.ttl_seconds:
+                del self._games[game_id]
+                return None
+            self._games[game_id] = (now, entry[1])
+            self._games.move_to_end(game_id)
+            return entry[1]
+
+    def put(self, game_id, record):
+        now = time.monotonic()
+        with self._lock:
+            self._games[game_id] = (now, record)
+            self._games.move_to_end(game_id)
+            self._evict(now)
+
+    def delete(self, game_id):
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def expire(self):
+        """Evict expired games now instead of on the next put(); returns the evicted records"""
+        with self._lock:
+            return self._evict(time.monotonic())
+
+    def _evict(self, now):
+        games = self._games
+        evicted = []
+        while games:
+            oldest_id, (last_access, record) = next(iter(games.items()))
+            if len(games) > self.max_games or now - last_access > self.ttl_seconds:
+                del games[oldest_id]
+                evicted.append(record)
+            else:
+                break
+        return evicted
@@ -0,0 +1,10 @@
+# gunicorn.conf.py - Server hooks (gunicorn reads this file from the working directory)
+"""
+The board pool's worker processes are stopped before the worker exits:
+under eventlet, joining them from the interpreter's exit hooks never returns.
+"""
+
+
+def worker_exit(server, worker):
+    import app
+    app.close_board_pools()
@@ -0,0 +1,344 @@
+# loadtest.py - Load test and benchmark for the game server
+"""
+Drives the real Flask-SocketIO app in-process with Flask-SocketIO test clients
+(every emit runs the actual handler) and the Flask test client for the
+single-player routes.
+
+Simulates --rooms rooms of --bots bots each. Half the rooms play the shared
+board, half play turn-based (randomized per word). Every bot connects, the
+host creates the room, the others join, the host calls start_game, and then
+the bots submit a mix of valid words (found with the solver on the board
+they were synced) and invalid ones (unknown word, broken path, board
+mismatch, out of turn). --players single-player sessions play through
+/, /state, /submit-word and /use-ability at the same time.
+
+Reports events/s, p50/p95/p99 latency per event type, CPU and RSS. Results
+can be saved as a JSON baseline and later runs compared against it; numbers
+are only comparable on the same machine and configuration.
+
+Usage:
+    python loadtest.py [--rooms 20] [--bots 4] [--words 20] [--players 10]
+                       [--threads 4] [--seed 1]
+                       [--save-baseline loadtest_baseline.json]
+                       [--baseline loadtest_baseline.json] [--tolerance 0.2]
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from solver import solve_board
+
+JUNK_WORD = 'qzxqj'
+
+
+# ===== MEASUREMENT =====
+
+class Recorder:
+    """Latency samples per event type, shared by every worker thread."""
+
+    def __init__(self):
+        self.samples = {}
+        self.outcomes = {}  # event -> reply/reason -> count
+        self._lock = threading.Lock()
+
+    def timed(self, event, fn, *args, **kwargs):
+        t = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - t
+        with self._lock:
+            self.samples.setdefault(event, []).append(elapsed)
+        return result
+
+    def outcome(self, event, label):
+        with self._lock:
+            counts = self.outcomes.setdefault(event, {})
+            counts[label] = counts.get(label, 0) + 1
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        return None
+
+
+def summarize(recorder, wall, cpu):
+    events = {}
+    total = 0
+    for event, values in sorted(recorder.samples.items()):
+        values.sort()
+        total += len(values)
+        events[event] = {
+            'count': len(values),
+            'p50_ms': percentile(values, 0.50) * 1e3,
+            'p95_ms': percentile(values, 0.95) * 1e3,
+            'p99_ms': percentile(values, 0.99) * 1e3,
+        }
+    return {
+        'events': events,
+        'outcomes': recorder.outcomes,
+        'total_events': total,
+        'wall_seconds': wall,
+        'events_per_second': total / wall if wall else 0.0,
+        'cpu_percent': 100.0 * cpu / wall if wall else 0.0,
+        'rss_mb': current_rss_mb(),
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+# ===== BOTS =====
+
+def received(client, name):
+    """Drain client's queue and return the args of the last `name` event in it"""
+    found = None
+    for packet in client.get_received():
+        if packet['name'] == name:
+            found = packet['args'][0] if packet['args'] else {}
+    return found
+
+
+class MultiplayerRoom:
+    """One room: the host plus bots - 1 guests, all socket test clients."""
+
+    def __init__(self, game, recorder, bots, mode, rng):
+        self.game = game
+        self.recorder = recorder
+        self.mode = mode
+        self.rng = rng
+        self.clients = []
+        self.room_code = None
+        for _ in range(bots):
+            client = recorder.timed('connect', game.socketio.test_client, game.app)
+            self.clients.append(client)
+            received(client, 'connected')
+
+    def emit(self, client, event, data=None, label=None):
+        args = (event,) if data is None else (event, data)
+        self.recorder.timed(label or event, client.emit, *args)
+
+    def setup(self):
+        host = self.clients[0]
+        self.emit(host, 'create_room', {'player_name': 'host', 'max_players': len(self.clients)})
+        self.room_code = received(host, 'room_created')['room_code']
+        for i, client in enumerate(self.clients[1:], 1):
+            self.emit(client, 'join_room', {'room_code': self.room_code, 'player_name': f'bot{i}'})
+            received(client, 'room_joined')
+        self.emit(host, 'start_game', {'timerType': 'voting', 'boardMode': self.mode})
+
+    def sync_board(self, client):
+        self.emit(client, 'request_board_sync')
+        reply = received(client, 'board_sync')
+        return reply['board_state'] if reply else None
+
+    def submit(self, client, event, word, positions, intent):
+        label = f'{event}:{intent}'
+        self.emit(client, event, {'room_code': self.room_code, 'word': word, 'positions': positions}, label)
+        replies = client.get_received()
+        rejected = [p['args'][0] for p in replies if p['name'] == 'word_rejected']
+        self.recorder.outcome(label, rejected[-1]['reason'] if rejected else 'accepted')
+        return not rejected
+
+    def invalid_submission(self, board, solutions):
+        """A word and path that fail one of the validation steps"""
+        kind = self.rng.choice(('invalid_word', 'invalid_path', 'board_mismatch'))
+        word, (path, _) = self.rng.choice(list(solutions.items())) if solutions else ('cat', ([[0, 0], [0, 1], [0, 2]], 0))
+        if kind == 'invalid_word':
+            return JUNK_WORD, [[0, i] for i in range(len(JUNK_WORD))]
+        if kind == 'invalid_path':
+            return word, [[i, i] for i in range(min(len(word), 5))]  # diagonal steps
+        return word, [[(r + 1) % 5, c] for r, c in path]
+
+    def play(self, words_per_bot):
+        event = 'player_submitted_word' if self.mode == 'shared' else 'player_word_submitted_turnbased'
+        active = 0  # turn-based: index of the bot whose turn it is (join order)
+        for turn in range(words_per_bot * len(self.clients)):
+            if self.mode == 'shared':
+                index = turn % len(self.clients)
+            else:
+                # Mostly the active bot; sometimes someone else tries out of turn
+                index = active if self.rng.random() < 0.8 else (active + 1) % len(self.clients)
+            client = self.clients[index]
+            board = self.sync_board(client)
+            if board is None:
+                continue
+            solutions = self.game.solve(board)
+            if solutions and self.rng.random() < 0.7:
+                word, (path, _) = self.rng.choice(list(solutions.items()))
+                accepted = self.submit(client, event, word, path, 'valid')
+            else:
+                word, path = self.invalid_submission(board, solutions)
+                accepted = self.submit(client, event, word, path, 'invalid')
+            if self.mode != 'shared' and accepted and index == active:
+                active = (active + 1) % len(self.clients)
+
+    def close(self):
+        for client in self.clients:
+            if client.is_connected():
+                self.recorder.timed('disconnect', client.disconnect)
+
+
+def play_single_player(game, recorder, words, rng):
+    client = game.app.test_client()
+    recorder.timed('GET /', client.get, '/', headers={'User-Agent': 'loadtest'})
+    for _ in range(words):
+        state = recorder.timed('GET /state', client.get, '/state').get_json()['state']
+        tiles = state['board_tiles']
+        board = [[tiles[r * 5 + c]['letter'] for c in range(5)] for r in range(5)]
+        solutions = {w: p for w, p in game.solve(board, diagonal=True).items() if w not in state['found_words']}
+        if solutions and rng.random() < 0.7:
+            word, (path, _) = rng.choice(list(solutions.items()))
+            intent = 'valid'
+        else:
+            word, path, intent = JUNK_WORD, [[0, i] for i in range(len(JUNK_WORD))], 'invalid'
+        reply = recorder.timed(f'POST /submit-word:{intent}', client.post, '/submit-word',
+                               json={'word': word, 'path': path}).get_json()
+        recorder.outcome(f'POST /submit-word:{intent}', 'accepted' if reply['valid'] else reply['reason'])
+        if rng.random() < 0.2:
+            reply = recorder.timed('POST /use-ability', client.post, '/use-ability', json={'ability': 'shuffle'}).get_json()
+            recorder.outcome('POST /use-ability', 'accepted' if reply['success'] else reply['reason'])
+
+
+class Game:
+    """The app module plus a cache of solved boards (solving is not what we measure)"""
+
+    def __init__(self):
+        import app as game_app
+        self.module = game_app
+        self.app = game_app.app
+        self.socketio = game_app.socketio
+        self._solved = {}
+        self._lock = threading.Lock()
+
+    def solve(self, board, diagonal=False):
+        key = (tuple(''.join(row) for row in board), diagonal)
+        with self._lock:
+            solutions = self._solved.get(key)
+        if solutions is None:
+            solutions = solve_board(board, self.module.english_words, diagonal=diagonal)
+            with self._lock:
+                self._solved[key] = solutions
+        return solutions
+
+
+# ===== RUN =====
+
+def run(rooms=20, bots=4, words=20, players=10, threads=4, seed=1, quiet=True):
+    rng = random.Random(seed)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        game = Game()
+        if quiet:
+            logging.getLogger('spellcast').setLevel(logging.WARNING)
+        recorder = Recorder()
+        jobs = []
+
+        def room_job(mode, job_seed):
+            room = MultiplayerRoom(game, recorder, bots, mode, random.Random(job_seed))
+            try:
+                room.setup()
+                room.play(words)
+            finally:
+                room.close()
+
+        for i in range(rooms):
+            jobs.append((room_job, ('shared' if i % 2 == 0 else 'randomized', rng.random())))
+        for _ in range(players):
+            jobs.append((lambda job_seed: play_single_player(game, recorder, words, random.Random(job_seed)), (rng.random(),)))
+
+        cpu_start = sum(resource.getrusage(resource.RUSAGE_SELF)[:2])
+        t = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for future in [pool.submit(fn, *args) for fn, args in jobs]:
+                future.result()
+        wall = time.perf_counter() - t
+        cpu = sum(resource.getrusage(resource.RUSAGE_SELF)[:2]) - cpu_start
+        # Let the last broadcast windows flush before the clients go away
+        time.sleep(game.module.BROADCAST_WINDOW_SECONDS * 2)
+
+    report = summarize(recorder, wall, cpu)
+    report['config'] = {'rooms': rooms, 'bots': bots, 'words': words, 'players': players,
+                        'threads': threads, 'seed': seed}
+    return report
+
+
+def print_report(report):
+    print(f'{report["total_events"]} events in {report["wall_seconds"]:.2f}s = '
+          f'{report["events_per_second"]:.0f} events/s, CPU {report["cpu_percent"]:.0f}%, '
+          f'RSS {report["rss_mb"] or 0:.0f} MB (peak {report["max_rss_mb"]:.0f} MB)')
+    print(f'{"event":48} {"count":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for event, stats in report['events'].items():
+        print(f'{event:48} {stats["count"]:7} {stats["p50_ms"]:8.2f} {stats["p95_ms"]:8.2f} {stats["p99_ms"]:8.2f}')
+    for event, counts in sorted(report['outcomes'].items()):
+        print(f'  {event}: ' + ', '.join(f'{label}={count}' for label, count in sorted(counts.items())))
+
+
+def compare(report, baseline, tolerance):
+    """Print regressions against baseline; returns True if none exceed tolerance"""
+    ok = True
+    if baseline.get('config') != report['config']:
+        print(f'[LOADTEST] Warning: baseline config {baseline.get("config")} differs from this run')
+    if report['events_per_second'] < baseline['events_per_second'] * (1 - tolerance):
+        print(f'[LOADTEST] REGRESSION throughput: {report["events_per_second"]:.0f} events/s '
+              f'vs baseline {baseline["events_per_second"]:.0f}')
+        ok = False
+    for event, stats in report['events'].items():
+        base = baseline['events'].get(event)
+        if not base:
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            if stats[key] > base[key] * (1 + tolerance) and stats[key] - base[key] > 0.05:
+                print(f'[LOADTEST] REGRESSION {event} {key}: {stats[key]:.2f} vs baseline {base[key]:.2f}')
+                ok = False
+    if ok:
+        print(f'[LOADTEST] Within {tolerance:.0%} of baseline')
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the game server in-process.')
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--bots', type=int, default=4, help='bots per room (2-5)')
+    parser.add_argument('--words', type=int, default=20, help='submissions per bot / per single player')
+    parser.add_argument('--players', type=int, default=10, help='concurrent single-player sessions')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help="keep the server's own log output")
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--baseline', metavar='FILE', help='compare against a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown fraction')
+    args = parser.parse_args(argv)
+
+    report = run(args.rooms, max(2, min(5, args.bots)), args.words, args.players,
+                 args.threads, args.seed, quiet=not args.verbose)
+    print_report(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f'[LOADTEST] Baseline saved to {args.save_baseline}')
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
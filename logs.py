@@ -0,0 +1,49 @@
+# logs.py - Level-gated, non-blocking logging
+"""
+Handlers log through get_logger('TAG'), which keeps the familiar
+'[TAG] message' output but:
+
+  - is gated by level (SPELLCAST_LOG_LEVEL, default INFO), so per-event
+    debug lines cost one level check when disabled - pass values as
+    arguments (log.debug('played %s', word)), not pre-formatted f-strings;
+  - never writes to stdout on the calling thread: records go onto a queue
+    that one background listener drains.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+LOG_LEVEL = os.environ.get('SPELLCAST_LOG_LEVEL', 'INFO').upper()
+
+_root = logging.getLogger('spellcast')
+_listener = None
+
+
+class _TagFormatter(logging.Formatter):
+    def format(self, record):
+        record.tag = record.name.rsplit('.', 1)[-1]
+        return super().format(record)
+
+
+def _start():
+    global _listener
+    records = queue.SimpleQueue()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(_TagFormatter('[%(tag)s] %(message)s'))
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    _root.addHandler(logging.handlers.QueueHandler(records))
+    _root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+    _root.propagate = False
+
+
+def get_logger(tag):
+    """Logger whose lines print as '[tag] ...'"""
+    if _listener is None:
+        _start()
+    return _root.getChild(tag)
@@ -0,0 +1,279 @@
+# models.py - Multiplayer room state as slotted dataclasses
+"""
+A room and everything in it, in place of nested dicts:
+
+    Room
+      players      player id -> Player, in join order (lookups by socket id are one dict hit)
+      turns        TurnRing over the same ids (the next player is one dict hit)
+      settings     Settings
+      timer_state  TimerState
+      round_state  RoundState, shared board mode: submissions by player id
+      game_state   TurnState, randomized per word mode
+
+Players join, leave and change socket only through Room.add_player,
+remove_player and rename_player, which keep players, turns and seats in step.
+rebind_player() moves the rest of a rejoining player's state (host, votes,
+turns, submissions, words played) to the new socket id, for the server and
+for event_log replay alike.
+A Submission keeps its words in play order (for the results) and in a set
+(for the duplicate check).
+
+to_client() builds the JSON a client gets from the dataclass fields: every
+field in declaration order except those marked HIDDEN (seeds, seat tokens,
+the round in progress), with id-keyed maps marked AS_LIST sent as lists of
+their values and sets as lists. Room.client_json() keeps that encoded until
+the room is marked dirty, which room_store.update() does around every
+change, so a room is encoded once per change however often it is sent.
+
+Rooms pickle as they are (RedisRoomStore, snapshots.py).
+"""
+import json
+import math
+from dataclasses import dataclass, field, fields
+from functools import cache
+
+HIDDEN = {'client': False}  # Never sent to clients
+AS_LIST = {'client': 'values'}  # Sent as the list of the map's values
+
+
+class TurnRing:
+    """Player ids in a cycle; add/remove/rename/next_after are all O(1)"""
+    __slots__ = ('_next', '_prev', '_head')
+
+    def __init__(self, ids=()):
+        self._next, self._prev, self._head = {}, {}, None
+        for player_id in ids:
+            self.add(player_id)
+
+    def __len__(self):
+        return len(self._next)
+
+    def __contains__(self, player_id):
+        return player_id in self._next
+
+    def __iter__(self):
+        player_id = self._head
+        for _ in range(len(self._next)):
+            yield player_id
+            player_id = self._next[player_id]
+
+    def __reduce__(self):
+        return TurnRing, (list(self),)
+
+    def add(self, player_id):
+        """Seat player_id last (just before the first player)"""
+        if player_id in self._next:
+            return
+        head = self._head
+        if head is None:
+            self._head = self._next[player_id] = self._prev[player_id] = player_id
+            return
+        tail = self._prev[head]
+        self._next[tail] = self._prev[head] = player_id
+        self._prev[player_id], self._next[player_id] = tail, head
+
+    def remove(self, player_id):
+        after = self._next.pop(player_id, None)
+        if after is None:
+            return
+        before = self._prev.pop(player_id)
+        if after == player_id:  # The last one
+            self._head = None
+            return
+        self._next[before], self._prev[after] = after, before
+        if self._head == player_id:
+            self._head = after
+
+    def rename(self, old_id, new_id):
+        """new_id takes old_id's place in the order"""
+        if old_id not in self._next:
+            return
+        after, before = self._next.pop(old_id), self._prev.pop(old_id)
+        if after == old_id:
+            after = before = new_id
+        self._next[before], self._prev[after] = new_id, new_id
+        self._next[new_id], self._prev[new_id] = after, before
+        if self._head == old_id:
+            self._head = new_id
+
+    def next_after(self, player_id):
+        """Whose turn follows player_id's, or None if player_id is not seated"""
+        return self._next.get(player_id)
+
+
+@dataclass(slots=True)
+class Player:
+    id: str
+    name: str
+    score: int = 0
+    ready: bool = False
+    seat: str = field(default=None, metadata=HIDDEN)  # Seat token (see Room.seats)
+
+
+@dataclass(slots=True)
+class Settings:
+    max_players: int = 4
+    rounds_per_player: int = 5  # Always 5 rounds
+    timer_type: str = 'voting'  # 'voting' or 'fixed'
+    fixed_minutes: float = 2  # Length of the fixed timer
+    board_mode: str = None  # 'shared' or 'randomized', chosen at start_game
+
+
+@dataclass(slots=True)
+class TimerState:
+    grace_active: bool = False
+    voting_active: bool = False
+    countdown_active: bool = False
+    votes: set = field(default_factory=set)  # Player ids
+    time_remaining: int = 0
+    expires_at: float = None  # Wall-clock deadline of the running timer
+    current_player_turn: str = None
+    timer_id: int = 0  # Tokens of the scheduled timers, one per slot (see schedule_room_timer)
+    round_timer_id: int = 0
+
+
+@dataclass(slots=True)
+class Submission:
+    """One player's words this round (shared board mode)"""
+    words: list = field(default_factory=list)  # In play order
+    positions: list = field(default_factory=list)  # Path of each word
+    score: int = 0
+    done: bool = False
+    played: set = field(default_factory=set, metadata=HIDDEN)  # words, for the duplicate check
+
+    def __contains__(self, word):
+        return word in self.played
+
+    def add(self, word, positions, score):
+        self.words.append(word)
+        self.positions.append(positions)
+        self.played.add(word)
+        self.score += score
+
+
+@dataclass(slots=True)
+class RoundState:
+    """Shared board mode: everyone plays the same board at once"""
+    board_state: object  # Board
+    round_number: int = 1
+    submissions: dict = field(default_factory=dict)  # player id -> Submission
+    timer_start: float = 0.0
+    timer_expires: float = math.inf
+    all_done: bool = False
+    timer_active: bool = True
+    swap_history: list = field(default_factory=list)  # FEATURE #2: tile swaps this round
+    board_version: int = 0
+
+    def reset_submissions(self, player_ids):
+        self.submissions = {player_id: Submission() for player_id in player_ids}
+
+
+@dataclass(slots=True)
+class TurnState:
+    """Randomized per word mode: players take turns on one board"""
+    board_state: object  # Board
+    active_player_id: str
+    mode: str = 'randomized_per_word'
+    current_round: int = 1
+    turn_number: int = 1
+    words_played: list = field(default_factory=list)  # {'player_id', 'word', 'score', 'turn'}
+    timer_active: bool = True
+    board_version: int = 0
+    timer_expires: float = None  # Set once the first word is played
+
+
+@dataclass(slots=True)
+class Room:
+    room_code: str
+    host: str
+    players: dict = field(default_factory=dict, metadata=AS_LIST)  # player id -> Player
+    settings: Settings = field(default_factory=Settings)
+    status: str = 'waiting'  # waiting, playing, finished
+    timer_state: TimerState = field(default_factory=TimerState)
+    seed: int = field(default=0, metadata=HIDDEN)  # Every draw in this room comes from room_rng(room)
+    rng_step: int = field(default=0, metadata=HIDDEN)
+    event_seq: int = field(default=0, metadata=HIDDEN)
+    last_activity: float = field(default=0.0, metadata=HIDDEN)  # Stamped by every room_store.update()
+    seats: dict = field(default_factory=dict, metadata=HIDDEN)  # Seat token -> player id
+    turns: TurnRing = field(default_factory=TurnRing, metadata=HIDDEN)
+    board_seed: int = field(default=None, metadata=HIDDEN)
+    round_state: RoundState = field(default=None, metadata=HIDDEN)
+    game_state: TurnState = field(default=None, metadata=HIDDEN)
+    encoded: bytes = field(default=b'', metadata=HIDDEN, repr=False, compare=False)  # Cached client JSON
+    dirty: bool = field(default=True, metadata=HIDDEN, repr=False, compare=False)  # encoded is out of date
+
+    def client_json(self):
+        """to_client(self) as UTF-8 JSON bytes, encoded again only after the room was marked dirty"""
+        if self.dirty:
+            self.encoded = json.dumps(to_client(self), separators=(',', ':')).encode()
+            self.dirty = False
+        return self.encoded
+
+    def add_player(self, player):
+        self.players[player.id] = player
+        self.turns.add(player.id)
+
+    def remove_player(self, player_id):
+        """The removed Player (its seat released), or None"""
+        player = self.players.pop(player_id, None)
+        if player is not None:
+            self.turns.remove(player_id)
+            self.seats.pop(player.seat, None)
+        return player
+
+    def rename_player(self, old_id, new_id):
+        """Give old_id's player, place in the order and seat to new_id"""
+        self.players = {(new_id if player_id == old_id else player_id): player
+                        for player_id, player in self.players.items()}
+        player = self.players[new_id]
+        player.id = new_id
+        self.turns.rename(old_id, new_id)
+        if player.seat is not None:
+            self.seats[player.seat] = new_id
+
+    def next_player_id(self, player_id):
+        return self.turns.next_after(player_id)
+
+
+def rebind_player(room, old_id, new_id):
+    """Move everything the room keeps under old_id to new_id (a rejoin from a new socket)"""
+    if old_id in room.players:
+        room.rename_player(old_id, new_id)
+    if room.host == old_id:
+        room.host = new_id
+
+    timer_state = room.timer_state
+    if timer_state.current_player_turn == old_id:
+        timer_state.current_player_turn = new_id
+    if old_id in timer_state.votes:
+        timer_state.votes.discard(old_id)
+        timer_state.votes.add(new_id)
+
+    round_state = room.round_state
+    if round_state and old_id in round_state.submissions:
+        round_state.submissions[new_id] = round_state.submissions.pop(old_id)
+    game_state = room.game_state
+    if game_state:
+        if game_state.active_player_id == old_id:
+            game_state.active_player_id = new_id
+        for played in game_state.words_played:
+            if played['player_id'] == old_id:
+                played['player_id'] = new_id
+
+
+@cache
+def client_fields(cls):
+    """(name, as_list) for each field of a model class that clients see"""
+    return tuple((f.name, f.metadata.get('client') == 'values') for f in fields(cls) if f.metadata.get('client', True))
+
+
+def to_client(value):
+    """JSON-ready copy of a model, or of anything a model holds, as clients see it"""
+    if hasattr(type(value), '__dataclass_fields__'):
+        return {name: to_client(list(getattr(value, name).values()) if as_list else getattr(value, name))
+                for name, as_list in client_fields(type(value))}
+    if isinstance(value, dict):
+        return {key: to_client(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_client(item) for item in value]
+    return value
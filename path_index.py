@@ -0,0 +1,98 @@
+# path_index.py - Cached word -> paths lookups per board
+"""
+Players on the same board keep trying the same words, so the paths a word
+can take on a board are worked out once and kept:
+
+    board_paths.paths(board_letters, 'CAT', diagonal=False)
+        -> frozenset of paths, each a tuple of flat cell indices
+    board_paths.has_path(board_letters, 'CAT', [[0, 0], [0, 1], [0, 2]], diagonal=False)
+
+Entries are keyed by the board's letters, so a board whose cells change is
+simply a different key and a stale answer is never served; code that changes
+cells also calls forget() on the old board so its entry goes right away.
+Boards are evicted least recently used beyond max_boards.
+"""
+import threading
+from collections import OrderedDict
+
+from board import Board
+from board_geometry import GRID_SIZE, cell_index, neighbour_table
+
+
+def board_key(board_letters):
+    """Board letters (a Board or a 2D list) as one uppercase string"""
+    if isinstance(board_letters, Board):
+        return board_letters.letter_string()
+    return ''.join(''.join(row) for row in board_letters).upper()
+
+
+def path_key(positions):
+    """[[row, col], ...] as a tuple of flat indices, or None if any position is malformed"""
+    try:
+        key = tuple(cell_index(row, col) for row, col in positions)
+    except (TypeError, ValueError):
+        return None
+    return None if -1 in key else key
+
+
+def find_paths(letters, word, diagonal=True):
+    """Every path spelling word (uppercase) on a flat uppercase letter string"""
+    neighbours = neighbour_table(GRID_SIZE, diagonal)
+    paths = []
+    path = []
+
+    def extend(index, visited):
+        path.append(index)
+        if len(path) == len(word):
+            paths.append(tuple(path))
+        else:
+            next_letter = word[len(path)]
+            for nxt in neighbours[index]:
+                if not visited & (1 << nxt) and letters[nxt] == next_letter:
+                    extend(nxt, visited | (1 << nxt))
+        path.pop()
+
+    if word:
+        for index, letter in enumerate(letters):
+            if letter == word[0]:
+                extend(index, 1 << index)
+    return frozenset(paths)
+
+
+class BoardPathCache:
+    def __init__(self, max_boards=4096):
+        self.max_boards = max_boards
+        self._boards = OrderedDict()  # (board key, diagonal) -> {word: frozenset of paths}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._boards)
+
+    def paths(self, board_letters, word, diagonal=True):
+        key = (board_key(board_letters), diagonal)
+        word = word.upper()
+        with self._lock:
+            words = self._boards.get(key)
+            if words is None:
+                words = self._boards[key] = {}
+                if len(self._boards) > self.max_boards:
+                    self._boards.popitem(last=False)
+            else:
+                self._boards.move_to_end(key)
+            found = words.get(word)
+        if found is None:
+            found = find_paths(key[0], word, diagonal)
+            words[word] = found
+        return found
+
+    def has_path(self, board_letters, word, positions, diagonal=True):
+        """True if positions trace word on this board (bounds, adjacency, no reuse, letters)"""
+        key = path_key(positions)
+        return key is not None and key in self.paths(board_letters, word, diagonal)
+
+    def forget(self, board_letters):
+        """Drop a board's cached paths (call before changing its cells)"""
+        key = board_key(board_letters)
+        with self._lock:
+            self._boards.pop((key, True), None)
+            self._boards.pop((key, False), None)
@@ -0,0 +1,168 @@
+# ratelimit.py - Token buckets per socket and event
+"""
+Each socket gets a token bucket per rate-limited event, plus one shared by
+every event it sends ('*'), so a client flooding the single worker only ever
+spends its own budget and rooms with well-behaved players are not slowed
+down by the worst one.
+
+    limiter = EventRateLimiter(parse_budgets(RATE_LIMITS), timer_scheduler)
+    limiter.merge('player_tile_selection', deliver)  # deliver(sid, data)
+    verdict = limiter.admit(sid, 'player_tile_selection', data)
+
+An event over budget is dropped, unless the event merges: then only the
+newest dropped payload per socket is kept and passed to deliver() once a
+token frees up, so a fast drag still ends on its final highlight. A socket
+that has more than abuse_drops events refused within abuse_window seconds
+gets DISCONNECT, and the caller drops the connection.
+
+Budgets are 'event=rate/burst' pairs (tokens per second / bucket size),
+comma separated, as in SPELLCAST_RATE_LIMITS; entries there replace the
+defaults one event at a time.
+"""
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+from logs import get_logger
+
+log = get_logger('RATELIMIT')
+
+Budget = namedtuple('Budget', ['rate', 'burst'])
+
+ANY_EVENT = '*'
+DEFAULT_BUDGETS = {
+    ANY_EVENT: Budget(60, 120),  # Everything one socket sends
+    'player_tile_selection': Budget(30, 60),  # Drag highlights
+    'swap_tile': Budget(2, 5),
+    'vote_timer': Budget(1, 3),
+    'join_room': Budget(0.5, 3),
+}
+RATE_LIMITS = os.environ.get('SPELLCAST_RATE_LIMITS', '')
+ABUSE_DROPS = 200
+ABUSE_WINDOW_SECONDS = 10.0
+
+ADMIT, DROP, MERGE, DISCONNECT = 'admit', 'drop', 'merge', 'disconnect'
+
+
+def parse_budgets(spec, defaults=DEFAULT_BUDGETS):
+    """'swap_tile=2/5,join_room=0.5/3' over the defaults"""
+    budgets = dict(defaults)
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        try:
+            event, limit = item.split('=')
+            rate, burst = limit.split('/')
+            budget = Budget(float(rate), float(burst))
+            if budget.rate <= 0 or budget.burst < 1:
+                raise ValueError(item)
+            budgets[event.strip()] = budget
+        except ValueError:
+            log.warning('Ignoring malformed rate limit %r (want event=rate/burst)', item)
+    return budgets
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, budget, now):
+        self.rate, self.burst = budget
+        self.tokens = self.burst
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self):
+        """Seconds until one token is available (after refill)"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class _Client:
+    __slots__ = ('buckets', 'refusals', 'pending')
+
+    def __init__(self):
+        self.buckets = {}  # event -> TokenBucket
+        self.refusals = deque()  # monotonic times of recent refused events
+        self.pending = {}  # merging event -> newest refused payload
+
+
+class EventRateLimiter:
+    def __init__(self, budgets, scheduler, abuse_drops=ABUSE_DROPS, abuse_window=ABUSE_WINDOW_SECONDS):
+        self.budgets = dict(budgets)
+        self.scheduler = scheduler
+        self.abuse_drops = abuse_drops
+        self.abuse_window = abuse_window
+        self._mergers = {}  # event -> deliver(sid, data)
+        self._clients = {}  # sid -> _Client
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def merge(self, event, deliver):
+        """Over budget, keep event's newest payload and pass it to deliver(sid, data) later"""
+        self._mergers[event] = deliver
+
+    def _take(self, client, event, now):
+        """Spend a token from event's bucket (if it has a budget) and the socket's shared one"""
+        buckets = []
+        for name in (event, ANY_EVENT):
+            budget = self.budgets.get(name)
+            if budget is None:
+                continue
+            bucket = client.buckets.get(name)
+            if bucket is None:
+                bucket = client.buckets[name] = TokenBucket(budget, now)
+            else:
+                bucket.refill(now)
+            if bucket.tokens < 1:
+                return bucket
+            buckets.append(bucket)
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return None
+
+    def admit(self, sid, event, data=None):
+        """ADMIT to run the handler now; DROP or MERGE to skip it; DISCONNECT for an abusive socket"""
+        now = time.monotonic()
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                client = self._clients[sid] = _Client()
+            empty = self._take(client, event, now)
+            if empty is None:
+                client.pending.pop(event, None)  # This newer event supersedes a merged one
+                return ADMIT
+
+            refusals = client.refusals
+            refusals.append(now)
+            while refusals and refusals[0] < now - self.abuse_window:
+                refusals.popleft()
+            if len(refusals) > self.abuse_drops:
+                return DISCONNECT
+
+            if event not in self._mergers:
+                return DROP
+            if event not in client.pending:
+                self.scheduler.call_later(empty.wait(), self._flush, sid, event, key=('ratelimit', sid))
+            client.pending[event] = data
+            return MERGE
+
+    def _flush(self, sid, event):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None or event not in client.pending:
+                return
+            empty = self._take(client, event, time.monotonic())
+            if empty is not None:  # The shared bucket ran dry meanwhile; try again when it refills
+                self.scheduler.call_later(empty.wait(), self._flush, sid, event, key=('ratelimit', sid))
+                return
+            data = client.pending.pop(event)
+        self._mergers[event](sid, data)
+
+    def forget(self, sid):
+        """Drop a disconnected socket's buckets and any payload waiting to merge"""
+        with self._lock:
+            self._clients.pop(sid, None)
+        self.scheduler.cancel_key(('ratelimit', sid))
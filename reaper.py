@@ -0,0 +1,216 @@
+# reaper.py - Expiring idle rooms and games
+"""
+Rooms are otherwise only removed when their last player leaves or
+disconnects, so a lobby nobody started, a game everyone wandered away from,
+or a room restored from a snapshot that nobody rejoined would stay forever.
+RoomReaper closes rooms idle past the TTL for their status, measured from
+the last_activity stamp every room_store.update() leaves, and whenever
+there are more than max_rooms closes the rooms nearest their deadline,
+passing over games in progress. A room is only read (room_store.get) to
+decide; update() - which stamps last_activity - is taken only to close it.
+
+Every tracked room sits in a heap keyed by the deadline it had when last
+looked at. A sweep pops only the entries that are due; a room that was used
+since is pushed back with its new deadline instead of being closed. So a
+sweep costs O(k log n) for k due entries, however many rooms are live.
+Activity only ever moves a deadline later, which the sweep notices; a room
+whose deadline moves earlier (its status changed) must be passed to track()
+again, which pushes the new deadline and leaves the old entry to be skipped.
+
+admit() keeps new rooms within max_rooms as they are created: it closes
+rooms already past their deadline to make space, and otherwise says no.
+
+Each sweep also expires single-player games past their TTL (MemoryGameStore
+otherwise only evicts when it stores a game) and reports what it freed,
+sized with deep_size().
+"""
+import heapq
+import os
+import sys
+import threading
+import time
+
+from logs import get_logger
+
+log = get_logger('REAPER')
+
+ROOM_TTLS = {  # Seconds since the room last changed, by room status
+    'waiting': 30 * 60,
+    'playing': 20 * 60,
+    'finished': 5 * 60,
+}
+ORPHAN_TTL_SECONDS = 2 * 60  # No player connected at all (dropped mid-handshake, never rejoined)
+MAX_ROOMS = int(os.environ.get('SPELLCAST_MAX_ROOMS', 5000))
+REAP_INTERVAL_SECONDS = 15.0
+
+
+def deep_size(obj, seen=None):
+    """Approximate bytes held by obj and everything it references (containers and __slots__)"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    else:
+        for slot in getattr(type(obj), '__slots__', ()):
+            if hasattr(obj, slot):
+                size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+class RoomReaper:
+    """
+    on_close(room, reason) runs under the room's update just before it is
+    deleted ('idle', 'orphaned' or 'capacity'). is_connected(player_id), if
+    given, marks rooms whose players are all gone for the shorter orphan TTL.
+    """
+
+    def __init__(self, room_store, on_close, ttls=ROOM_TTLS, max_rooms=MAX_ROOMS,
+                 is_connected=None, orphan_ttl=ORPHAN_TTL_SECONDS, game_store=None):
+        self.room_store = room_store
+        self.on_close = on_close
+        self.ttls = dict(ttls)
+        self.max_rooms = max_rooms
+        self.is_connected = is_connected
+        self.orphan_ttl = orphan_ttl
+        self.game_store = game_store
+        self.reaped = {}  # reason -> rooms (or 'single_player' games) closed
+        self.reclaimed_bytes = 0
+        self._heap = []  # (deadline seen when pushed, room code); stale unless it matches _deadlines
+        self._deadlines = {}  # room code -> deadline of its live heap entry
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def deadline(self, room):
+        """(when the room expires, why)"""
+        last_activity = room.last_activity or time.time()
+        if self.is_connected is not None and not any(map(self.is_connected, room.players)):
+            return last_activity + self.orphan_ttl, 'orphaned'
+        return last_activity + self.ttls.get(room.status, max(self.ttls.values())), 'idle'
+
+    def track(self, room_code, room):
+        """Start watching a room (once it exists in the store), or look again after its status changed"""
+        deadline = self.deadline(room)[0]
+        with self._lock:
+            if self._deadlines.get(room_code) != deadline:
+                self._deadlines[room_code] = deadline
+                heapq.heappush(self._heap, (deadline, room_code))
+                if len(self._heap) > 2 * len(self._deadlines) + 64:  # Mostly superseded entries: rebuild
+                    self._heap = [(d, code) for code, d in self._deadlines.items()]
+                    heapq.heapify(self._heap)
+
+    def admit(self, now=None):
+        """Before creating a room: True if it fits under max_rooms, closing overdue rooms to make space"""
+        if len(self.room_store) < self.max_rooms:
+            return True
+        now = time.time() if now is None else now
+        while len(self.room_store) >= self.max_rooms:
+            code = self._pop(now)
+            if code is None:
+                return False
+            self._close(code, now, None)
+        return True
+
+    def sweep(self, now=None):
+        """Close due rooms, then those nearest their deadline while over max_rooms; returns rooms closed"""
+        now = time.time() if now is None else now
+        closed = 0
+        while True:
+            code = self._pop(now)
+            if code is None:
+                break
+            closed += self._close(code, now, None)
+
+        excess = len(self.room_store) - self.max_rooms
+        kept = []  # Games in progress, tracked again once the pass is over
+        while excess > 0:
+            code = self._pop(None)
+            if code is None:
+                break
+            if self._close(code, now, 'capacity'):
+                closed += 1
+                excess -= 1
+            else:
+                kept.append(code)
+        for code in kept:
+            room = self.room_store.get(code)
+            if room is not None:
+                self.track(code, room)
+
+        if self.game_store is not None:
+            games = self.game_store.expire()
+            if games:
+                self._count('single_player', len(games), sum(deep_size(game) for game in games))
+        return closed
+
+    def _pop(self, now):
+        """Next room code due by now (any room when now is None) whose heap deadline is current"""
+        with self._lock:
+            while self._heap and (now is None or self._heap[0][0] <= now):
+                seen_deadline, code = heapq.heappop(self._heap)
+                if self._deadlines.get(code) != seen_deadline:  # Superseded by a later track()
+                    continue
+                room = self.room_store.get(code)
+                if room is None:  # Closed some other way (last player left)
+                    del self._deadlines[code]
+                    continue
+                deadline = self.deadline(room)[0]
+                if deadline > seen_deadline:  # Used since; look again at its new deadline
+                    self._deadlines[code] = deadline
+                    heapq.heappush(self._heap, (deadline, code))
+                    continue
+                del self._deadlines[code]
+                return code
+            return None
+
+    def _closable(self, room, now, reason):
+        if reason == 'capacity':
+            return room.status != 'playing'
+        return self.deadline(room)[0] <= now
+
+    def _close(self, code, now, reason):
+        """1 if the room was closed; an idle room that was used since is tracked again"""
+        room = self.room_store.get(code)
+        if room is not None and self._closable(room, now, reason):
+            with self.room_store.update(code) as room:
+                if room is None:
+                    return 0
+                # Changed between the get and the lock: the update stamp only repeats the one it just had
+                if self._closable(room, now, reason):
+                    reason = reason or self.deadline(room)[1]
+                    size = deep_size(room)
+                    self.on_close(room, reason)
+                    self.room_store.delete(code)
+                    self._count(reason, 1, size)
+                    log.info('Closed room %s (%s, idle %.0fs, ~%d bytes)', code, reason,
+                             now - (room.last_activity or now), size)
+                    return 1
+        if room is not None and reason is None:
+            self.track(code, room)
+        return 0
+
+    def _count(self, reason, count, size):
+        with self._lock:
+            self.reaped[reason] = self.reaped.get(reason, 0) + count
+            self.reclaimed_bytes += size
+
+    def start(self, interval=REAP_INTERVAL_SECONDS):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='room-reaper', daemon=True)
+            self._thread.start()
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                log.exception('Reaper sweep failed: %s', e)
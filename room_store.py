@@ -0,0 +1,240 @@
+# room_store.py - Where multiplayer rooms live
+"""
+Rooms are read and changed only through a RoomStore, so they can live either
+in this process (MemoryRoomStore, the default) or in Redis (RedisRoomStore)
+where every worker and node sees the same rooms.
+
+    room = room_store.get(code)            # read
+    with room_store.update(code) as room:  # atomic read-modify-write
+        if room is None: ...               # room does not exist
+        room.status = 'playing'
+
+For MemoryRoomStore get() returns the live room, so callers must only change a
+room inside update(). For RedisRoomStore get() returns a private copy and
+update() holds a per-room Redis lock, loads the room and writes it back when
+the block exits without raising. Either way update() stamps the room's
+last_activity (wall-clock seconds), which reaper.py expires rooms by, and
+marks it dirty on the way in and out, so its cached client JSON
+(Room.client_json) is never older than the room; RedisRoomStore encodes it
+before writing the room back, so readers on every worker share it.
+MemoryRoomStore also counts updates per room (revision()) so snapshots.py
+re-pickles only rooms that changed.
+"""
+import itertools
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+
+from logs import get_logger
+
+log = get_logger('ROOMS')
+
+
+class RoomStore:
+    def get(self, room_code):
+        raise NotImplementedError
+
+    def exists(self, room_code):
+        return self.get(room_code) is not None
+
+    def create(self, room_code, room):
+        """Store a new room; returns False if the code is already taken."""
+        raise NotImplementedError
+
+    def update(self, room_code):
+        raise NotImplementedError
+
+    def delete(self, room_code):
+        raise NotImplementedError
+
+    def room_codes(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryRoomStore(RoomStore):
+    """
+    In-process rooms with one lock per room, so updates to unrelated rooms
+    never wait on each other. The registry lock is only held to look up,
+    add or drop a room and its lock, never while a room is being changed.
+    """
+
+    def __init__(self):
+        self._rooms = {}
+        self._locks = {}  # room code -> RLock guarding that room
+        self._revisions = {}  # room code -> bumped after every update(), so snapshots skip unchanged rooms
+        self._registry_lock = threading.Lock()
+
+    def get(self, room_code):
+        return self._rooms.get(room_code)
+
+    def exists(self, room_code):
+        return room_code in self._rooms
+
+    def create(self, room_code, room):
+        with self._registry_lock:
+            if room_code in self._rooms:
+                return False
+            self._locks[room_code] = threading.RLock()
+            self._rooms[room_code] = room
+            self._revisions[room_code] = 0
+            return True
+
+    def _room_lock(self, room_code):
+        with self._registry_lock:
+            return self._locks.get(room_code)
+
+    @contextmanager
+    def update(self, room_code):
+        while True:
+            lock = self._room_lock(room_code)
+            if lock is None:
+                yield None
+                return
+            with lock:
+                # The room may have been deleted (and its code reused) while we waited
+                if self._room_lock(room_code) is not lock:
+                    continue
+                room = self._rooms[room_code]
+                room.dirty = True  # Anything encoded before the block is stale inside it
+                try:
+                    yield room
+                finally:
+                    if self._room_lock(room_code) is lock:  # Not deleted inside the block
+                        room.last_activity = time.time()
+                        room.dirty = True  # ...and anything encoded in it, once it carries on changing
+                        self._revisions[room_code] += 1
+                return
+
+    def delete(self, room_code):
+        with self._registry_lock:
+            self._rooms.pop(room_code, None)
+            self._locks.pop(room_code, None)
+            self._revisions.pop(room_code, None)
+
+    def room_codes(self):
+        return list(self._rooms)
+
+    def revision(self, room_code):
+        """Counter bumped by every update() of the room; None once it is gone"""
+        return self._revisions.get(room_code)
+
+    def dump(self, room_code):
+        """(revision, pickled room) taken under the room's lock, or None if it is gone"""
+        while True:
+            lock = self._room_lock(room_code)
+            if lock is None:
+                return None
+            with lock:
+                if self._room_lock(room_code) is not lock:
+                    continue
+                return self._revisions[room_code], pickle.dumps(self._rooms[room_code], pickle.HIGHEST_PROTOCOL)
+
+    def __len__(self):
+        return len(self._rooms)
+
+
+class RedisRoomStore(RoomStore):
+    """
+    Rooms pickled under '<prefix>room:<code>' in any client speaking the
+    redis-py API (redis.Redis for production, fakeredis.FakeRedis or a local
+    redis-server for testing). update() takes '<prefix>lock:<code>' with
+    SET NX PX, so updates to one room are serialised across all workers.
+    '<prefix>rooms' counts the rooms, so len() is one GET rather than a SCAN.
+    """
+
+    LOCK_TIMEOUT_MS = 5000
+    LOCK_RETRY_SECONDS = 0.002
+
+    def __init__(self, client, prefix='spellcast:'):
+        self.client = client
+        self.prefix = prefix
+        self._tokens = itertools.count()
+        self._owner = f'{os.getpid()}:{id(self)}'
+        self._count_key = f'{prefix}rooms'
+        self.client.set(self._count_key, len(self.room_codes()), nx=True)  # First worker against this Redis
+
+    def _key(self, room_code):
+        return f'{self.prefix}room:{room_code}'
+
+    def _lock_key(self, room_code):
+        return f'{self.prefix}lock:{room_code}'
+
+    def get(self, room_code):
+        raw = self.client.get(self._key(room_code))
+        return pickle.loads(raw) if raw else None
+
+    def exists(self, room_code):
+        return bool(self.client.exists(self._key(room_code)))
+
+    def create(self, room_code, room):
+        if not self.client.set(self._key(room_code), pickle.dumps(room, pickle.HIGHEST_PROTOCOL), nx=True):
+            return False
+        self.client.incr(self._count_key)
+        return True
+
+    def _acquire(self, room_code):
+        token = f'{self._owner}:{next(self._tokens)}'
+        key = self._lock_key(room_code)
+        while not self.client.set(key, token, nx=True, px=self.LOCK_TIMEOUT_MS):
+            time.sleep(self.LOCK_RETRY_SECONDS)
+        return token
+
+    def _release(self, room_code, token):
+        # Only delete the lock if it is still ours (it may have timed out and been re-taken)
+        key = self._lock_key(room_code)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.get(key)
+                if current is not None and (current.decode() if isinstance(current, bytes) else current) == token:
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except Exception as e:
+                log.warning('Lock release for %s failed: %s', room_code, e)
+
+    @contextmanager
+    def update(self, room_code):
+        token = self._acquire(room_code)
+        try:
+            room = self.get(room_code)
+            if room is not None:
+                room.dirty = True
+            yield room
+            if room is not None and self.client.exists(self._key(room_code)):
+                room.last_activity = time.time()
+                room.dirty = True
+                room.client_json()  # Encoded once here instead of by every worker that reads the room
+                self.client.set(self._key(room_code), pickle.dumps(room, pickle.HIGHEST_PROTOCOL))
+        finally:
+            self._release(room_code, token)
+
+    def delete(self, room_code):
+        if self.client.delete(self._key(room_code)):
+            self.client.decr(self._count_key)
+
+    def room_codes(self):
+        start = len(self._key(''))
+        codes = []
+        for key in self.client.scan_iter(match=self._key('*')):
+            key = key.decode() if isinstance(key, bytes) else key
+            codes.append(key[start:])
+        return codes
+
+    def __len__(self):
+        return max(0, int(self.client.get(self._count_key) or 0))
+
+
+def create_room_store(redis_url=None):
+    """RedisRoomStore when a Redis URL is configured, else MemoryRoomStore."""
+    if not redis_url:
+        return MemoryRoomStore()
+    import redis
+    return RedisRoomStore(redis.Redis.from_url(redis_url))
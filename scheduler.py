@@ -0,0 +1,131 @@
+# scheduler.py - One deadline heap for every room timer
+"""
+All game timers (grace periods, vote countdowns, fixed turn/round timers) are
+entries in a single heap of deadlines served by ONE background worker, instead
+of one sleeping thread per room that wakes every second to emit a tick.
+
+The worker sleeps until the earliest deadline, so cost grows with the number
+of timers that actually fire. Timers are grouped by key (the room code) so a
+room can cancel everything it has pending in one call; cancelled entries are
+dropped lazily when they reach the top of the heap.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from logs import get_logger
+
+log = get_logger('TIMER')
+
+
+class TimerHandle:
+    """A scheduled callback. Pass it to TimerScheduler.cancel() to stop it."""
+    __slots__ = ('deadline', 'callback', 'args', 'key', 'cancelled')
+
+    def __init__(self, deadline, callback, args, key):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.key = key
+        self.cancelled = False
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class TimerScheduler:
+    def __init__(self):
+        self._heap = []  # (deadline, seq, handle)
+        self._seq = itertools.count()
+        self._by_key = {}  # key -> set of live handles
+        self._cancelled = 0
+        self._cond = threading.Condition()
+        self._started = False
+
+    def _ensure_worker(self):
+        if self._started:
+            return
+        self._started = True
+        worker = threading.Thread(target=self._run, name='timer-scheduler')
+        worker.daemon = True
+        worker.start()
+
+    def call_later(self, delay, callback, *args, key=None):
+        """Run callback(*args) on the scheduler worker after delay seconds."""
+        handle = TimerHandle(time.monotonic() + delay, callback, args, key)
+        with self._cond:
+            self._ensure_worker()
+            heapq.heappush(self._heap, (handle.deadline, next(self._seq), handle))
+            if key is not None:
+                self._by_key.setdefault(key, set()).add(handle)
+            # Only wake the worker if this is now the earliest deadline
+            if self._heap[0][2] is handle:
+                self._cond.notify()
+        return handle
+
+    def cancel(self, handle):
+        with self._cond:
+            self._cancel_locked(handle)
+
+    def cancel_key(self, key):
+        """Cancel every pending timer registered under key. Returns how many."""
+        with self._cond:
+            handles = self._by_key.pop(key, ())
+            for handle in handles:
+                handle.key = None
+                self._cancel_locked(handle)
+            return len(handles)
+
+    def pending(self, key=None):
+        with self._cond:
+            if key is None:
+                return len(self._heap) - self._cancelled
+            return len(self._by_key.get(key, ()))
+
+    def _cancel_locked(self, handle):
+        if handle.cancelled:
+            return
+        handle.cancelled = True
+        self._cancelled += 1
+        self._forget_locked(handle)
+        # Rebuild once dead entries dominate so the heap stays proportional to live timers
+        if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _forget_locked(self, handle):
+        if handle.key is not None:
+            handles = self._by_key.get(handle.key)
+            if handles is not None:
+                handles.discard(handle)
+                if not handles:
+                    del self._by_key[handle.key]
+
+    def _pop_due(self):
+        """Block until a live timer is due, then pop and return it."""
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                    self._cancelled -= 1
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                handle = heapq.heappop(self._heap)[2]
+                handle.cancelled = True  # fired handles can no longer be cancelled
+                self._forget_locked(handle)
+                return handle
+
+    def _run(self):
+        while True:
+            handle = self._pop_due()
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                log.exception('Scheduled callback %s failed: %s', getattr(handle.callback, '__name__', handle.callback), e)
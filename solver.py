@@ -0,0 +1,369 @@
+# solver.py - Prefix-pruned board solver
+"""
+Finds every dictionary word that can be traced on a board in ONE depth-first
+search, instead of testing the whole dictionary word by word.
+
+The search walks the compiled DAWG from dictionary.py alongside the board: each
+step follows the edge for the next tile's letter, and a prefix with no edge has
+no dictionary words below it, so the search stops there.
+
+IncrementalSolver keeps a board's solution current as tiles change, searching
+again only around the changed cells.
+"""
+import threading
+import time
+import weakref
+from array import array
+from collections import OrderedDict
+
+from board_geometry import GRID_SIZE, neighbour_table, step_distances
+from dictionary import FINAL_BIT, ROOT
+from path_index import find_paths
+
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 25
+
+
+def solve_board(board_letters, dictionary, score_fn=None, min_length=MIN_WORD_LENGTH,
+                max_length=MAX_WORD_LENGTH, diagonal=True):
+    """
+    Solve a GRID_SIZE x GRID_SIZE board of letters.
+
+    Returns {word: (path, score)} for every playable word of at least
+    min_length letters. path is a list of [row, col] pairs. When score_fn is
+    given it is called as score_fn(path, word) and the highest-scoring path is
+    kept for each word; otherwise score is 0 and the first path found is kept.
+    diagonal=False solves under the strict 4-way multiplayer rule.
+    """
+    neighbours = neighbour_table(GRID_SIZE, diagonal)
+    letters = [board_letters[r][c].lower() for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+    codes = [ord(l) - 97 if len(l) == 1 else -1 for l in letters]
+    nodes, edges = dictionary.nodes, dictionary.edges
+    results = {}
+    path = []
+
+    # dictionary.child() inlined: this runs once per live prefix on the board
+    def visit(index, node, prefix, visited):
+        code = codes[index]
+        if not 0 <= code < 26:
+            return
+        mask = nodes[2 * node]
+        bit = 1 << code
+        if not mask & bit:
+            return
+        node = edges[nodes[2 * node + 1] + (mask & (bit - 1)).bit_count()]
+        prefix += letters[index]
+        path.append(index)
+        visited |= 1 << index
+
+        if len(prefix) >= min_length and nodes[2 * node] & FINAL_BIT:
+            coords = [[i // GRID_SIZE, i % GRID_SIZE] for i in path]
+            score = score_fn(coords, prefix) if score_fn else 0
+            best = results.get(prefix)
+            if best is None or score > best[1]:
+                results[prefix] = (coords, score)
+
+        if len(prefix) < max_length:
+            for nxt in neighbours[index]:
+                if not visited & (1 << nxt):
+                    visit(nxt, node, prefix, visited)
+        path.pop()
+
+    for start in range(GRID_SIZE * GRID_SIZE):
+        visit(start, ROOT, '', 0)
+
+    return results
+
+
+def best_word(solutions, exclude=()):
+    """Pick the highest-scoring (word, path, score) not in exclude, or None."""
+    best = None
+    for word, (path, score) in solutions.items():
+        if word in exclude:
+            continue
+        if best is None or score > best[2] or (score == best[2] and word < best[0]):
+            best = (word, path, score)
+    return best
+
+
+class _StopSearch(Exception):
+    pass
+
+
+def board_stats(board_letters, dictionary, word_score=None, min_length=MIN_WORD_LENGTH,
+                diagonal=True, enough_words=None, enough_score=None, deadline=None):
+    """
+    Quality summary of a board without building paths:
+    {'words': distinct words, 'best_score': max word_score(word), 'longest': len,
+     'complete': whether the whole board was searched}.
+
+    The search stops early once both enough_words and enough_score are reached
+    (when given), or at deadline (a time.perf_counter() value), so vetting a
+    good board costs a fraction of a full solve.
+    """
+    neighbours = neighbour_table(GRID_SIZE, diagonal)
+    letters = [board_letters[r][c].lower() for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+    codes = [ord(l) - 97 if len(l) == 1 else -1 for l in letters]
+    nodes, edges = dictionary.nodes, dictionary.edges
+    found = set()
+    stats = {'words': 0, 'best_score': 0, 'longest': 0, 'complete': False}
+    steps = [0]
+
+    def visit(index, node, prefix, visited):
+        code = codes[index]
+        if not 0 <= code < 26:
+            return
+        mask = nodes[2 * node]
+        bit = 1 << code
+        if not mask & bit:
+            return
+        node = edges[nodes[2 * node + 1] + (mask & (bit - 1)).bit_count()]
+        prefix += letters[index]
+        visited |= 1 << index
+
+        if len(prefix) >= min_length and nodes[2 * node] & FINAL_BIT and prefix not in found:
+            found.add(prefix)
+            if word_score:
+                stats['best_score'] = max(stats['best_score'], word_score(prefix))
+            stats['longest'] = max(stats['longest'], len(prefix))
+            if (enough_words is not None and len(found) >= enough_words
+                    and (enough_score is None or stats['best_score'] >= enough_score)):
+                raise _StopSearch
+
+        steps[0] += 1
+        if deadline is not None and not steps[0] & 255 and time.perf_counter() > deadline:
+            raise _StopSearch
+
+        for nxt in neighbours[index]:
+            if not visited & (1 << nxt):
+                visit(nxt, node, prefix, visited)
+
+    try:
+        for start in range(GRID_SIZE * GRID_SIZE):
+            visit(start, ROOT, '', 0)
+        stats['complete'] = True
+    except _StopSearch:
+        pass
+    stats['words'] = len(found)
+    return stats
+
+
+# ===== INCREMENTAL SOLVING =====
+
+_subtree_info = weakref.WeakKeyDictionary()
+
+
+def subtree_info(dictionary):
+    """
+    Per DAWG node: (letter mask of every edge below it, longest suffix below
+    it). Computed once per dictionary; used to skip prefixes that can never
+    reach a changed cell.
+    """
+    info = _subtree_info.get(dictionary)
+    if info is not None:
+        return info
+    nodes, edges = dictionary.nodes, dictionary.edges
+    count = len(nodes) // 2
+    letters_below = array('I', bytes(4 * count))
+    depth_below = array('H', bytes(2 * count))
+    done = bytearray(count)
+    for root in range(count):
+        if done[root]:
+            continue
+        stack = [(root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if done[node]:
+                continue
+            mask = nodes[2 * node] & ~FINAL_BIT
+            first = nodes[2 * node + 1]
+            children = [edges[first + i] for i in range(mask.bit_count())]
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children if not done[child])
+                continue
+            below, depth = mask, 0
+            for child in children:
+                below |= letters_below[child]
+                depth = max(depth, depth_below[child] + 1)
+            letters_below[node] = below
+            depth_below[node] = depth
+            done[node] = 1
+    info = _subtree_info[dictionary] = (letters_below, depth_below)
+    return info
+
+
+class IncrementalSolver:
+    """
+    Every word on a board with one path for it, kept current as cells change.
+    update(new_board) drops only the words whose path touches a changed cell
+    and searches again only for paths through them, pruning prefixes whose
+    remaining letters (per subtree_info) can neither reach a changed cell in
+    time nor spell one of the new letters; a dropped word not found that way
+    is looked up on its own, as it may still fit elsewhere. A move that
+    changes most of the board (e.g. a shuffle) just solves it again.
+
+    One path per word rather than all of them keeps a solver to a few
+    hundred words (~200 KB on a dense board, against ~1 MB with every path).
+    Paths for the same word score the same letters, so they differ only by
+    where they cross a DL/TL or the double-points cell.
+    """
+
+    FULL_SOLVE_FRACTION = 0.4
+
+    def __init__(self, dictionary, board_letters, min_length=MIN_WORD_LENGTH,
+                 max_length=MAX_WORD_LENGTH, diagonal=True):
+        self.dictionary = dictionary
+        self.min_length = min_length
+        self.max_length = max_length
+        self.diagonal = diagonal
+        self.paths = {}  # word -> one path (tuple of flat indices)
+        self._by_cell = [set() for _ in range(GRID_SIZE * GRID_SIZE)]  # cell -> words whose path crosses it
+        self.letters = self._flatten(board_letters)
+        self._search(None)
+
+    @staticmethod
+    def _flatten(board_letters):
+        return [board_letters[r][c].lower() for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+
+    def update(self, board_letters):
+        """Bring the solution up to date with board_letters; returns the changed cell indices."""
+        letters = self._flatten(board_letters)
+        changed = [i for i, (old, new) in enumerate(zip(self.letters, letters)) if old != new]
+        self.letters = letters
+        if not changed:
+            return changed
+        if len(changed) >= self.FULL_SOLVE_FRACTION * len(letters):
+            self.paths = {}
+            self._by_cell = [set() for _ in letters]
+            self._search(None)
+            return changed
+
+        dropped = set()
+        for cell in changed:
+            dropped |= self._by_cell[cell]
+        for word in dropped:
+            self._remove(word)
+        self._search(changed)
+        for word in dropped:
+            if word not in self.paths:
+                paths = find_paths(letters, word, self.diagonal)
+                if paths:
+                    self._add(word, min(paths))
+        return changed
+
+    def _add(self, word, path):
+        if word in self.paths:
+            return
+        self.paths[word] = path
+        for cell in path:
+            self._by_cell[cell].add(word)
+
+    def _remove(self, word):
+        path = self.paths.pop(word, None)
+        for cell in path or ():
+            self._by_cell[cell].discard(word)
+
+    def _search(self, changed):
+        """Find every path, or with changed cells only the paths through at least one of them."""
+        neighbours = neighbour_table(GRID_SIZE, self.diagonal)
+        letters = self.letters
+        codes = [ord(l) - 97 if len(l) == 1 else -1 for l in letters]
+        nodes, edges = self.dictionary.nodes, self.dictionary.edges
+        min_length, max_length = self.min_length, self.max_length
+        path = []
+
+        if changed is None:
+            required = 0
+            near = wanted = letters_below = depth_below = None
+        else:
+            letters_below, depth_below = subtree_info(self.dictionary)
+            distances = step_distances(GRID_SIZE, self.diagonal)
+            required = 0
+            wanted = 0  # letter mask of the new letters
+            for cell in changed:
+                required |= 1 << cell
+                if 0 <= codes[cell] < 26:
+                    wanted |= 1 << codes[cell]
+            near = [min(distances[i][cell] for cell in changed) for i in range(len(letters))]
+
+        def visit(index, node, prefix, visited):
+            code = codes[index]
+            if not 0 <= code < 26:
+                return
+            mask = nodes[2 * node]
+            bit = 1 << code
+            if not mask & bit:
+                return
+            node = edges[nodes[2 * node + 1] + (mask & (bit - 1)).bit_count()]
+            prefix += letters[index]
+            path.append(index)
+            visited |= 1 << index
+            touched = not required or visited & required
+
+            if touched and len(prefix) >= min_length and nodes[2 * node] & FINAL_BIT:
+                self._add(prefix, tuple(path))
+
+            # Until the path crosses a changed cell, only go on if a changed cell is
+            # still reachable and one of the new letters can still be spelled
+            if touched or (near[index] <= depth_below[node] and letters_below[node] & wanted):
+                if len(prefix) < max_length:
+                    for nxt in neighbours[index]:
+                        if not visited & (1 << nxt):
+                            visit(nxt, node, prefix, visited)
+            path.pop()
+
+        for start in range(len(letters)):
+            visit(start, ROOT, '', 0)
+
+    def stats(self, word_score=None):
+        """Board quality from the maintained words (no search)"""
+        words = self.paths
+        return {
+            'words': len(words),
+            'best_score': max((word_score(w) for w in words), default=0) if word_score else 0,
+            'longest': max((len(w) for w in words), default=0),
+        }
+
+    def solutions(self, score_fn=None):
+        """Same shape as solve_board(): {word: ([[row, col], ...], score)} with the kept path per word."""
+        results = {}
+        for word, path in self.paths.items():
+            coords = [[i // GRID_SIZE, i % GRID_SIZE] for i in path]
+            results[word] = (coords, score_fn(coords, word) if score_fn else 0)
+        return results
+
+
+class SolverCache:
+    """
+    IncrementalSolvers kept per key (e.g. a game id), least recently used
+    evicted beyond max_solvers. solver(key, board_letters) returns that key's
+    solver brought up to date with board_letters.
+    """
+
+    def __init__(self, dictionary, max_solvers=256, diagonal=True):
+        self.dictionary = dictionary
+        self.max_solvers = max_solvers
+        self.diagonal = diagonal
+        self._solvers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._solvers)
+
+    def solver(self, key, board_letters):
+        with self._lock:
+            solver = self._solvers.get(key)
+            if solver is None:
+                solver = IncrementalSolver(self.dictionary, board_letters, diagonal=self.diagonal)
+                self._solvers[key] = solver
+                if len(self._solvers) > self.max_solvers:
+                    self._solvers.popitem(last=False)
+            else:
+                self._solvers.move_to_end(key)
+                solver.update(board_letters)
+            return solver
+
+    def forget(self, key):
+        with self._lock:
+            self._solvers.pop(key, None)
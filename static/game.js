@@ -424,64 +424,19 @@ function initGame(initialState, letterScores) {
         // Removed auto-dismiss on click outside - definitions stay visible
     }
     
-    // FEATURE #4: Fetch word definition from Free Dictionary API
-async function fetchWordDefinition(word, isFallback = false) {
+    // FEATURE #4: Fetch word definition through the server's cached /define endpoint
+    // (it also falls back to the base word, e.g. berries -> berry)
+async function fetchWordDefinition(word) {
         try {
-            const response = await fetch(`https://api.dictionaryapi.dev/api/v2/entries/en/${word.toLowerCase()}`);
+            const response = await fetch(`/define/${encodeURIComponent(word.toLowerCase())}`);
             
             if (!response.ok) {
                 throw new Error('Word not found');
             }
             
-            const data = await response.json();
-            const entry = data[0];
-            
-            const meaning = entry.meanings && entry.meanings[0];
-            if (!meaning || !meaning.definitions || meaning.definitions.length === 0) {
-                throw new Error('No definitions available in the data');
-            }
-            
-// Format up to 3 definitions
-            let combinedDefinitions = '';
-            const maxDefs = Math.min(meaning.definitions.length, 3);
-            
-            for (let i = 0; i < maxDefs; i++) {
-                if (maxDefs > 1) {
-                    // Added \n\n to force a line break between numbered items!
-                    combinedDefinitions += `${i + 1}. ${meaning.definitions[i].definition}\n\n`; 
-                } else {
-                    combinedDefinitions += meaning.definitions[i].definition;
-                }
-            }
-            
-            const exampleSentence = meaning.definitions.find(def => def.example)?.example || '';
-            
-            return {
-                word: isFallback ? word : entry.word, // Keep the original word if it's a fallback
-                phonetic: entry.phonetic || (entry.phonetics && entry.phonetics[0] && entry.phonetics[0].text) || '',
-                partOfSpeech: meaning.partOfSpeech || 'word',
-                definition: combinedDefinitions.trim(),
-                example: exampleSentence
-            };
+            return await response.json();
             
         } catch (error) {
-            // THE SMART FALLBACK: If we haven't tried a fallback yet, chop the suffix and try again!
-            if (!isFallback) {
-                const baseCandidates = getBaseWordCandidates(word.toLowerCase());
-                
-                for (let baseWord of baseCandidates) {
-                    // Secretly fetch the chopped word
-                    const fallbackAttempt = await fetchWordDefinition(baseWord, true);
-                    
-                    // If the dictionary finds the base word, format it and return it!
-                    if (fallbackAttempt && !fallbackAttempt.definition.includes('Valid word, but definition not found')) {
-                        fallbackAttempt.word = word; // Keep the title as the word they played
-                        fallbackAttempt.definition = `*(Base word: ${baseWord})* ${fallbackAttempt.definition}`;
-                        return fallbackAttempt;
-                    }
-                }
-            }
-            
             // THE SAFETY NET: If it completely fails, don't crash the game.
             return {
                 word: word,
@@ -493,36 +448,6 @@ async function fetchWordDefinition(word, isFallback = false) {
         }
     }
 
-// HELPER FUNCTION: Chops common English suffixes and prefixes to guess the base word
-    function getBaseWordCandidates(word) {
-        const candidates = [];
-        const w = word.toLowerCase();
-        
-        // --- SAFE SUFFIXES ---
-        if (w.endsWith('ies')) candidates.push(w.slice(0, -3) + 'y'); // berries -> berry
-        if (w.endsWith('es')) candidates.push(w.slice(0, -2), w.slice(0, -1)); // boxes -> box
-        if (w.endsWith('s') && !w.endsWith('ss')) candidates.push(w.slice(0, -1)); // cats -> cat (ignore 'glass')
-        if (w.endsWith('ing')) candidates.push(w.slice(0, -3), w.slice(0, -3) + 'e'); // playing -> play, making -> make
-        if (w.endsWith('ed')) candidates.push(w.slice(0, -2), w.slice(0, -1)); // jumped -> jump, baked -> bake
-        if (w.endsWith('er') && w.length > 4) candidates.push(w.slice(0, -2), w.slice(0, -1)); // jerker -> jerk
-        if (w.endsWith('ly') && w.length > 4) candidates.push(w.slice(0, -2)); // quickly -> quick
-        if (w.endsWith('able')) candidates.push(w.slice(0, -4), w.slice(0, -4) + 'e'); // lovable -> love
-        if (w.endsWith('ness') && w.length > 5) candidates.push(w.slice(0, -4), w.slice(0, -4) + 'y'); // sadness -> sad, heaviness -> heavy
-        if (w.endsWith('hood') && w.length > 5) candidates.push(w.slice(0, -4)); // motherhood -> mother
-        if (w.endsWith('less') && w.length > 5) candidates.push(w.slice(0, -4)); // careless -> care
-        if (w.endsWith('ful') && w.length > 4) candidates.push(w.slice(0, -3)); // joyful -> joy
-        if (w.endsWith('ment') && w.length > 5) candidates.push(w.slice(0, -4)); // payment -> pay
-
-        // --- SAFE PREFIXES ---
-        // We only strip these if the remaining word is at least 3 letters long to avoid the "uncle" -> "cle" trap
-        if (w.startsWith('un') && w.length > 4) candidates.push(w.slice(2)); // untouched -> touched
-        if (w.startsWith('dis') && w.length > 5) candidates.push(w.slice(3)); // disable -> able
-        if (w.startsWith('re') && w.length > 4) candidates.push(w.slice(2)); // replay -> play
-        if (w.startsWith('pre') && w.length > 5) candidates.push(w.slice(3)); // preheat -> heat
-        
-        return candidates;
-    }
-
     async function setStateAndRender(newState, animationType = null) {
         const previousRound = gameState.round;
         gameState = newState;
@@ -2156,6 +2081,28 @@ async function fetchWordDefinition(word, isFallback = false) {
         await submitToServer(word, pathCoords);
     }
     
+    // Server replies with versioned deltas; if our copy is stale, fetch a full snapshot instead
+    async function resolveDelta(delta) {
+        if (delta.base_version !== gameState.version) {
+            return await fetchFullState();
+        }
+        const oldTiles = gameState.board_tiles;
+        const order = delta.order || oldTiles.map((_, i) => i);
+        return {
+            ...gameState,
+            ...delta.fields,
+            board_tiles: order.map((from, i) => delta.tiles[i] || { ...oldTiles[from] }),
+            found_words: gameState.found_words.concat(delta.found_words_added),
+            version: delta.version
+        };
+    }
+
+    async function fetchFullState() {
+        const response = await fetch('/state');
+        const result = await response.json();
+        return result.state;
+    }
+
     async function submitToServer(word, path) {
         const submittedPath = [...path];
         clearSelection();
@@ -2205,11 +2152,14 @@ async function fetchWordDefinition(word, isFallback = false) {
             
             await Promise.all([wordPromise, gemPromise, scorePromise]);
             
-            await setStateAndRender(result.new_state);
+            await setStateAndRender(await resolveDelta(result.delta));
             wordInput.disabled = false;
         } else {
             // BUG FIX #5: Ensure proper error message display
             showMessage(result.reason || 'Invalid word!', 'red');
+            if (result.resync) {
+                await setStateAndRender(await fetchFullState());
+            }
             wordInput.disabled = gameState.game_over;
         }
     }
@@ -2236,15 +2186,16 @@ async function fetchWordDefinition(word, isFallback = false) {
         }
         
         if(result.success){
+            const newState = await resolveDelta(result.delta);
             if (ability === 'shuffle') {
                 showMessage('Shuffling board!', 'blue');
                 playSound('swap');
                 await animateShuffleCards();
-                await setStateAndRender(result.new_state, 'shuffle');
+                await setStateAndRender(newState, 'shuffle');
             } else if (ability === 'hint') {
                 // FIX #1: HINT - Display hint persistently
-                currentGems = result.new_state.gems;
-                setStateAndRender(result.new_state);
+                currentGems = newState.gems;
+                setStateAndRender(newState);
                 
                 if (result.hint) {
                     const hintDisplay = document.getElementById('hint-display');
@@ -2262,8 +2213,8 @@ async function fetchWordDefinition(word, isFallback = false) {
                 }
             } else {
                 if(ability !== 'swap') showMessage(`${ability.charAt(0).toUpperCase()+ability.slice(1)} used!`,'green');
-                currentGems = result.new_state.gems;
-                setStateAndRender(result.new_state);
+                currentGems = newState.gems;
+                setStateAndRender(newState);
             }
         } else {
             showMessage(result.reason,'red');
@@ -25,6 +25,26 @@ let multiplayerState = {
 
 let socket = null;
 
+// Seat token from room_created/room_joined, kept per tab so this client can
+// take its seat back with 'rejoin_room' after the server restarts
+const SEAT_STORAGE_KEY = 'spellcastSeat';
+
+function rememberSeat(roomCode, seatToken) {
+    if (seatToken) sessionStorage.setItem(SEAT_STORAGE_KEY, JSON.stringify({ room_code: roomCode, seat_token: seatToken }));
+}
+
+function forgetSeat() {
+    sessionStorage.removeItem(SEAT_STORAGE_KEY);
+}
+
+function storedSeat() {
+    try {
+        return JSON.parse(sessionStorage.getItem(SEAT_STORAGE_KEY));
+    } catch (e) {
+        return null;
+    }
+}
+
 // FIX #3: Update connection status UI
 function updateConnectionStatus() {
     const statusDot = document.getElementById('connection-dot');
@@ -67,6 +87,10 @@ function initializeMultiplayer() {
         const joinBtn = document.getElementById('join-room-btn');
         if (createBtn) createBtn.disabled = false;
         if (joinBtn) joinBtn.disabled = false;
+        
+        // New socket id: if we held a seat, ask for it back
+        const seat = storedSeat();
+        if (seat) socket.emit('rejoin_room', seat);
     });
 
     socket.on('disconnect', () => {
@@ -74,6 +98,14 @@ function initializeMultiplayer() {
         console.log('[MULTIPLAYER] Disconnected from server');
     });
 
+    // Server batches room events per frame window - replay each through its normal handler
+    socket.on('room_batch', (batch) => {
+        batch.events.forEach(({ event, data, skip }) => {
+            if (skip && skip === multiplayerState.sessionId) return;
+            socket.listeners(event).forEach((handler) => handler(data));
+        });
+    });
+
     // ===== ROOM EVENTS =====
     socket.on('room_created', (data) => {
         console.log('[MULTIPLAYER] Room created successfully!', data);
@@ -83,6 +115,7 @@ function initializeMultiplayer() {
         multiplayerState.players = data.room.players;
         multiplayerState.timerSettings.type = data.room.settings.timer_type;
         multiplayerState.timerSettings.fixedMinutes = data.room.settings.fixed_minutes;
+        rememberSeat(data.room_code, data.seat_token);
         
         // Hide multiplayer menu, show lobby
         document.getElementById('multiplayer-menu').style.display = 'none';
@@ -111,6 +144,7 @@ function initializeMultiplayer() {
             multiplayerState.roomCode = data.room_code;
             multiplayerState.isHost = data.is_host;
             multiplayerState.players = data.room.players || [];
+            rememberSeat(data.room_code, data.seat_token);
             
             console.log('[MULTIPLAYER] Guest successfully joined room', data.room_code);
             
@@ -130,6 +164,55 @@ function initializeMultiplayer() {
         }
     });
 
+    // Back in our old seat on a new socket (the server restarted or we reconnected)
+    socket.on('room_rejoined', (data) => {
+        console.log('[MULTIPLAYER] Rejoined room', data.room_code);
+        multiplayerState.inRoom = true;
+        multiplayerState.roomCode = data.room_code;
+        multiplayerState.isHost = data.is_host;
+        multiplayerState.players = data.room.players;
+        
+        document.getElementById('multiplayer-menu').style.display = 'none';
+        if (data.room.status === 'playing' && data.board_state) {
+            document.getElementById('lobby').style.display = 'none';
+            document.getElementById('game-container').style.display = 'flex';
+            multiplayerState.boardState = data.board_state;
+            multiplayerState.boardVersion = data.board_version;
+            if (data.active_player_id) multiplayerState.activePlayerId = data.active_player_id;
+            renderSharedBoard(data.board_state);
+            showGameNotification('✓ Reconnected', 'green');
+        } else {
+            showLobby(data.room);
+            showLobbyNotification('✓ Reconnected', 'green');
+        }
+    });
+
+    socket.on('rejoin_failed', (data) => {
+        console.log('[MULTIPLAYER] Seat in room', data.room_code, 'is gone');
+        forgetSeat();
+    });
+
+    socket.on('player_rejoined', (data) => {
+        multiplayerState.players = data.room.players;
+        updateLobbyPlayerList(data.room);
+    });
+
+    // The server closed the room after it sat idle (or to make space)
+    socket.on('room_closed', (data) => {
+        console.log('[MULTIPLAYER] Room', data.room_code, 'closed:', data.reason);
+        forgetSeat();
+        multiplayerState.inRoom = false;
+        multiplayerState.roomCode = null;
+        multiplayerState.isHost = false;
+        multiplayerState.players = [];
+        stopLocalCountdown();
+        
+        document.getElementById('lobby').style.display = 'none';
+        document.getElementById('game-container').style.display = 'none';
+        document.getElementById('multiplayer-menu').style.display = 'flex';
+        showMultiplayerMenuNotification('Room closed after being idle', 'red');
+    });
+
     socket.on('player_left', (data) => {
         showLobbyNotification(`${data.player_name || 'A player'} left the room`, 'red');
         socket.emit('get_room_info');
@@ -153,15 +236,12 @@ function initializeMultiplayer() {
         multiplayerState.timerState.votingActive = false;
         multiplayerState.timerState.countdownActive = false;
         multiplayerState.timerState.hasVoted = false;
-        updateTimerDisplay('grace', data.duration);
+        startLocalCountdown(data.duration, (seconds) => updateTimerDisplay('grace', seconds));
         console.log('[TIMER] Grace period started:', data.duration);
     });
 
-    socket.on('timer_grace_tick', (data) => {
-        updateTimerDisplay('grace', data.seconds);
-    });
-
     socket.on('timer_voting_enabled', () => {
+        stopLocalCountdown();
         multiplayerState.timerState.graceActive = false;
         multiplayerState.timerState.votingActive = true;
         updateTimerDisplay('voting', 0);
@@ -178,47 +258,30 @@ function initializeMultiplayer() {
     socket.on('timer_countdown_started', (data) => {
         multiplayerState.timerState.votingActive = false;
         multiplayerState.timerState.countdownActive = true;
-        multiplayerState.timerState.timeRemaining = data.duration;
-        updateTimerDisplay('countdown', data.duration);
+        startLocalCountdown(data.duration, (seconds) => {
+            multiplayerState.timerState.timeRemaining = seconds;
+            updateTimerDisplay('countdown', seconds);
+        });
         console.log('[TIMER] Countdown started:', data.duration);
     });
 
-    socket.on('timer_countdown_tick', (data) => {
-        multiplayerState.timerState.timeRemaining = data.seconds;
-        updateTimerDisplay('countdown', data.seconds);
-    });
-
     socket.on('timer_fixed_started', (data) => {
         multiplayerState.timerState.countdownActive = true;
         multiplayerState.timerState.timeRemaining = data.duration;
         updateTimerDisplay('fixed', data.duration);
+        startLocalCountdown(data.duration, renderFixedTimerTick);
         console.log('[TIMER] Fixed timer started:', data.duration);
     });
 
-    socket.on('timer_fixed_tick', (data) => {
-        multiplayerState.timerState.timeRemaining = data.seconds;
-        
-        // Update display using proper elements
-        const timerText = document.getElementById('timer-text');
-        const timerBar = document.getElementById('timer-bar');
-        const timerContainer = document.getElementById('timer-container');
-        const timerLabel = document.getElementById('timer-label');
-        
-        // Get total duration from settings
-        const totalSeconds = Math.floor((multiplayerState.timerSettings.fixedMinutes || 2) * 60);
-        
-        if (timerText && timerBar && timerContainer && timerLabel) {
-            updateFixedTimerDisplay(data.seconds, totalSeconds, timerText, timerBar, timerContainer, timerLabel);
-        }
-    });
-
     socket.on('timer_expired', (data) => {
+        stopLocalCountdown();
         multiplayerState.timerState.countdownActive = false;
         showGameNotification('⏰ Time expired! Turn ended.', 'red');
         console.log('[TIMER] Timer expired for player:', data.player_id);
     });
 
     socket.on('turn_ended', (data) => {
+        stopLocalCountdown();
         multiplayerState.timerState.graceActive = false;
         multiplayerState.timerState.votingActive = false;
         multiplayerState.timerState.countdownActive = false;
@@ -251,6 +314,8 @@ function initializeMultiplayer() {
         
         // FEATURE 1: For shared board mode, render the board
         if (data.board_mode === 'shared' && data.board_state) {
+            multiplayerState.boardState = data.board_state;
+            multiplayerState.boardVersion = data.board_version || 0;
             renderSharedBoard(data.board_state);
             
             // Add 'I'm Done' button for simultaneous play
@@ -292,34 +357,60 @@ function initializeMultiplayer() {
         // FEATURE 2: Update scoreboard with new scores
         updateScoreboard(data.player_scores);
         
-        // FEATURE 1: Update board (consumed_positions, not rows)
-        if (data.board_state && data.consumed_positions) {
-            updateBoardPositions(data.board_state, data.consumed_positions);
+        // FEATURE 1: Update board (changed cells only, animate consumed positions)
+        if (data.changes && applyBoardDelta(data.base_version, data.version, data.changes)) {
+            updateBoardPositions(multiplayerState.boardState, data.consumed_positions || []);
         }
         
-        // Prepare for next round
+        // Prepare for next round (game_finished follows the last one instead)
+        if (data.game_over) return;
         setTimeout(() => {
             showGameNotification(`Starting Round ${data.round_number + 1}...`, 'blue');
             resetRoundState();
         }, 3000);
     });
     
-    // FEATURE 2: Tile swap event
+    // The last round (or turn) was played: final scores, nothing more to submit
+    socket.on('game_finished', (data) => {
+        console.log('[GAME] Finished', data);
+        updateScoreboard(data.player_scores);
+        const ranked = Object.entries(data.player_scores).sort((a, b) => b[1] - a[1]);
+        const winner = ranked.length ? data.room.players.find((p) => p.id === ranked[0][0]) : null;
+        showGameNotification(winner ? `Game over! ${winner.name} wins with ${ranked[0][1]} points` : 'Game over!', 'green');
+    });
+    
+    // FEATURE 2: Tile swap event (several swaps in one frame arrive merged in data.swaps)
     socket.on('tile_swapped', (data) => {
-        console.log('[SWAP] Tile swapped:', data.position, data.old_letter, '→', data.new_letter);
-        const [row, col] = data.position;
-        const tile = document.querySelector(`[data-r="${row}"][data-c="${col}"]`);
-        if (tile) {
-            const letterSpan = tile.querySelector('span');
-            if (letterSpan) {
-                // Animate swap
-                tile.style.animation = 'tileSwap 0.5s ease-out';
-                letterSpan.textContent = data.new_letter;
-                setTimeout(() => {
-                    tile.style.animation = '';
-                }, 500);
+        const swaps = data.swaps || [data];
+        if (!applyBoardDelta(data.base_version, data.version, swaps.map((swap) => [...swap.position, swap.new_letter]))) return;
+        swaps.forEach((swap) => {
+            console.log('[SWAP] Tile swapped:', swap.position, swap.old_letter, '→', swap.new_letter);
+            const [row, col] = swap.position;
+            const tile = document.querySelector(`[data-r="${row}"][data-c="${col}"]`);
+            if (tile) {
+                const letterSpan = tile.querySelector('span');
+                if (letterSpan) {
+                    // Animate swap
+                    tile.style.animation = 'tileSwap 0.5s ease-out';
+                    letterSpan.textContent = swap.new_letter;
+                    setTimeout(() => {
+                        tile.style.animation = '';
+                    }, 500);
+                }
             }
-        }
+        });
+    });
+    
+    // Full board snapshot after we fell behind the server's board version
+    socket.on('board_sync', (data) => {
+        console.log('[GAME] Board resynced at version', data.version);
+        multiplayerState.boardState = data.board_state;
+        multiplayerState.boardVersion = data.version;
+        renderSharedBoard(data.board_state);
+        data.board_state.forEach((row, r) => row.forEach((letter, c) => {
+            const letterSpan = document.querySelector(`[data-r="${r}"][data-c="${c}"] span`);
+            if (letterSpan) letterSpan.textContent = letter;
+        }));
     });
     
     // FEATURE 5: Opponent tile selection highlight
@@ -647,6 +738,7 @@ function updateLobbyTimerSettings(data) {
 
 function leaveLobby() {
     if (socket) socket.emit('leave_room');
+    forgetSeat();
     multiplayerState.inRoom = false;
     multiplayerState.roomCode = null;
     multiplayerState.isHost = false;
@@ -903,7 +995,7 @@ let timerInterval = null;
 
 function startFixedTimer(durationSeconds) {
     // Clear any existing timer
-    if (timerInterval) clearInterval(timerInterval);
+    stopLocalCountdown();
     
     const timerContainer = document.getElementById('timer-container');
     const timerText = document.getElementById('timer-text');
@@ -921,7 +1013,49 @@ function startFixedTimer(durationSeconds) {
     const totalSeconds = durationSeconds;
     updateFixedTimerDisplay(durationSeconds, totalSeconds, timerText, timerBar, timerContainer, timerLabel);
     
-    console.log('[TIMER] Fixed timer started locally, listening for server ticks');
+    // Server only sends start/expiry events - count down locally
+    startLocalCountdown(durationSeconds, renderFixedTimerTick);
+    console.log('[TIMER] Fixed timer started locally');
+}
+
+// Tick locally towards a deadline derived from the server's duration.
+// onTick(seconds) fires once per whole second remaining, down to 0.
+function startLocalCountdown(durationSeconds, onTick) {
+    stopLocalCountdown();
+    const deadline = Date.now() + durationSeconds * 1000;
+    let lastShown = null;
+    timerInterval = setInterval(() => {
+        const seconds = Math.max(0, Math.ceil((deadline - Date.now()) / 1000));
+        if (seconds !== lastShown) {
+            lastShown = seconds;
+            onTick(seconds);
+        }
+        if (seconds <= 0) stopLocalCountdown();
+    }, 250);
+}
+
+function stopLocalCountdown() {
+    if (timerInterval) {
+        clearInterval(timerInterval);
+        timerInterval = null;
+    }
+}
+
+function renderFixedTimerTick(seconds) {
+    multiplayerState.timerState.timeRemaining = seconds;
+    
+    // Update display using proper elements
+    const timerText = document.getElementById('timer-text');
+    const timerBar = document.getElementById('timer-bar');
+    const timerContainer = document.getElementById('timer-container');
+    const timerLabel = document.getElementById('timer-label');
+    
+    // Get total duration from settings
+    const totalSeconds = Math.floor((multiplayerState.timerSettings.fixedMinutes || 2) * 60);
+    
+    if (timerText && timerBar && timerContainer && timerLabel) {
+        updateFixedTimerDisplay(seconds, totalSeconds, timerText, timerBar, timerContainer, timerLabel);
+    }
 }
 
 function updateFixedTimerDisplay(seconds, totalSeconds, timerText, timerBar, timerContainer, timerLabel) {
@@ -1103,6 +1237,21 @@ function displayRoundResults(results, roundNumber) {
     }, 3000);
 }
 
+// Apply [[row, col, letter]] changes if they build on our board version.
+// Returns false (and asks the server for a snapshot) when we are out of sync.
+function applyBoardDelta(baseVersion, version, changes) {
+    if (!multiplayerState.boardState || multiplayerState.boardVersion !== baseVersion) {
+        console.warn('[GAME] Board version mismatch, requesting resync');
+        if (socket) socket.emit('request_board_sync');
+        return false;
+    }
+    changes.forEach(([row, col, letter]) => {
+        multiplayerState.boardState[row][col] = letter;
+    });
+    multiplayerState.boardVersion = version;
+    return true;
+}
+
 function updateBoardPositions(boardState, consumedPositions) {
     console.log('[GAME] Updating board positions:', consumedPositions);
     
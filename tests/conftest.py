@@ -0,0 +1,46 @@
+# conftest.py - Shared fixtures; the modules under test live in the repo root
+import itertools
+import os
+import random
+import string
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ALPHABET = 'aeilnorst'  # Few letters, so random boards hold plenty of words
+
+
+@pytest.fixture(scope='session')
+def word_list():
+    """A few thousand made-up words over ALPHABET, 3 to 7 letters"""
+    rng = random.Random(1)
+    return sorted({''.join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 7))) for _ in range(4000)})
+
+
+@pytest.fixture(scope='session')
+def dictionary(tmp_path_factory, word_list):
+    from dictionary import PackedDictionary, compile_dictionary
+    path = str(tmp_path_factory.mktemp('dictionary') / 'words.dawg')
+    compile_dictionary(word_list, path)
+    return PackedDictionary(path)
+
+
+@pytest.fixture(scope='session')
+def game_app(tmp_path_factory):
+    """The app module, started in a scratch directory whose word list holds every three-letter word"""
+    pytest.importorskip('flask_socketio')
+    workdir = tmp_path_factory.mktemp('app')
+    (workdir / 'static').mkdir()
+    (workdir / 'static' / 'words_alpha.txt').write_text(
+        '\n'.join(''.join(letters) for letters in itertools.product(string.ascii_lowercase, repeat=3)))
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import app
+        yield app
+        app.close_board_pools()
+    finally:
+        os.chdir(cwd)
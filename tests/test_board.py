@@ -0,0 +1,78 @@
+import pickle
+import random
+
+import pytest
+
+from board import Board
+from board_geometry import GRID_SIZE
+
+CELLS = GRID_SIZE * GRID_SIZE
+LETTERS = ''.join(chr(65 + i) for i in range(CELLS))
+
+
+@pytest.fixture
+def board():
+    board = Board(LETTERS)
+    board.set_special(3, 'DL')
+    board.set_special(20, 'TL')
+    board.set_gem(0)
+    board.set_gem(12)
+    return board
+
+
+def test_rows_and_cells(board):
+    assert board[1] == 'FGHIJ'
+    assert board[1][2] == board.letter(7) == 'H'
+    with pytest.raises(IndexError):
+        board[GRID_SIZE]
+    assert (board.special(3), board.special(20), board.special(4)) == ('DL', 'TL', None)
+    assert board.gem_mask() == 1 | 1 << 12
+    assert board.special_indices() == [3, 20]
+    assert len(board.special_indices(False)) == CELLS - 2
+
+
+def test_tiles_and_rows_round_trip(board):
+    assert Board.from_tiles(board.to_tiles()) == board
+    assert Board.from_rows(board.to_rows()).letter_string() == LETTERS
+    assert board.tile(3) == {"letter": 'D', "special": 'DL', "gem": False}
+
+
+def test_snapshot_is_unchanged_by_later_writes(board):
+    before = board.snapshot()
+    board.set_letter(5, 'z')
+    board.set_special(6, 'TL')
+    board.set_gem(7)
+    assert before == Board(LETTERS, '...D................T....', 1 | 1 << 12)
+    assert board.letter(5) == 'Z'
+    # Writing the snapshot leaves the board alone too
+    again = board.snapshot()
+    again.set_letter(0, 'Q')
+    assert board.letter(0) == 'A'
+
+
+def test_changed_cells_after_a_swap(board):
+    before = board.snapshot()
+    assert board.changed_cells(before) == []
+    board.set_letter(8, 'Q')
+    board.set_gem(9, False)
+    board.set_gem(10)
+    assert board.changed_cells(before) == [8, 10]
+    board.set_letter(8, 'I')  # Back to what it was
+    assert board.changed_cells(before) == [10]
+
+
+def test_permute_and_changed_cells_after_a_shuffle(board):
+    before = board.snapshot()
+    order = list(range(CELLS))
+    random.Random(1).shuffle(order)
+    board.permute(order)
+    assert [board.cell(i) for i in range(CELLS)] == [before.cell(src) for src in order]
+    # Moved cells compare against their own source, so only edited ones show up
+    assert board.changed_cells(before, order) == []
+    board.set_letter(0, 'Z')
+    assert board.changed_cells(before, order) == [0]
+    assert before.letter_string() == LETTERS
+
+
+def test_pickle_round_trip(board):
+    assert pickle.loads(pickle.dumps(board)) == board
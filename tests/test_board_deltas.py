@@ -0,0 +1,98 @@
+import pytest
+
+from board import Board
+from models import RoundState
+
+
+@pytest.fixture
+def client(game_app):
+    client = game_app.app.test_client()
+    client.get('/')  # New game
+    with client.session_transaction() as session:
+        game_id = session['game_id']
+    record = game_app.game_store.get(game_id)
+    state = game_app.unpack_game_state(record)
+    state['gems'] = 20
+    game_app.game_store.put(game_id, game_app.pack_game_state(state))
+    return client
+
+
+def full_state(client):
+    return client.get('/state').get_json()['state']
+
+
+def resolve_delta(state, delta):
+    """What static/game.js resolveDelta does: apply on top of base_version, else None (refetch /state)"""
+    if delta['base_version'] != state['version']:
+        return None
+    old_tiles = state['board_tiles']
+    order = delta.get('order') or range(len(old_tiles))
+    tiles = {int(i): tile for i, tile in delta['tiles'].items()}
+    return dict(state, **delta['fields'],
+                board_tiles=[tiles.get(i) or dict(old_tiles[src]) for i, src in enumerate(order)],
+                found_words=state['found_words'] + delta['found_words_added'],
+                version=delta['version'])
+
+
+def word_at(state, path):
+    return ''.join(state['board_tiles'][row * 5 + col]['letter'] for row, col in path).lower()
+
+
+def test_each_delta_turns_version_n_into_n_plus_1(client):
+    state = full_state(client)
+    path = [[0, 0], [0, 1], [0, 2]]  # Every three-letter string is a word here
+    steps = [
+        lambda: client.post('/use-ability', json={'ability': 'swap', 'index': 7, 'new_letter': 'Q'}),
+        lambda: client.post('/use-ability', json={'ability': 'shuffle'}),
+        lambda: client.post('/submit-word', json={'word': word_at(state, path), 'path': path}),
+        lambda: client.post('/use-ability', json={'ability': 'shuffle'}),
+    ]
+    for step in steps:
+        version = state['version']
+        delta = step().get_json()['delta']
+        assert (delta['base_version'], delta['version']) == (version, version + 1)
+        state = resolve_delta(state, delta)
+        assert state == full_state(client)
+
+
+def test_a_missed_delta_makes_the_client_resync(client):
+    state = full_state(client)
+    client.post('/use-ability', json={'ability': 'shuffle'})  # This reply is lost
+    delta = client.post('/use-ability', json={'ability': 'swap', 'index': 0, 'new_letter': 'Z'}).get_json()['delta']
+    assert delta['base_version'] == state['version'] + 1
+    assert resolve_delta(state, delta) is None
+    assert full_state(client)['version'] == delta['version']
+
+
+def test_board_changes_and_versions(game_app):
+    before = Board('A' * 25)
+    after = before.snapshot()
+    after.set_letter(7, 'B')
+    after.set_letter(24, 'C')
+    assert game_app.board_changes(before, after) == [[1, 2, 'B'], [4, 4, 'C']]
+    state = RoundState(Board('A' * 25))
+    assert game_app.bump_board_version(state) == (0, 1)
+    assert game_app.bump_board_version(state) == (1, 2)
+
+
+def received(client, name):
+    return [packet['args'][0] for packet in client.get_received() if packet['name'] == name]
+
+
+def test_request_board_sync_sends_the_current_board_and_version(game_app):
+    host = game_app.socketio.test_client(game_app.app)
+    guest = game_app.socketio.test_client(game_app.app)
+    host.emit('create_room', {'player_name': 'Host'})
+    room_code = received(host, 'room_created')[0]['room_code']
+    guest.emit('join_room', {'room_code': room_code, 'player_name': 'Guest'})
+    host.emit('start_game', {'timerType': 'voting', 'boardMode': 'shared'})
+    round_state = game_app.room_store.get(room_code).round_state
+    host.emit('swap_tile', {'room_code': room_code, 'position': [2, 2]})
+    assert round_state.board_version == 1
+
+    guest.get_received()
+    guest.emit('request_board_sync')
+    (sync,) = received(guest, 'board_sync')
+    assert sync == {'board_state': round_state.board_state.to_rows(), 'version': 1}
+    host.disconnect()
+    guest.disconnect()
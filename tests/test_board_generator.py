@@ -0,0 +1,186 @@
+import random
+from concurrent.futures import Future
+
+import pytest
+
+from conftest import ALPHABET
+from board_geometry import GRID_SIZE
+from board_generator import (FALLBACK_SEED, MAX_RETRY_BACKOFF_SECONDS, RETRY_BACKOFF_SECONDS,
+                             UNVETTED_RUNS_BEFORE_BACKOFF, BoardPool, BoardQuality, count_vowels, generate_board)
+from solver import board_stats, solve_board
+
+
+def sample_board(rng):
+    return [[rng.choice(ALPHABET).upper() for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+
+
+def draw_letter(rng, letters):
+    return rng.choice(ALPHABET).upper()
+
+
+@pytest.mark.parametrize('diagonal', [True, False])
+def test_board_stats_matches_a_full_solve(dictionary, diagonal):
+    rng = random.Random(4)
+    for _ in range(5):
+        board = sample_board(rng)
+        solutions = solve_board(board, dictionary, diagonal=diagonal)
+        stats = board_stats(board, dictionary, word_score=len, diagonal=diagonal)
+        assert stats['complete']
+        assert stats['words'] == len(solutions)
+        assert stats['best_score'] == stats['longest'] == max(map(len, solutions), default=0)
+
+
+def test_board_stats_stops_once_the_board_is_good_enough(dictionary):
+    board = sample_board(random.Random(4))
+    stats = board_stats(board, dictionary, enough_words=5)
+    assert stats['words'] == 5 and not stats['complete']
+
+
+def test_generate_board_returns_a_board_meeting_the_quality_bar(dictionary):
+    quality = BoardQuality(min_words=20, min_best_score=5, min_vowels=3, max_vowels=15)
+    letters, stats, vetted = generate_board(sample_board, draw_letter, dictionary, quality,
+                                            word_score=len, budget=1.0, rng=random.Random(1))
+    assert vetted
+    assert stats['words'] >= 20 and stats['best_score'] >= 5
+    assert 3 <= count_vowels(letters) <= 15
+
+
+def test_generate_board_vets_a_board_within_the_default_budget(dictionary):
+    # A bar that needs full solves of several candidates, which a few ms cannot fit
+    quality = BoardQuality(min_words=300, min_best_score=7, min_vowels=6, max_vowels=11)
+    for seed in range(10):
+        letters, stats, vetted = generate_board(sample_board, draw_letter, dictionary, quality,
+                                                word_score=len, rng=random.Random(seed))
+        assert vetted and stats['words'] >= 300
+
+
+def test_generate_board_falls_back_to_the_best_candidate(dictionary):
+    impossible = BoardQuality(min_words=10 ** 6, min_best_score=0, min_vowels=0, max_vowels=25)
+    letters, stats, vetted = generate_board(sample_board, draw_letter, dictionary, impossible,
+                                            budget=0.02, rng=random.Random(1))
+    assert not vetted
+    assert len(letters) == GRID_SIZE and stats['words'] > 0
+
+
+class InlineExecutor:
+    """Runs each job as it is submitted"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def test_pool_tops_itself_up_with_vetted_boards_only():
+    seeds = []
+
+    def recipe(seed, require_vetted=False):
+        if not require_vetted:
+            return 'fallback'
+        seeds.append(seed)
+        if len(seeds) % 2:
+            return None  # Missed the quality bar within budget
+        return f'board{len(seeds)}'
+
+    pool = BoardPool(recipe, InlineExecutor(), size=3)
+    pool.refill()
+    assert [board for _, board in pool._boards] == ['board2', 'board4', 'board6']
+    seed, board = pool.take()
+    assert board == 'board2' and seed == seeds[1]  # Handed out with the seed that dealt it
+    assert [board for _, board in pool._boards] == ['board4', 'board6', 'board8']
+    assert len(set(seeds)) == len(seeds)  # A fresh seed for every run
+
+
+class FakeTimer:
+    """threading.Timer that only records its delay until fire() is called"""
+    started = []
+
+    def __init__(self, delay, fn):
+        self.delay, self.fn, self.cancelled = delay, fn, False
+
+    def start(self):
+        FakeTimer.started.append(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fire(self):
+        self.fn()
+
+
+def test_pool_backs_off_but_keeps_retrying_a_recipe_that_never_vets(monkeypatch):
+    monkeypatch.setattr('board_generator.threading.Timer', FakeTimer)
+    monkeypatch.setattr(FakeTimer, 'started', [])
+    runs = []
+
+    def recipe(seed, require_vetted=False):
+        runs.append(seed)
+        return None
+
+    pool = BoardPool(recipe, InlineExecutor(), size=1)
+    runs.clear()  # The fallback deal
+    pool.refill()
+    assert len(runs) == UNVETTED_RUNS_BEFORE_BACKOFF  # Retried at once until then
+    delays = []
+    for _ in range(12):
+        timer = FakeTimer.started[-1]
+        delays.append(timer.delay)
+        timer.fire()
+    assert len(runs) == UNVETTED_RUNS_BEFORE_BACKOFF + 12  # One retry per delay, never given up
+    assert delays[:3] == [RETRY_BACKOFF_SECONDS, RETRY_BACKOFF_SECONDS * 2, RETRY_BACKOFF_SECONDS * 4]
+    assert delays == sorted(delays) and delays[-1] == MAX_RETRY_BACKOFF_SECONDS
+    pool.close()
+    assert FakeTimer.started[-1].cancelled
+
+
+def test_pool_that_ran_dry_deals_the_fallback_then_the_last_board_again():
+    boards = iter(['board1'])
+
+    def recipe(seed, require_vetted=False):
+        return next(boards, None) if require_vetted else [f'fallback{seed}']
+
+    pool = BoardPool(recipe, InlineExecutor(), size=1)
+    assert pool.take() == (FALLBACK_SEED, [f'fallback{FALLBACK_SEED}'])  # Dealt by a worker when the pool was made
+    seed, board = pool.take()
+    assert board == 'board1'
+    assert pool.take() == (seed, 'board1')  # Nothing vetted since: the last board again, not made inline
+
+
+def test_pool_deals_a_copy_of_the_last_board_as_it_was_dealt():
+    made = []
+
+    def recipe(seed, require_vetted=False):
+        if require_vetted and made:
+            return None
+        made.append(['A', 'B'])
+        return made[-1]
+
+    pool = BoardPool(recipe, InlineExecutor(), size=1)
+    pool.refill()
+    _, first = pool.take()
+    first[0] = 'Z'  # Played on
+    _, again = pool.take()
+    assert again == ['A', 'B'] and again is not first
+
+
+def test_closed_pool_no_longer_refills():
+    runs = []
+    pool = BoardPool(lambda seed, require_vetted=False: runs.append(seed) or 'board', InlineExecutor(), size=2)
+    pool.refill()
+    pool.close()
+    assert pool.take()[1] == 'board'
+    assert len(runs) == 3 and len(pool) == 1  # The fallback deal and two pool runs
+
+
+def test_recipes_are_functions_of_the_seed(game_app, monkeypatch):
+    import boards
+    easy = BoardQuality(min_words=1, min_best_score=0, min_vowels=0, max_vowels=GRID_SIZE * GRID_SIZE)
+    monkeypatch.setattr(boards, 'SINGLE_PLAYER_BOARD_QUALITY', easy)  # Vetted on the first draw, not by the clock
+    monkeypatch.setattr(boards, 'MULTIPLAYER_BOARD_QUALITY', easy)
+    tiles = boards.deal_single_player_tiles(7, require_vetted=True)
+    assert tiles == boards.deal_single_player_tiles(7, require_vetted=True)
+    assert bin(tiles.gem_mask()).count('1') == 10
+    assert len(tiles.special_indices()) == 1
+    letters = boards.deal_multiplayer_letters(7, require_vetted=True)
+    assert letters == boards.deal_multiplayer_letters(7, require_vetted=True)
+    assert len(letters) == GRID_SIZE * GRID_SIZE and letters.special_indices() == []
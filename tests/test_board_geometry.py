@@ -0,0 +1,73 @@
+from collections import deque
+
+import pytest
+
+from board_geometry import (GRID_SIZE, cell_index, index_to_coords, is_connected_path, neighbour_masks,
+                            neighbour_table, step_distances)
+
+
+def brute_neighbours(index, grid_size, diagonal):
+    row, col = divmod(index, grid_size)
+    return sorted(r * grid_size + c
+                  for r in range(grid_size) for c in range(grid_size)
+                  if (r, c) != (row, col) and max(abs(r - row), abs(c - col)) == 1
+                  and (diagonal or r == row or c == col))
+
+
+@pytest.mark.parametrize('grid_size', [1, 2, GRID_SIZE, 7])
+@pytest.mark.parametrize('diagonal', [True, False])
+def test_neighbour_tables_match_brute_force(grid_size, diagonal):
+    table = neighbour_table(grid_size, diagonal)
+    masks = neighbour_masks(grid_size, diagonal)
+    assert len(table) == len(masks) == grid_size * grid_size
+    for index in range(grid_size * grid_size):
+        expected = brute_neighbours(index, grid_size, diagonal)
+        assert sorted(table[index]) == expected
+        assert masks[index] == sum(1 << cell for cell in expected)
+
+
+@pytest.mark.parametrize('grid_size', [1, 2, GRID_SIZE])
+@pytest.mark.parametrize('diagonal', [True, False])
+def test_step_distances_match_breadth_first_search(grid_size, diagonal):
+    distances = step_distances(grid_size, diagonal)
+    for start in range(grid_size * grid_size):
+        seen = {start: 0}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for nxt in brute_neighbours(cell, grid_size, diagonal):
+                if nxt not in seen:
+                    seen[nxt] = seen[cell] + 1
+                    queue.append(nxt)
+        assert distances[start] == tuple(seen[cell] for cell in range(grid_size * grid_size))
+
+
+@pytest.mark.parametrize('diagonal, corner, edge, middle', [(True, 3, 5, 8), (False, 2, 3, 4)])
+def test_corner_edge_and_middle_counts(diagonal, corner, edge, middle):
+    table = neighbour_table(GRID_SIZE, diagonal)
+    assert len(table[0]) == len(table[GRID_SIZE * GRID_SIZE - 1]) == corner
+    assert len(table[2]) == len(table[2 * GRID_SIZE]) == edge
+    assert len(table[2 * GRID_SIZE + 2]) == middle
+
+
+def test_cell_index_rejects_off_board_and_non_ints():
+    assert cell_index(0, 0) == 0
+    assert cell_index(GRID_SIZE - 1, GRID_SIZE - 1) == GRID_SIZE * GRID_SIZE - 1
+    for row, col in [(-1, 0), (0, GRID_SIZE), (GRID_SIZE, 0), (1.0, 0), ('1', 0), (True, 0)]:
+        assert cell_index(row, col) == -1
+    assert index_to_coords(cell_index(3, 2)) == [3, 2]
+
+
+@pytest.mark.parametrize('path, eight_way, four_way', [
+    ([[0, 0], [0, 1], [1, 1]], True, True),
+    ([[0, 0], [1, 1], [2, 2]], True, False),  # Diagonal steps
+    ([[0, 0], [0, 1], [0, 0]], False, False),  # Reuses a tile
+    ([[0, 0], [0, 2]], False, False),  # Jumps a tile
+    ([[0, 4], [0, 5]], False, False),  # Leaves the board
+    ([[0, 4], [1, 0]], False, False),  # Wraps to the next row
+    ([[0, 0], 'x'], False, False),
+    ([], True, True),
+])
+def test_is_connected_path(path, eight_way, four_way):
+    assert is_connected_path(path, diagonal=True) is eight_way
+    assert is_connected_path(path, diagonal=False) is four_way
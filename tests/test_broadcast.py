@@ -0,0 +1,119 @@
+import pytest
+
+from broadcast import BATCH_EVENT, RoomBroadcaster
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.sent = []  # (event, data, room, skip_sid)
+
+    def emit(self, event, data, room=None, skip_sid=None, **kwargs):
+        self.sent.append((event, data, room, skip_sid))
+
+
+class FakeScheduler:
+    """Holds call_later callbacks until the test advances the clock past them"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.timers = []  # (deadline, callback, args)
+
+    def call_later(self, delay, callback, *args, key=None):
+        self.timers.append((self.now + delay, callback, args))
+
+    def advance(self, seconds):
+        self.now += seconds
+        due = [timer for timer in self.timers if timer[0] <= self.now]
+        self.timers = [timer for timer in self.timers if timer[0] > self.now]
+        for _, callback, args in sorted(due, key=lambda timer: timer[0]):
+            callback(*args)
+
+
+@pytest.fixture
+def socketio():
+    return FakeSocketIO()
+
+
+@pytest.fixture
+def scheduler():
+    return FakeScheduler()
+
+
+@pytest.fixture
+def broadcaster(socketio, scheduler):
+    broadcaster = RoomBroadcaster(socketio, scheduler, window_seconds=0.03)
+    broadcaster.coalesce('highlight', lambda data: data['player'])
+    broadcaster.merge('swap', lambda older, newer: {'cells': older['cells'] + newer['cells']})
+    return broadcaster
+
+
+def batch(sent):
+    event, data, room, skip_sid = sent
+    assert event == BATCH_EVENT
+    return [(entry['event'], entry['data'], entry['skip']) for entry in data['events']]
+
+
+def test_nothing_is_sent_until_the_window_closes(broadcaster, socketio, scheduler):
+    broadcaster.emit('R1', 'joined', {'name': 'a'})
+    scheduler.advance(0.02)
+    assert socketio.sent == []
+    scheduler.advance(0.01)
+    assert socketio.sent == [('joined', {'name': 'a'}, 'R1', None)]  # A single event goes out unchanged
+
+
+def test_one_window_per_room(broadcaster, socketio, scheduler):
+    broadcaster.emit('R1', 'joined', {'name': 'a'})
+    broadcaster.emit('R2', 'joined', {'name': 'b'}, skip_sid='b')
+    assert len(scheduler.timers) == 2
+    scheduler.advance(0.03)
+    assert sorted(socketio.sent, key=lambda sent: sent[2]) == [
+        ('joined', {'name': 'a'}, 'R1', None), ('joined', {'name': 'b'}, 'R2', 'b')]
+
+
+def test_several_events_go_out_as_one_batch_in_order(broadcaster, socketio, scheduler):
+    broadcaster.emit('R1', 'joined', {'name': 'a'})
+    broadcaster.emit('R1', 'word', {'word': 'cat'}, skip_sid='a')
+    scheduler.advance(0.03)
+    assert len(socketio.sent) == 1
+    assert socketio.sent[0][2] == 'R1'
+    assert batch(socketio.sent[0]) == [('joined', {'name': 'a'}, None), ('word', {'word': 'cat'}, 'a')]
+
+
+def test_coalesced_events_keep_the_newest_payload_per_key(broadcaster, socketio, scheduler):
+    for player, cell in [('a', 1), ('b', 7), ('a', 2), ('a', 3)]:
+        broadcaster.emit('R1', 'highlight', {'player': player, 'cell': cell}, skip_sid=player)
+    scheduler.advance(0.03)
+    assert batch(socketio.sent[0]) == [('highlight', {'player': 'a', 'cell': 3}, 'a'),
+                                       ('highlight', {'player': 'b', 'cell': 7}, 'b')]
+
+
+def test_merged_events_fold_into_one_payload(broadcaster, socketio, scheduler):
+    for cell in (1, 2, 3):
+        broadcaster.emit('R1', 'swap', {'cells': [cell]})
+    scheduler.advance(0.03)
+    assert socketio.sent == [('swap', {'cells': [1, 2, 3]}, 'R1', None)]
+
+
+def test_an_ordinary_event_is_a_barrier(broadcaster, socketio, scheduler):
+    broadcaster.emit('R1', 'swap', {'cells': [1]})
+    broadcaster.emit('R1', 'highlight', {'player': 'a', 'cell': 1})
+    broadcaster.emit('R1', 'round_ended', {})
+    broadcaster.emit('R1', 'swap', {'cells': [2]})
+    broadcaster.emit('R1', 'highlight', {'player': 'a', 'cell': 2})
+    scheduler.advance(0.03)
+    assert batch(socketio.sent[0]) == [
+        ('swap', {'cells': [1]}, None), ('highlight', {'player': 'a', 'cell': 1}, None),
+        ('round_ended', {}, None),
+        ('swap', {'cells': [2]}, None), ('highlight', {'player': 'a', 'cell': 2}, None)]
+
+
+def test_flush_sends_now_and_is_safe_when_empty(broadcaster, socketio, scheduler):
+    broadcaster.flush('R1')
+    broadcaster.emit('R1', 'joined', {'name': 'a'})
+    broadcaster.flush('R1')
+    assert len(socketio.sent) == 1
+    scheduler.advance(0.03)  # The window's own flush finds nothing left
+    assert len(socketio.sent) == 1
+    broadcaster.emit('R1', 'joined', {'name': 'b'})  # A new window starts
+    scheduler.advance(0.03)
+    assert len(socketio.sent) == 2
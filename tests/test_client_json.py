@@ -0,0 +1,58 @@
+import json
+import pickle
+
+import pytest
+
+import client_json
+from client_json import RawJSON
+from models import Player, Room, to_client
+
+PAYLOADS = [
+    {'room': {'a': 1}},
+    {'room': {'a': [1, 2, {'b': None}]}, 'seat_token': 'xyz', 'n': 3.5},
+    [{'x': 'é'}, 'plain', {'nested': {'deeper': [True, False]}}],
+    {'name': 'looks like a "marker" \\u0000'},
+    {},
+]
+
+
+@pytest.mark.parametrize('payload', PAYLOADS, ids=range(len(PAYLOADS)))
+def test_spliced_output_parses_back_equal_to_json_dumps(payload):
+    encoded = RawJSON(json.dumps(payload))
+    spliced = client_json.dumps({'first': encoded, 'both': [encoded, {'again': encoded}]})
+    plain = json.dumps({'first': payload, 'both': [payload, {'again': payload}]})
+    assert json.loads(spliced) == json.loads(plain)
+
+
+def test_room_payload_matches_to_client():
+    room = Room('ABCD', 'h', seed=7)
+    room.add_player(Player('h', 'Host "quoted"', seat='secret'))
+    text = client_json.dumps({'room': RawJSON(room.client_json()), 'is_host': True}, separators=(',', ':'))
+    assert json.loads(text) == {'room': to_client(room), 'is_host': True}
+    assert 'secret' not in text
+
+
+def test_a_client_string_cannot_pass_for_a_marker():
+    forged = '\x00%s:0' % client_json._NONCE[::-1]
+    assert json.loads(client_json.dumps({'name': forged, 'room': RawJSON('{"a":1}')})) == {
+        'name': forged, 'room': {'a': 1}}
+
+
+def test_unknown_types_still_fail_or_use_default():
+    with pytest.raises(TypeError):
+        client_json.dumps({'x': object()})
+    assert client_json.dumps({'x': {1, 2}}, default=sorted) == '{"x": [1, 2]}'
+
+
+def test_raw_json_pickles_and_takes_bytes():
+    raw = pickle.loads(pickle.dumps(RawJSON(b'{"a":1}')))
+    assert raw.text == '{"a":1}'
+
+
+def test_client_json_is_cached_until_the_room_is_dirty():
+    room = Room('ABCD', 'h')
+    first = room.client_json()
+    assert room.client_json() is first
+    room.status = 'playing'
+    room.dirty = True
+    assert json.loads(room.client_json())['status'] == 'playing'
@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+
+import pytest
+
+from definitions import DefinitionService, DefinitionStore, DefinitionUnavailable, base_word_candidates
+
+
+def entry(word):
+    return {'word': word, 'phonetic': '', 'partOfSpeech': 'noun', 'definition': f'A {word}.', 'example': ''}
+
+
+class StubUpstream:
+    """Counts calls per word; words in `known` have an entry, the rest none"""
+
+    def __init__(self, known=(), gate=None):
+        self.known = set(known)
+        self.gate = gate
+        self.calls = []
+        self.failing = set()
+
+    def __call__(self, word):
+        self.calls.append(word)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if word in self.failing:
+            raise DefinitionUnavailable('down')
+        return entry(word) if word in self.known else None
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DefinitionStore(str(tmp_path / 'definitions.db'))
+    yield store
+    store.close()
+
+
+def definition(body):
+    return json.loads(body)['definition']
+
+
+def test_concurrent_lookups_share_one_fetch(store):
+    gate = threading.Event()
+    upstream = StubUpstream({'cat'}, gate)
+    service = DefinitionService(store, upstream)
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(service.lookup('cat'))) for _ in range(8)]
+    for caller in callers:
+        caller.start()
+    for _ in range(500):
+        if upstream.calls:
+            break
+        time.sleep(0.01)
+    time.sleep(0.05)  # Let every caller reach the in-flight fetch
+    gate.set()
+    for caller in callers:
+        caller.join()
+    assert upstream.calls == ['cat']
+    assert len(results) == 8
+    assert {definition(body) for body, _ in results} == {'A cat.'}
+
+
+def test_memory_then_disk(store, tmp_path):
+    upstream = StubUpstream({'cat'})
+    service = DefinitionService(store, upstream)
+    assert service.lookup('cat')[1] == 'upstream'
+    assert service.lookup('cat')[1] == 'memory'
+    fresh = DefinitionService(store, upstream)  # A restarted server, same file
+    body, source = fresh.lookup('cat')
+    assert (definition(body), source) == ('A cat.', 'disk')
+    assert upstream.calls == ['cat']
+
+
+def test_misses_are_stored_but_failures_are_not(store):
+    upstream = StubUpstream()
+    service = DefinitionService(store, upstream, is_word=lambda word: False)
+    assert service.lookup('zzz') == (None, 'missing')
+    assert store.get('zzz') == (True, None)
+    upstream.failing.add('dog')
+    assert service.lookup('dog') == (None, 'error')
+    assert store.get('dog') == (False, None)
+    upstream.failing.clear()
+    upstream.known.add('dog')
+    assert definition(service.lookup('dog')[0]) == 'A dog.'
+
+
+def test_base_word_fallback(store):
+    upstream = StubUpstream({'berry', 'berrie'})
+    service = DefinitionService(store, upstream, is_word=lambda word: word in {'berry', 'berri'})
+    body, _ = service.lookup('berries')
+    found = json.loads(body)
+    assert found['word'] == 'berries'
+    assert found['definition'] == '*(Base word: berry)* A berry.'
+    # Candidates that are not words are never fetched
+    assert sorted(upstream.calls) == ['berri', 'berries', 'berry']
+
+
+def test_base_word_candidates():
+    assert base_word_candidates('berries')[0] == 'berry'
+    assert 'play' in base_word_candidates('playing')
+    assert 'glas' not in base_word_candidates('glass')
+    assert base_word_candidates('undo') == []
+
+
+def test_define_route(game_app, store, monkeypatch):
+    upstream = StubUpstream({'cat'})
+    monkeypatch.setattr(game_app, 'word_definitions', DefinitionService(store, upstream))
+    client = game_app.app.test_client()
+    response = client.get('/define/CAT')
+    assert response.status_code == 200
+    assert response.get_json()['definition'] == 'A cat.'
+    assert client.get('/define/dog').status_code == 404
+    assert client.get('/define/notaword').status_code == 404
+    assert upstream.calls == ['cat', 'dog']
+
+
+def test_one_deadline_covers_the_word_and_its_base_words(store):
+    gate = threading.Event()
+
+    class SlowBases(StubUpstream):
+        def __call__(self, word):
+            if word != 'berries':
+                gate.wait(5)  # Every base word hangs
+            return super().__call__(word)
+
+    upstream = SlowBases({'berry'})
+    service = DefinitionService(store, upstream, is_word=lambda word: True, timeout=0.2)
+    started = time.monotonic()
+    assert service.lookup('berries') == (None, 'error')
+    assert time.monotonic() - started < 0.5  # Not 0.2s for each of its three candidates
+    gate.set()
+
+
+def test_store_runs_sqlite_on_os_threads_when_threads_are_green(store, monkeypatch):
+    tpool = pytest.importorskip('eventlet.tpool')
+    real_execute, ran = tpool.execute, []
+
+    def execute(fn, *args):
+        ran.append(fn.__name__)
+        return real_execute(fn, *args)
+
+    monkeypatch.setattr('definitions._green_threads', lambda: True)
+    monkeypatch.setattr(tpool, 'execute', execute)
+    store.put('cat', entry('cat'))
+    assert store.get('cat') == (True, entry('cat'))
+    assert len(store) == 1
+    assert ran == ['_write', '_query', '_query']
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from dictionary import ROOT, PackedDictionary, compile_dictionary, load_dictionary
+
+WORDS = ['apple', 'apples', 'apply', 'ban', 'banana', 'band', 'bandana', 'can', 'cane', 'zebra']
+
+
+@pytest.fixture
+def packed(tmp_path):
+    path = str(tmp_path / 'words.dawg')
+    assert compile_dictionary(WORDS + ['Capital', 'naïve', 'two words', ''], path) == len(WORDS)
+    return PackedDictionary(path)
+
+
+def walk(dictionary, prefix):
+    node = ROOT
+    for letter in prefix:
+        node = dictionary.child(node, letter)
+        if node < 0:
+            break
+    return node
+
+
+def test_membership(packed):
+    assert len(packed) == len(WORDS)
+    for word in WORDS:
+        assert word in packed
+    for word in ['', 'app', 'bananas', 'zebr', 'Apple', 'capital', 'naïve', 'x', None, 42]:
+        assert word not in packed
+
+
+def test_iterates_in_sorted_order(packed):
+    assert list(packed) == sorted(WORDS)
+
+
+def test_prefix_walks(packed):
+    assert walk(packed, 'ban') >= 0 and packed.is_final(walk(packed, 'ban'))
+    assert walk(packed, 'bana') >= 0 and not packed.is_final(walk(packed, 'bana'))
+    assert walk(packed, 'bx') < 0
+    assert packed.child(ROOT, '!') < 0
+
+
+def test_matches_a_large_word_set(dictionary, word_list):
+    assert len(dictionary) == len(word_list)
+    assert list(dictionary) == word_list
+    assert all(word in dictionary for word in word_list[::7])
+    assert not any(word + 'q' in dictionary for word in word_list[::7])
+
+
+def test_rejects_files_that_are_not_word_lists(tmp_path):
+    path = tmp_path / 'junk.dawg'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        PackedDictionary(str(path))
+
+
+def test_load_dictionary_builds_and_rebuilds_when_the_text_is_newer(tmp_path):
+    txt, dawg = tmp_path / 'words.txt', tmp_path / 'words.dawg'
+    txt.write_text('cat\ndog\n')
+    assert list(load_dictionary(str(txt), str(dawg))) == ['cat', 'dog']
+    built = os.path.getmtime(dawg)
+
+    assert list(load_dictionary(str(txt), str(dawg))) == ['cat', 'dog']  # Up to date: not rebuilt
+    assert os.path.getmtime(dawg) == built
+
+    txt.write_text('cat\ndog\nemu\n')
+    os.utime(txt, (built + 10, built + 10))
+    assert 'emu' in load_dictionary(str(txt), str(dawg))
+
+
+def test_load_dictionary_logs_the_rebuild(tmp_path, monkeypatch):
+    lines = []
+    monkeypatch.setattr('dictionary.log.info', lambda message, *args: lines.append(message % args))
+    txt, dawg = tmp_path / 'words.txt', tmp_path / 'words.dawg'
+    txt.write_text('cat\n')
+    load_dictionary(str(txt), str(dawg))
+    load_dictionary(str(txt), str(dawg))
+    assert lines == [f'Compiling {txt} -> {dawg}']
@@ -0,0 +1,128 @@
+import os
+
+import pytest
+
+from event_log import EventLog, encode_frame, log_segments, pack, read_frames, replay, unpack
+from models import Room
+
+VALUES = [
+    None, True, False, 0, 127, 128, 255, 65536, 2 ** 40, 2 ** 64 - 1, -1, -32, -33, -2 ** 40,
+    0.5, -1e300, '', 'cat', 'é' * 40, 'x' * 300, 'y' * 70000,
+    [], list(range(20)), [1, [2, [3, 'four']]], {}, {'a': 1, 'b': [None, True]},
+    {str(i): i for i in range(20)}, list(range(70000)),
+]
+
+
+@pytest.mark.parametrize('value', VALUES, ids=range(len(VALUES)))
+def test_pack_unpack_round_trip(value):
+    out = bytearray(b'junk')
+    pack(value, out)
+    decoded, end = unpack(out, 4)
+    assert decoded == value
+    assert end == len(out)
+
+
+def test_tuples_pack_as_lists_and_other_types_are_refused():
+    out = bytearray()
+    pack((1, 'a'), out)
+    assert unpack(out)[0] == [1, 'a']
+    with pytest.raises(TypeError):
+        pack({1, 2}, bytearray())
+
+
+def test_a_truncated_tail_is_ignored(tmp_path):
+    path = tmp_path / 'events.log'
+    out = bytearray()
+    records = [['ABCD', seq, 1.5, 'word', {'word': 'cat'}] for seq in range(1, 4)]
+    for record in records:
+        encode_frame(record, out)
+    path.write_bytes(bytes(out[:-3]))  # Crash mid-write of the last frame
+    assert list(read_frames(path)) == records[:2]
+    path.write_bytes(bytes(out) + b'\x05\x00')  # Crash mid-write of a length prefix
+    assert list(read_frames(path)) == records
+
+
+def test_writer_stamps_sequence_numbers_and_flushes_on_close(tmp_path):
+    path = tmp_path / 'events.log'
+    events = EventLog(str(path), fsync_interval=60)
+    room = Room('ABCD', 'h')
+    for word in ('cat', 'dog', 'eel'):
+        events.record(room, 'word', {'word': word})
+    events.close()
+    records = list(read_frames(path))
+    assert [(code, seq, event, data) for code, seq, _, event, data in records] == [
+        ('ABCD', 1, 'word', {'word': 'cat'}),
+        ('ABCD', 2, 'word', {'word': 'dog'}),
+        ('ABCD', 3, 'word', {'word': 'eel'}),
+    ]
+    assert events.written == path.stat().st_size
+
+
+def test_replay_rebuilds_shared_board_rooms(tmp_path):
+    path = tmp_path / 'events.log'
+    events = EventLog(str(path))
+    room, other = Room('ABCD', 'h'), Room('WXYZ', 'x')
+    events.record(room, 'created', {'host': 'h', 'name': 'Host', 'seed': 7, 'settings': {'timer_type': 'voting'}})
+    events.record(other, 'created', {'host': 'x', 'name': 'X', 'seed': 8, 'settings': {}})
+    events.record(room, 'joined', {'player': 'g', 'name': 'Guest'})
+    events.record(room, 'started', {'mode': 'shared', 'board': 'A' * 25, 'settings': {'rounds_per_player': 3}})
+    events.record(room, 'swap', {'player': 'h', 'cell': 0, 'letter': 'C'})
+    events.record(room, 'word', {'player': 'g', 'word': 'CAA', 'cells': [0, 1, 2], 'score': 9})
+    events.record(room, 'done', {'player': 'g'})
+    events.record(room, 'rejoined', {'player': 'g2', 'previous': 'g'})
+    events.record(room, 'round_end', {'round': 1, 'changes': [[24, 'Z']], 'scores': {'h': 4, 'g2': 9}})
+    events.record(other, 'deleted')
+    events.close()
+
+    rooms = replay(str(path))
+    assert list(rooms) == ['ABCD']
+    replayed = rooms['ABCD']
+    assert replayed.event_seq == 8
+    assert replayed.status == 'playing'
+    assert (replayed.settings.timer_type, replayed.settings.rounds_per_player) == ('voting', 3)
+    assert replayed.settings.board_mode == 'shared'
+    round_state = replayed.round_state
+    assert round_state.round_number == 2
+    assert round_state.board_state.letter_string() == 'C' + 'A' * 23 + 'Z'
+    assert round_state.board_version == 2
+    assert {p: player.score for p, player in replayed.players.items()} == {'h': 4, 'g2': 9}
+    assert list(replayed.turns) == ['h', 'g2']
+    assert list(replay(str(path), 'WXYZ')) == []
+
+
+def test_replay_rebuilds_turn_based_rooms(tmp_path):
+    path = tmp_path / 'events.log'
+    events = EventLog(str(path))
+    room = Room('ABCD', 'h')
+    events.record(room, 'created', {'host': 'h', 'name': 'Host', 'seed': 7, 'settings': {}})
+    events.record(room, 'joined', {'player': 'g', 'name': 'Guest'})
+    events.record(room, 'started', {'mode': 'randomized', 'board': 'B' * 25, 'settings': {}})
+    events.record(room, 'word', {'player': 'h', 'word': 'BBB', 'cells': [0, 1, 2], 'score': 6, 'next': 'g',
+                                 'changes': [[0, 'X'], [1, 'Y'], [2, 'Z']]})
+    events.record(room, 'timer', {'kind': 'turn_timeout', 'next': 'h'})
+    events.record(room, 'rejoined', {'player': 'h2', 'previous': 'h'})
+    events.close()
+
+    replayed = replay(str(path))['ABCD']
+    game_state = replayed.game_state
+    assert game_state.board_state.letter_string() == 'XYZ' + 'B' * 22
+    assert game_state.words_played == [{'player_id': 'h2', 'word': 'BBB', 'score': 6, 'turn': 1}]
+    assert (game_state.active_player_id, game_state.turn_number) == ('h2', 3)
+    assert replayed.host == 'h2' and list(replayed.players) == ['h2', 'g']
+
+
+def test_log_rotates_by_size_and_keeps_the_newest_segments(tmp_path):
+    path = tmp_path / 'events.log'
+    events = EventLog(str(path), batch_size=1, max_bytes=200, keep=2)
+    room = Room('ABCD', 'h')
+    events.record(room, 'created', {'host': 'h', 'name': 'Host', 'seed': 7, 'settings': {}})
+    for n in range(60):
+        events.record(room, 'joined', {'player': f'p{n}', 'name': 'x' * 20})
+    events.close()
+
+    segments = log_segments(str(path))
+    assert len(segments) <= 3 and segments[-1] == str(path)
+    assert all(os.path.getsize(segment) < 400 for segment in segments)
+    seqs = [record[1] for segment in segments for record in read_frames(segment)]
+    assert seqs == list(range(seqs[0], 62))  # Oldest dropped, the rest in order
+    assert replay(str(path)) == {}  # Its 'created' event was rotated away
@@ -0,0 +1,30 @@
+from board import Board
+from models import Room
+from boards import MULTIPLAYER_LETTERS, SINGLE_PLAYER_LETTERS
+
+CELLS = 25
+
+
+def refilled(game_app, sampler, seed, step, indices):
+    board = Board('E' * CELLS)
+    sampler.refill(board, indices, game_app.game_rng(seed, step))
+    return board.letter_string()
+
+
+def test_same_seed_and_step_give_the_same_refill(game_app):
+    for sampler in (SINGLE_PLAYER_LETTERS, MULTIPLAYER_LETTERS):
+        indices = [0, 6, 12, 18, 24]
+        first = refilled(game_app, sampler, 42, 3, indices)
+        assert first == refilled(game_app, sampler, 42, 3, indices)
+        steps = {refilled(game_app, sampler, 42, step, indices) for step in range(10)}
+        seeds = {refilled(game_app, sampler, seed, 3, indices) for seed in range(10)}
+        assert len(steps) > 1 and len(seeds) > 1
+
+
+def test_room_rng_advances_one_step_per_call(game_app):
+    room = Room('ABCD', 'h', seed=42)
+    room_draws = [game_app.room_rng(room).random() for _ in range(3)]
+    assert room.rng_step == 3
+    replay = Room('ABCD', 'h', seed=42)
+    assert [game_app.room_rng(replay).random() for _ in range(3)] == room_draws
+    assert len(set(room_draws)) == 3
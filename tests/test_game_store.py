@@ -0,0 +1,86 @@
+import pytest
+
+import game_store
+from board import Board
+from game_store import MemoryGameStore, pack_game_state, unpack_game_state
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(game_store.time, 'monotonic', clock)
+    return clock
+
+
+def sample_state():
+    board = Board(''.join(chr(65 + i) for i in range(25)))
+    board.set_special(3, 'DL')
+    board.set_special(17, 'TL')
+    board.set_gem(4)
+    board.set_gem(24)
+    return {
+        "board_tiles": board,
+        "round": 3,
+        "score": 57,
+        "found_words": ["cab", "deb"],
+        "dp_pos": [2, 4],
+        "game_over": False,
+        "gems": 6,
+        "version": 11,
+        "seed": 1234,
+        "board_seed": 5678,
+    }
+
+
+def test_pack_round_trip():
+    state = sample_state()
+    assert unpack_game_state(pack_game_state(state)) == state
+    state["dp_pos"] = None
+    assert unpack_game_state(pack_game_state(state)) == state
+
+
+def test_least_recently_used_game_is_evicted_first(clock):
+    store = MemoryGameStore(max_games=2, ttl_seconds=60)
+    store.put('a', 'A')
+    store.put('b', 'B')
+    assert store.get('a') == 'A'  # 'b' is now the least recently used
+    store.put('c', 'C')
+    assert len(store) == 2
+    assert store.get('b') is None
+    assert (store.get('a'), store.get('c')) == ('A', 'C')
+
+
+def test_games_expire_after_ttl_since_last_access(clock):
+    store = MemoryGameStore(max_games=10, ttl_seconds=60)
+    store.put('a', 'A')
+    store.put('b', 'B')
+    clock.now += 45
+    assert store.get('a') == 'A'  # Touching it restarts its TTL
+    clock.now += 30
+    assert store.get('b') is None
+    assert store.get('a') == 'A'
+
+
+def test_put_sweeps_expired_games(clock):
+    store = MemoryGameStore(max_games=10, ttl_seconds=60)
+    store.put('a', 'A')
+    store.put('b', 'B')
+    clock.now += 61
+    store.put('c', 'C')
+    assert len(store) == 1
+
+
+def test_delete():
+    store = MemoryGameStore()
+    store.put('a', 'A')
+    store.delete('a')
+    store.delete('missing')
+    assert store.get('a') is None
@@ -0,0 +1,56 @@
+import random
+from collections import Counter
+
+from board import Board
+from board_geometry import GRID_SIZE
+from boards import FREQUENCY_MAP, MAX_LETTER_COUNT, LetterSampler
+
+CELLS = GRID_SIZE * GRID_SIZE
+
+
+def test_sample_board_respects_the_cap():
+    sampler = LetterSampler({'A': 50, 'B': 1, 'C': 1, 'D': 1, 'E': 1, 'F': 1})
+    rng = random.Random(1)
+    for _ in range(50):
+        counts = Counter(letter for row in sampler.sample_board(rng) for letter in row)
+        assert sum(counts.values()) == CELLS
+        assert max(counts.values()) <= MAX_LETTER_COUNT
+
+
+def test_cap_holds_across_refills():
+    sampler = LetterSampler(FREQUENCY_MAP)
+    rng = random.Random(2)
+    board = Board.from_rows(sampler.sample_board(rng))
+    for _ in range(300):
+        indices = rng.sample(range(CELLS), rng.randint(1, 8))
+        before = board.snapshot()
+        sampler.refill(board, indices + indices[:1], rng)  # A repeated index is refilled once
+        assert max(Counter(board.letter_string()).values()) <= MAX_LETTER_COUNT
+        assert set(board.changed_cells(before)) <= set(indices)
+
+
+def test_refill_is_reproducible_with_a_seed():
+    sampler = LetterSampler(FREQUENCY_MAP)
+    boards = []
+    for _ in range(2):
+        rng = random.Random(3)
+        board = Board('A' * CELLS)
+        sampler.refill(board, range(CELLS), rng)
+        boards.append(board)
+    assert boards[0] == boards[1]
+
+
+def test_weight_tables_are_cached_per_capped_set():
+    sampler = LetterSampler({'A': 3, 'B': 1})
+    table, enforce = sampler._table({'A': 1})
+    assert (sorted(table), enforce) == (['A', 'A', 'A', 'B'], True)
+    assert sampler._table({'A': 2, 'B': 4}) is sampler._table({})
+    assert sampler._table({'A': 5})[0] == 'B'
+    assert len(sampler._tables) == 2
+
+
+def test_every_letter_capped_ignores_the_cap():
+    sampler = LetterSampler({'A': 1, 'B': 1}, cap=2)
+    drawn = sampler.draw(random.Random(4), {}, 6)
+    assert len(drawn) == 6
+    assert sampler._table({'A': 2, 'B': 2})[1] is False
@@ -0,0 +1,11 @@
+def test_loadtest_run_smoke(game_app):
+    import loadtest
+    report = loadtest.run(rooms=2, bots=2, words=3, players=1, threads=2, seed=1)
+    assert report['total_events'] > 0
+    assert report['config']['rooms'] == 2
+    for event in ('create_room', 'join_room', 'start_game'):
+        assert report['events'][event]['count'] >= 2
+    outcomes = report['outcomes']
+    for event in ('player_submitted_word', 'player_word_submitted_turnbased', 'POST /submit-word'):
+        assert outcomes[f'{event}:valid'].get('accepted', 0) > 0  # Words the solver found were taken
+        assert 'accepted' not in outcomes.get(f'{event}:invalid', {})
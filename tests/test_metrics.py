@@ -0,0 +1,59 @@
+import pytest
+
+from metrics import MetricsRegistry
+
+
+def test_counter_renders_per_label_set():
+    registry = MetricsRegistry()
+    rejected = registry.counter('spellcast_rejected_total', 'Rejected words', ('reason',))
+    rejected.inc(reason='invalid_word')
+    rejected.inc(2, reason='invalid_word')
+    rejected.inc(reason='not_your_turn')
+    assert rejected.value(reason='invalid_word') == 3
+    assert registry.render().splitlines() == [
+        '# HELP spellcast_rejected_total Rejected words',
+        '# TYPE spellcast_rejected_total counter',
+        'spellcast_rejected_total{reason="invalid_word"} 3',
+        'spellcast_rejected_total{reason="not_your_turn"} 1',
+    ]
+
+
+def test_counter_rejects_wrong_labels():
+    counter = MetricsRegistry().counter('x_total', 'X', ('event',))
+    with pytest.raises(ValueError):
+        counter.inc(event='join', reason='oops')
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('x_seconds', 'X', ('event',), buckets=(0.01, 0.1))
+    for value in (0.005, 0.01, 0.05, 3.0):
+        latency.observe(value, event='join')
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'x_seconds_bucket{event="join",le="0.01"} 2',
+        'x_seconds_bucket{event="join",le="0.1"} 3',
+        'x_seconds_bucket{event="join",le="+Inf"} 4',
+        'x_seconds_sum{event="join"} 3.065',
+        'x_seconds_count{event="join"} 4',
+    ]
+
+
+def test_gauge_reads_at_render_time_and_labels_are_escaped():
+    registry = MetricsRegistry()
+    rooms = []
+    registry.gauge('spellcast_rooms', 'Rooms', lambda: len(rooms))
+    odd = registry.counter('odd_total', 'Odd', ('name',))
+    odd.inc(name='a"b\\c')
+    rooms.extend('AB')
+    text = registry.render()
+    assert 'spellcast_rooms 2\n' in text
+    assert 'odd_total{name="a\\"b\\\\c"} 1' in text
+
+
+def test_metrics_endpoint(game_app):
+    client = game_app.app.test_client()
+    client.get('/')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert '# TYPE' in response.get_data(as_text=True)
@@ -0,0 +1,106 @@
+import pickle
+
+from board import Board
+from models import Player, Room, RoundState, Submission, TurnRing, TurnState, rebind_player, to_client
+
+
+def test_turn_ring_rotates_in_seating_order():
+    ring = TurnRing(['a', 'b', 'c'])
+    assert list(ring) == ['a', 'b', 'c']
+    assert [ring.next_after(p) for p in ring] == ['b', 'c', 'a']
+    ring.add('d')
+    ring.add('a')  # Already seated
+    assert list(ring) == ['a', 'b', 'c', 'd']
+    assert ring.next_after('d') == 'a'
+    assert ring.next_after('nobody') is None
+
+
+def test_removing_the_active_player_passes_the_turn_on():
+    ring = TurnRing(['a', 'b', 'c'])
+    active = 'b'
+    following = ring.next_after(active)  # Read before removing, as the turn handlers do
+    ring.remove(active)
+    assert following == 'c'
+    assert list(ring) == ['a', 'c']
+    assert ring.next_after('c') == 'a'
+    ring.remove('a')  # Removing the head moves it on
+    assert list(ring) == ['c'] and ring.next_after('c') == 'c'
+    ring.remove('c')
+    assert list(ring) == [] and len(ring) == 0
+    ring.remove('c')
+    ring.add('e')
+    assert list(ring) == ['e']
+
+
+def test_rename_keeps_the_place_in_the_order():
+    ring = TurnRing(['a', 'b', 'c'])
+    ring.rename('a', 'x')
+    ring.rename('c', 'z')
+    assert list(ring) == ['x', 'b', 'z']
+    assert ring.next_after('z') == 'x'
+    solo = TurnRing(['a'])
+    solo.rename('a', 'b')
+    assert list(solo) == ['b'] and solo.next_after('b') == 'b'
+
+
+def test_turn_ring_pickles():
+    ring = TurnRing(['a', 'b', 'c'])
+    ring.remove('a')
+    assert list(pickle.loads(pickle.dumps(ring))) == ['b', 'c']
+
+
+def test_room_player_changes_keep_turns_and_seats_in_step():
+    room = Room('ABCD', 'h')
+    for player_id, name in [('h', 'Host'), ('g', 'Guest'), ('k', 'Kid')]:
+        room.add_player(Player(player_id, name, seat=f'seat-{player_id}'))
+        room.seats[f'seat-{player_id}'] = player_id
+    room.rename_player('g', 'g2')
+    assert list(room.players) == list(room.turns) == ['h', 'g2', 'k']
+    assert room.players['g2'].id == 'g2' and room.seats['seat-g'] == 'g2'
+    assert room.remove_player('g2').name == 'Guest'
+    assert room.remove_player('g2') is None
+    assert 'seat-g' not in room.seats
+    assert room.next_player_id('h') == 'k'
+
+
+def test_rebind_player_moves_every_reference_to_the_new_id():
+    room = Room('ABCD', 'g')
+    room.add_player(Player('h', 'Host'))
+    room.add_player(Player('g', 'Guest'))
+    room.timer_state.current_player_turn = 'g'
+    room.timer_state.votes = {'g', 'h'}
+    room.round_state = RoundState(Board('A' * 25))
+    room.round_state.reset_submissions(room.players)
+    room.game_state = TurnState(Board('A' * 25), 'g')
+    room.game_state.words_played = [{'player_id': 'g', 'word': 'AAA', 'score': 3, 'turn': 1},
+                                    {'player_id': 'h', 'word': 'AAA', 'score': 3, 'turn': 2}]
+    rebind_player(room, 'g', 'g2')
+    assert list(room.players) == list(room.turns) == ['h', 'g2']
+    assert room.host == 'g2'
+    assert room.timer_state.current_player_turn == 'g2' and room.timer_state.votes == {'h', 'g2'}
+    assert set(room.round_state.submissions) == {'h', 'g2'}
+    assert room.game_state.active_player_id == 'g2'
+    assert [played['player_id'] for played in room.game_state.words_played] == ['g2', 'h']
+
+
+def test_to_client_fields():
+    room = Room('ABCD', 'h', seed=99, seats={'secret': 'h'})
+    room.add_player(Player('h', 'Host', score=3, seat='secret'))
+    room.timer_state.votes.add('h')
+    room.round_state = RoundState(Board('A' * 25))
+    client = to_client(room)
+    assert list(client) == ['room_code', 'host', 'players', 'settings', 'status', 'timer_state']
+    assert client['players'] == [{'id': 'h', 'name': 'Host', 'score': 3, 'ready': False}]
+    assert client['timer_state']['votes'] == ['h']
+    assert client['settings']['max_players'] == 4
+
+
+def test_to_client_of_nested_state():
+    submission = Submission()
+    submission.add('CAT', [[0, 0], [0, 1], [0, 2]], 5)
+    assert 'CAT' in submission
+    assert to_client({'p': submission}) == {'p': {'words': ['CAT'], 'positions': [[[0, 0], [0, 1], [0, 2]]],
+                                                  'score': 5, 'done': False}}
+    turn = TurnState(Board('A' * 25), 'h')
+    turn.words_played.append({'player_id': 'h', 'word': 'CAT', 'score': 5, 'turn': 1})
+    assert to_client(turn)['words_played'] == turn.words_played
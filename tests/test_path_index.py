@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from conftest import ALPHABET
+from board_geometry import GRID_SIZE, is_connected_path
+from path_index import BoardPathCache, board_key, find_paths, path_key
+
+BOARD = [list('CATSX'), list('XXXXX'), list('XXXXX'), list('XXXXX'), list('XXXXX')]
+
+
+def test_path_key_rejects_malformed_positions():
+    assert path_key([[0, 0], [1, 1]]) == (0, 6)
+    assert path_key([[0, 0], [5, 0]]) is None
+    assert path_key([[0]]) is None
+    assert path_key([['a', 'b']]) is None
+
+
+@pytest.mark.parametrize('diagonal', [True, False])
+def test_find_paths_returns_every_valid_path(diagonal):
+    rng = random.Random(2)
+    for _ in range(20):
+        letters = ''.join(rng.choice(ALPHABET[:3]).upper() for _ in range(GRID_SIZE * GRID_SIZE))
+        word = ''.join(rng.choice(ALPHABET[:3]).upper() for _ in range(3))
+        paths = find_paths(letters, word, diagonal)
+        for path in paths:
+            assert ''.join(letters[i] for i in path) == word
+            assert is_connected_path([divmod(i, GRID_SIZE) for i in path], diagonal)
+        # Brute force over every ordered triple of cells
+        cells = range(GRID_SIZE * GRID_SIZE)
+        expected = {(a, b, c) for a in cells for b in cells for c in cells
+                    if len({a, b, c}) == 3 and letters[a] + letters[b] + letters[c] == word
+                    and is_connected_path([divmod(i, GRID_SIZE) for i in (a, b, c)], diagonal)}
+        assert paths == expected
+
+
+def test_lookup_and_has_path():
+    cache = BoardPathCache()
+    assert cache.paths(BOARD, 'cat', diagonal=False) == {(0, 1, 2)}
+    assert cache.has_path(BOARD, 'CAT', [[0, 0], [0, 1], [0, 2]], diagonal=False)
+    assert not cache.has_path(BOARD, 'CAT', [[0, 0], [0, 1], [1, 1]], diagonal=False)
+    assert not cache.has_path(BOARD, 'CAT', [[0, 0], [0, 1], [9, 9]], diagonal=False)
+    assert not cache.has_path(BOARD, 'DOG', [[0, 0], [0, 1], [0, 2]], diagonal=False)
+    assert len(cache) == 1
+
+
+def test_forget_drops_both_adjacency_rules():
+    cache = BoardPathCache()
+    cache.paths(BOARD, 'CAT', diagonal=False)
+    cache.paths(BOARD, 'CAT', diagonal=True)
+    assert len(cache) == 2
+    cache.forget(BOARD)
+    assert len(cache) == 0
+
+
+def test_changed_board_is_a_different_key():
+    cache = BoardPathCache()
+    assert cache.paths(BOARD, 'CAT')
+    changed = [row[:] for row in BOARD]
+    changed[0][2] = 'X'
+    assert board_key(changed) != board_key(BOARD)
+    assert cache.paths(changed, 'CAT') == frozenset()
+
+
+def test_least_recently_used_board_is_evicted():
+    cache = BoardPathCache(max_boards=2)
+    boards = [[[letter] * GRID_SIZE for _ in range(GRID_SIZE)] for letter in 'ABC']
+    cache.paths(boards[0], 'AAA')
+    cache.paths(boards[1], 'BBB')
+    cache.paths(boards[0], 'AAA')  # boards[1] is now the least recently used
+    cache.paths(boards[2], 'CCC')
+    assert len(cache) == 2
+    keys = [key for key, _ in cache._boards]
+    assert keys == [board_key(boards[0]), board_key(boards[2])]
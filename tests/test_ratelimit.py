@@ -0,0 +1,119 @@
+import pytest
+
+import ratelimit
+from ratelimit import (ADMIT, ANY_EVENT, DISCONNECT, DROP, MERGE, Budget, EventRateLimiter,
+                       parse_budgets)
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.calls = []  # (delay, callback, args, key)
+        self.cancelled = []
+
+    def call_later(self, delay, callback, *args, key=None):
+        self.calls.append((delay, callback, args, key))
+
+    def cancel_key(self, key):
+        self.cancelled.append(key)
+
+    def run_all(self):
+        calls, self.calls = self.calls, []
+        for _, callback, args, _ in calls:
+            callback(*args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def limiter_for(budgets, **kwargs):
+    scheduler = FakeScheduler()
+    return EventRateLimiter(budgets, scheduler, **kwargs), scheduler
+
+
+def test_parse_budgets_overrides_defaults_and_skips_bad_entries():
+    budgets = parse_budgets('swap_tile=4/8, bogus, join_room=0/3,new_event=1.5/2', {'swap_tile': Budget(2, 5)})
+    assert budgets == {'swap_tile': Budget(4, 8), 'new_event': Budget(1.5, 2)}
+
+
+def test_burst_then_refill(clock):
+    limiter, _ = limiter_for({'swap_tile': Budget(2, 3)})
+    assert [limiter.admit('s', 'swap_tile') for _ in range(4)] == [ADMIT, ADMIT, ADMIT, DROP]
+    clock[0] += 0.5  # One token back at 2/s
+    assert limiter.admit('s', 'swap_tile') == ADMIT
+    assert limiter.admit('s', 'swap_tile') == DROP
+
+
+def test_buckets_are_per_socket_and_unlimited_events_pass(clock):
+    limiter, _ = limiter_for({'swap_tile': Budget(1, 1)})
+    assert limiter.admit('a', 'swap_tile') == ADMIT
+    assert limiter.admit('a', 'swap_tile') == DROP
+    assert limiter.admit('b', 'swap_tile') == ADMIT
+    assert all(limiter.admit('a', 'chat') == ADMIT for _ in range(100))
+
+
+def test_shared_bucket_limits_every_event(clock):
+    limiter, _ = limiter_for({ANY_EVENT: Budget(1, 2)})
+    assert [limiter.admit('s', event) for event in ('a', 'b', 'c')] == [ADMIT, ADMIT, DROP]
+
+
+def test_refused_event_spends_no_tokens(clock):
+    limiter, _ = limiter_for({ANY_EVENT: Budget(1, 2), 'swap_tile': Budget(1, 1)})
+    assert limiter.admit('s', 'swap_tile') == ADMIT
+    assert limiter.admit('s', 'swap_tile') == DROP  # Must not spend the shared token
+    assert limiter.admit('s', 'other') == ADMIT
+
+
+def test_merge_delivers_only_the_newest_payload(clock):
+    limiter, scheduler = limiter_for({'drag': Budget(10, 1)})
+    delivered = []
+    limiter.merge('drag', lambda sid, data: delivered.append((sid, data)))
+    assert limiter.admit('s', 'drag', 1) == ADMIT
+    assert limiter.admit('s', 'drag', 2) == MERGE
+    assert limiter.admit('s', 'drag', 3) == MERGE
+    assert len(scheduler.calls) == 1
+    assert scheduler.calls[0][0] == pytest.approx(0.1)
+    clock[0] += 0.1
+    scheduler.run_all()
+    assert delivered == [('s', 3)]
+
+
+def test_admitted_event_supersedes_a_pending_merge(clock):
+    limiter, scheduler = limiter_for({'drag': Budget(10, 1)})
+    delivered = []
+    limiter.merge('drag', lambda sid, data: delivered.append(data))
+    limiter.admit('s', 'drag', 1)
+    limiter.admit('s', 'drag', 2)
+    clock[0] += 0.1
+    assert limiter.admit('s', 'drag', 3) == ADMIT
+    scheduler.run_all()
+    assert delivered == []
+
+
+def test_abusive_socket_is_disconnected(clock):
+    limiter, _ = limiter_for({'swap_tile': Budget(1, 1)}, abuse_drops=5, abuse_window=10)
+    verdicts = [limiter.admit('s', 'swap_tile') for _ in range(8)]
+    assert verdicts[:6] == [ADMIT] + [DROP] * 5
+    assert verdicts[6] == DISCONNECT
+
+
+def test_old_refusals_age_out_of_the_abuse_window(clock):
+    limiter, _ = limiter_for({'swap_tile': Budget(0.01, 1)}, abuse_drops=3, abuse_window=10)
+    limiter.admit('s', 'swap_tile')
+    for _ in range(3):
+        assert limiter.admit('s', 'swap_tile') == DROP
+    clock[0] += 11
+    assert limiter.admit('s', 'swap_tile') == DROP
+
+
+def test_forget_drops_the_socket(clock):
+    limiter, scheduler = limiter_for({'swap_tile': Budget(1, 1)})
+    limiter.admit('s', 'swap_tile')
+    assert len(limiter) == 1
+    limiter.forget('s')
+    assert len(limiter) == 0
+    assert scheduler.cancelled == [('ratelimit', 's')]
+    assert limiter.admit('s', 'swap_tile') == ADMIT
@@ -0,0 +1,158 @@
+import pytest
+
+import game_store
+from game_store import MemoryGameStore
+from models import Player, Room
+from reaper import RoomReaper, deep_size
+from room_store import MemoryRoomStore
+
+T0 = 1_000_000.0
+TTLS = {'waiting': 300, 'playing': 200, 'finished': 60}
+
+
+@pytest.fixture
+def store():
+    return MemoryRoomStore()
+
+
+@pytest.fixture
+def closed():
+    return []
+
+
+def reaper_for(store, closed, **kwargs):
+    return RoomReaper(store, lambda room, reason: closed.append((room.room_code, reason)), ttls=TTLS, **kwargs)
+
+
+def add_room(store, reaper, code, status='waiting', last_activity=T0):
+    room = Room(code, 'h', status=status, last_activity=last_activity)
+    room.add_player(Player('h', 'Host'))
+    store.create(code, room)
+    reaper.track(code, room)
+    return room
+
+
+def test_idle_room_closes_at_its_status_ttl(store, closed):
+    reaper = reaper_for(store, closed)
+    add_room(store, reaper, 'WAIT')
+    add_room(store, reaper, 'PLAY', status='playing')
+    assert reaper.sweep(T0 + 199) == 0
+    assert reaper.sweep(T0 + 200) == 1
+    assert closed == [('PLAY', 'idle')]
+    assert reaper.sweep(T0 + 300) == 1
+    assert store.room_codes() == []
+    assert len(reaper) == 0
+    assert reaper.reaped == {'idle': 2}
+
+
+def test_activity_moves_the_deadline_later(store, closed):
+    reaper = reaper_for(store, closed)
+    room = add_room(store, reaper, 'WAIT')
+    room.last_activity = T0 + 100  # As room_store.update() would stamp it
+    assert reaper.sweep(T0 + 300) == 0
+    assert reaper.sweep(T0 + 400) == 1
+
+
+def test_finished_room_gets_the_shorter_ttl_once_tracked_again(store, closed):
+    reaper = reaper_for(store, closed)
+    room = add_room(store, reaper, 'GAME', status='playing')
+    room.status = 'finished'
+    reaper.track('GAME', room)  # Deadline moved earlier: T0 + 60
+    assert reaper.sweep(T0 + 59) == 0
+    assert reaper.sweep(T0 + 60) == 1
+    assert closed == [('GAME', 'idle')]
+    assert reaper.sweep(T0 + 1000) == 0  # The superseded entry is skipped, not closed twice
+
+
+def test_room_closed_elsewhere_is_forgotten(store, closed):
+    reaper = reaper_for(store, closed)
+    add_room(store, reaper, 'GONE')
+    store.delete('GONE')
+    assert reaper.sweep(T0 + 1000) == 0
+    assert closed == [] and len(reaper) == 0
+
+
+def test_orphaned_room_closes_sooner(store, closed):
+    connected = {'h'}
+    reaper = reaper_for(store, closed, is_connected=connected.__contains__, orphan_ttl=30)
+    add_room(store, reaper, 'LIVE')
+    connected.clear()
+    add_room(store, reaper, 'LOST')
+    assert reaper.sweep(T0 + 30) == 1
+    assert closed == [('LOST', 'orphaned')]
+
+
+def test_sweep_closes_nearest_deadlines_over_max_rooms(store, closed):
+    reaper = reaper_for(store, closed, max_rooms=2)
+    add_room(store, reaper, 'OLD', last_activity=T0)
+    add_room(store, reaper, 'MID', last_activity=T0 + 10)
+    add_room(store, reaper, 'NEW', last_activity=T0 + 20)
+    assert reaper.sweep(T0 + 1) == 1
+    assert closed == [('OLD', 'capacity')]
+    assert sorted(store.room_codes()) == ['MID', 'NEW']
+
+
+def test_capacity_pass_skips_games_in_progress(store, closed):
+    reaper = reaper_for(store, closed, max_rooms=2)
+    add_room(store, reaper, 'GAME', status='playing', last_activity=T0)
+    add_room(store, reaper, 'MID', last_activity=T0 + 10)
+    add_room(store, reaper, 'NEW', last_activity=T0 + 20)
+    assert reaper.sweep(T0 + 1) == 1
+    assert closed == [('MID', 'capacity')]
+    assert sorted(store.room_codes()) == ['GAME', 'NEW']
+    assert len(reaper) == 2  # Still tracked...
+    assert reaper.sweep(T0 + 200) == 1
+    assert closed[-1] == ('GAME', 'idle')  # ...and closed once idle
+
+
+def test_room_touched_after_pop_keeps_its_own_last_activity(store, closed, monkeypatch):
+    reaper = reaper_for(store, closed)
+    room = add_room(store, reaper, 'BUSY')
+    pop = reaper._pop
+
+    def pop_then_touch(now):
+        code = pop(now)
+        if code is not None:
+            room.last_activity = T0 + 250  # A player acts between the pop and the close
+        return code
+
+    monkeypatch.setattr(reaper, '_pop', pop_then_touch)
+    assert reaper.sweep(T0 + 300) == 0
+    assert room.last_activity == T0 + 250  # Not stamped by the reaper looking at it
+    assert store.revision('BUSY') == 0
+    monkeypatch.setattr(reaper, '_pop', pop)
+    assert reaper.sweep(T0 + 549) == 0
+    assert reaper.sweep(T0 + 550) == 1
+
+
+def test_admit_makes_space_from_overdue_rooms_only(store, closed):
+    reaper = reaper_for(store, closed, max_rooms=2)
+    add_room(store, reaper, 'OLD', last_activity=T0)
+    add_room(store, reaper, 'NEW', last_activity=T0 + 250)
+    assert reaper.admit(T0 + 100) is False  # Full, nothing overdue
+    assert closed == []
+    assert reaper.admit(T0 + 300) is True
+    assert closed == [('OLD', 'idle')]
+    assert reaper.admit(T0 + 300) is True  # Under the cap now
+
+
+def test_sweep_expires_single_player_games(store, closed, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(game_store.time, 'monotonic', lambda: now[0])
+    games = MemoryGameStore(ttl_seconds=60)
+    games.put('a', ('record',))
+    reaper = reaper_for(store, closed, game_store=games)
+    reaper.sweep(T0)
+    assert len(games) == 1
+    now[0] += 61
+    reaper.sweep(T0)
+    assert len(games) == 0
+    assert reaper.reaped == {'single_player': 1}
+    assert reaper.reclaimed_bytes > 0
+
+
+def test_deep_size_counts_nested_and_slotted_objects():
+    room = Room('ABCD', 'h')
+    empty = deep_size(room)
+    room.add_player(Player('h', 'x' * 1000))
+    assert deep_size(room) > empty + 1000
@@ -0,0 +1,174 @@
+import pickle
+import threading
+
+import pytest
+
+from models import Player, Room
+from room_store import MemoryRoomStore, RedisRoomStore
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request):
+    if request.param == 'memory':
+        return MemoryRoomStore()
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisRoomStore(fakeredis.FakeRedis(), prefix='test:')
+
+
+def new_room(code):
+    room = Room(code, 'h')
+    room.add_player(Player('h', 'Host'))
+    return room
+
+
+def test_create_get_delete(store):
+    assert store.create('ABCD', new_room('ABCD'))
+    assert not store.create('ABCD', new_room('ABCD'))
+    assert store.exists('ABCD')
+    assert store.get('ABCD').host == 'h'
+    assert len(store) == 1
+    assert store.room_codes() == ['ABCD']
+    store.delete('ABCD')
+    store.delete('ABCD')
+    assert store.get('ABCD') is None
+    assert len(store) == 0
+
+
+def test_update_writes_back(store):
+    store.create('ABCD', new_room('ABCD'))
+    with store.update('ABCD') as room:
+        room.status = 'playing'
+        room.add_player(Player('g', 'Guest'))
+    room = store.get('ABCD')
+    assert room.status == 'playing'
+    assert list(room.players) == ['h', 'g']
+
+
+def test_update_stamps_last_activity(store):
+    store.create('ABCD', new_room('ABCD'))
+    assert store.get('ABCD').last_activity == 0
+    with store.update('ABCD') as room:
+        room.status = 'playing'
+    assert store.get('ABCD').last_activity > 0
+
+
+def test_update_marks_cached_json_stale(store):
+    store.create('ABCD', new_room('ABCD'))
+    before = store.get('ABCD').client_json()
+    with store.update('ABCD') as room:
+        room.players['h'].score = 7
+    assert store.get('ABCD').client_json() != before
+    assert b'"score":7' in store.get('ABCD').client_json()
+
+
+def test_update_of_missing_room_yields_none(store):
+    with store.update('NONE') as room:
+        assert room is None
+
+
+def test_delete_inside_update(store):
+    store.create('ABCD', new_room('ABCD'))
+    with store.update('ABCD') as room:
+        room.status = 'finished'
+        store.delete('ABCD')
+    assert store.get('ABCD') is None
+    assert len(store) == 0
+
+
+def test_concurrent_updates_are_serialised(store):
+    store.create('ABCD', new_room('ABCD'))
+
+    def bump():
+        for _ in range(50):
+            with store.update('ABCD') as room:
+                room.players['h'].score += 1
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.get('ABCD').players['h'].score == 200
+
+
+def test_redis_store_is_shared_across_workers():
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    first = RedisRoomStore(fakeredis.FakeRedis(server=server))
+    second = RedisRoomStore(fakeredis.FakeRedis(server=server))
+    first.create('AAAA', new_room('AAAA'))
+    with second.update('AAAA') as room:
+        room.status = 'playing'
+    assert first.get('AAAA').status == 'playing'
+    assert len(first) == len(second) == 1
+
+
+def test_memory_store_revisions_and_dump():
+    store = MemoryRoomStore()
+    store.create('ABCD', new_room('ABCD'))
+    assert store.revision('ABCD') == 0
+    with store.update('ABCD') as room:
+        room.status = 'playing'
+    revision, raw = store.dump('ABCD')
+    assert revision == store.revision('ABCD') == 1
+    assert pickle.loads(raw).status == 'playing'
+    store.delete('ABCD')
+    assert store.revision('ABCD') is None and store.dump('ABCD') is None
+
+
+def test_memory_store_locks_rooms_individually():
+    store = MemoryRoomStore()
+    store.create('AAAA', new_room('AAAA'))
+    store.create('BBBB', new_room('BBBB'))
+    inside, release, other_done = threading.Event(), threading.Event(), threading.Event()
+
+    def hold_a():
+        with store.update('AAAA'):
+            inside.set()
+            release.wait(5)
+
+    def touch_b():
+        with store.update('BBBB') as room:
+            room.status = 'playing'
+        other_done.set()
+
+    holder = threading.Thread(target=hold_a)
+    holder.start()
+    inside.wait(5)
+    threading.Thread(target=touch_b).start()
+    assert other_done.wait(5)  # Not blocked by the update holding AAAA
+    release.set()
+    holder.join()
+
+
+def test_memory_store_update_waiting_on_a_deleted_room_sees_it_gone():
+    store = MemoryRoomStore()
+    store.create('AAAA', new_room('AAAA'))
+    inside, seen = threading.Event(), []
+
+    def waiter():
+        inside.wait(5)
+        with store.update('AAAA') as room:
+            seen.append(room)
+
+    thread = threading.Thread(target=waiter)
+    with store.update('AAAA'):
+        thread.start()
+        inside.set()
+        store.delete('AAAA')
+    thread.join()
+    assert seen == [None]
+
+
+def test_redis_store_counts_rooms_across_workers():
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    first = RedisRoomStore(fakeredis.FakeRedis(server=server))
+    first.create('AAAA', new_room('AAAA'))
+    second = RedisRoomStore(fakeredis.FakeRedis(server=server))  # Joins after a room exists
+    second.create('BBBB', new_room('BBBB'))
+    assert not second.create('BBBB', new_room('BBBB'))
+    assert len(first) == len(second) == 2
+    first.delete('BBBB')
+    first.delete('BBBB')
+    assert len(second) == 1
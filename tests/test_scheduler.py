@@ -0,0 +1,66 @@
+import threading
+import time
+
+from scheduler import TimerScheduler
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def test_callbacks_fire_in_deadline_order():
+    scheduler = TimerScheduler()
+    fired = []
+    scheduler.call_later(0.06, fired.append, 'c')
+    scheduler.call_later(0.02, fired.append, 'a')
+    scheduler.call_later(0.04, fired.append, 'b')
+    wait_for(lambda: len(fired) == 3)
+    assert fired == ['a', 'b', 'c']
+    assert scheduler.pending() == 0
+
+
+def test_earlier_timer_wakes_a_sleeping_worker():
+    scheduler = TimerScheduler()
+    fired = threading.Event()
+    scheduler.call_later(60, lambda: None)
+    t = time.monotonic()
+    scheduler.call_later(0.01, fired.set)
+    assert fired.wait(1.0)
+    assert time.monotonic() - t < 0.5
+
+
+def test_cancel_and_cancel_key():
+    scheduler = TimerScheduler()
+    fired = []
+    handle = scheduler.call_later(0.02, fired.append, 'cancelled')
+    scheduler.call_later(0.02, fired.append, 'room', key='ROOM')
+    scheduler.call_later(0.02, fired.append, 'room', key='ROOM')
+    scheduler.call_later(0.03, fired.append, 'other', key='OTHER')
+    scheduler.cancel(handle)
+    assert scheduler.pending('ROOM') == 2
+    assert scheduler.cancel_key('ROOM') == 2
+    assert scheduler.pending() == 1
+    wait_for(lambda: fired)
+    time.sleep(0.05)
+    assert fired == ['other']
+    assert scheduler.pending('OTHER') == 0
+
+
+def test_many_cancellations_keep_heap_proportional():
+    scheduler = TimerScheduler()
+    handles = [scheduler.call_later(60, lambda: None) for _ in range(1000)]
+    for handle in handles[:-10]:
+        scheduler.cancel(handle)
+    assert scheduler.pending() == 10
+    assert len(scheduler._heap) < 200
+
+
+def test_failing_callback_does_not_stop_the_worker():
+    scheduler = TimerScheduler()
+    fired = threading.Event()
+    scheduler.call_later(0.01, lambda: 1 / 0)
+    scheduler.call_later(0.02, fired.set)
+    assert fired.wait(1.0)
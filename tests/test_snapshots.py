@@ -0,0 +1,96 @@
+
+from models import Player, Room, to_client
+from room_store import MemoryRoomStore
+from snapshots import RoomSnapshotter, read_snapshot, write_snapshot
+
+
+def new_room(code, **fields):
+    room = Room(code, 'h', **fields)
+    room.add_player(Player('h', 'Host', seat=f'{code}-seat'))
+    room.seats[f'{code}-seat'] = 'h'
+    return room
+
+
+def test_round_trip_keeps_every_room(tmp_path):
+    path = str(tmp_path / 'rooms.snapshot')
+    store = MemoryRoomStore()
+    store.create('AAAA', new_room('AAAA'))
+    store.create('BBBB', new_room('BBBB', status='playing'))
+    assert RoomSnapshotter(store, path).snapshot() == 2
+
+    restored_store = MemoryRoomStore()
+    taken_at, codes = RoomSnapshotter(restored_store, path).restore()
+    assert taken_at is not None
+    assert sorted(codes) == ['AAAA', 'BBBB']
+    for code in codes:
+        room, original = restored_store.get(code), store.get(code)
+        assert to_client(room) == to_client(original)
+        assert (room.seats, list(room.turns)) == (original.seats, list(original.turns))
+    assert restored_store.get('AAAA').seats == {'AAAA-seat': 'h'}
+
+
+def test_only_changed_rooms_are_pickled_again(tmp_path):
+    store = MemoryRoomStore()
+    for code in ('AAAA', 'BBBB', 'CCCC'):
+        store.create(code, new_room(code))
+    snapshotter = RoomSnapshotter(store, str(tmp_path / 'rooms.snapshot'))
+    snapshotter.snapshot()
+    assert snapshotter.rooms_pickled == 3
+    snapshotter.snapshot()
+    assert snapshotter.rooms_pickled == 0
+    with store.update('BBBB') as room:
+        room.status = 'playing'
+    assert store.revision('BBBB') == 1
+    store.delete('CCCC')
+    assert snapshotter.snapshot() == 2
+    assert snapshotter.rooms_pickled == 1
+    _, rooms = read_snapshot(snapshotter.path)
+    assert {room.room_code: room.status for room in rooms} == {'AAAA': 'waiting', 'BBBB': 'playing'}
+
+
+def test_missing_or_damaged_files(tmp_path):
+    path = str(tmp_path / 'rooms.snapshot')
+    assert read_snapshot(path) == (None, [])
+    (tmp_path / 'rooms.snapshot').write_bytes(b'not a snapshot')
+    assert read_snapshot(path) == (None, [])
+    write_snapshot(path, [b'\x80\x04K\x01.', b'garbage'], 12.5)  # pickle of 1, then junk
+    assert read_snapshot(path) == (12.5, [1])
+
+
+def received(client, name):
+    return [packet['args'][0] for packet in client.get_received() if packet['name'] == name]
+
+
+def test_rejoin_room_after_a_restore(game_app, tmp_path, monkeypatch):
+    host = game_app.socketio.test_client(game_app.app)
+    guest = game_app.socketio.test_client(game_app.app)
+    host.emit('create_room', {'player_name': 'Host'})
+    (created,) = received(host, 'room_created')
+    room_code = created['room_code']
+    guest.emit('join_room', {'room_code': room_code, 'player_name': 'Guest'})
+    (joined,) = received(guest, 'room_joined')
+
+    # "Restart": snapshot the live store, then serve from a fresh store loaded from the file
+    path = str(tmp_path / 'rooms.snapshot')
+    RoomSnapshotter(game_app.room_store, path).snapshot()
+    restored = MemoryRoomStore()
+    _, codes = RoomSnapshotter(restored, path).restore()
+    assert room_code in codes
+    monkeypatch.setattr(game_app, 'room_store', restored)
+    old_host_id = restored.get(room_code).host
+
+    new_host = game_app.socketio.test_client(game_app.app)
+    new_host.emit('rejoin_room', {'room_code': room_code, 'seat_token': created['seat_token']})
+    (rejoined,) = received(new_host, 'room_rejoined')
+    assert rejoined['is_host']
+    room = restored.get(room_code)
+    assert room.host != old_host_id
+    assert room.seats[created['seat_token']] == room.host
+    assert room.seats[joined['seat_token']] != room.host
+    assert [player.name for player in room.players.values()] == ['Host', 'Guest']
+    assert list(room.turns) == list(room.players)
+
+    new_host.emit('rejoin_room', {'room_code': room_code, 'seat_token': 'not-a-seat'})
+    assert received(new_host, 'rejoin_failed') == [{'room_code': room_code}]
+    for client in (host, guest, new_host):
+        client.disconnect()
@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+from conftest import ALPHABET
+from board_geometry import GRID_SIZE
+from dictionary import PackedDictionary, compile_dictionary
+from solver import IncrementalSolver, SolverCache, best_word, solve_board
+
+CELLS = GRID_SIZE * GRID_SIZE
+
+
+def random_board(rng):
+    return [[rng.choice(ALPHABET) for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+
+
+def neighbours_of(index, diagonal):
+    row, col = divmod(index, GRID_SIZE)
+    return [r * GRID_SIZE + c for r in range(row - 1, row + 2) for c in range(col - 1, col + 2)
+            if 0 <= r < GRID_SIZE and 0 <= c < GRID_SIZE and (r, c) != (row, col)
+            and (diagonal or r == row or c == col)]
+
+
+def traceable_words(board, word_list, diagonal):
+    """Every listed word that can be traced on board, found the slow way"""
+    letters = [board[i // GRID_SIZE][i % GRID_SIZE] for i in range(CELLS)]
+
+    def trace(word, index, used):
+        if letters[index] != word[0]:
+            return False
+        if len(word) == 1:
+            return True
+        used = used | {index}
+        return any(trace(word[1:], nxt, used) for nxt in neighbours_of(index, diagonal) if nxt not in used)
+
+    return {word for word in word_list if any(trace(word, start, frozenset()) for start in range(CELLS))}
+
+
+def assert_valid_path(board, word, path, diagonal):
+    assert ''.join(board[row][col] for row, col in path) == word
+    assert len({tuple(cell) for cell in path}) == len(path)
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        step = (abs(r1 - r2), abs(c1 - c2))
+        assert step in ({(0, 1), (1, 0), (1, 1)} if diagonal else {(0, 1), (1, 0)})
+
+
+@pytest.mark.parametrize('diagonal', [True, False])
+def test_solve_board_finds_every_word(dictionary, word_list, diagonal):
+    rng = random.Random(3)
+    for _ in range(5):
+        board = random_board(rng)
+        solutions = solve_board(board, dictionary, diagonal=diagonal)
+        assert set(solutions) == traceable_words(board, word_list, diagonal)
+        for word, (path, score) in solutions.items():
+            assert_valid_path(board, word, path, diagonal)
+
+
+def test_solve_board_keeps_best_scoring_path(dictionary):
+    board = random_board(random.Random(4))
+    solutions = solve_board(board, dictionary, score_fn=lambda path, word: -path[0][0] * GRID_SIZE - path[0][1])
+    for word, (path, score) in solutions.items():
+        assert score == -path[0][0] * GRID_SIZE - path[0][1]
+        assert_valid_path(board, word, path, True)
+
+
+def test_best_word_skips_excluded_and_breaks_ties_alphabetically():
+    solutions = {'tea': ([[0, 0]], 5), 'ate': ([[0, 1]], 5), 'eat': ([[0, 2]], 3)}
+    assert best_word(solutions)[0] == 'ate'
+    assert best_word(solutions, exclude={'ate'})[0] == 'tea'
+    assert best_word({}) is None
+
+
+@pytest.mark.parametrize('diagonal', [True, False])
+def test_incremental_solver_matches_full_solve(dictionary, diagonal):
+    rng = random.Random(5)
+    board = random_board(rng)
+    solver = IncrementalSolver(dictionary, board, diagonal=diagonal)
+    for _ in range(80):
+        # Mostly single swaps, sometimes a shuffle past FULL_SOLVE_FRACTION
+        for cell in rng.sample(range(CELLS), rng.choice([1, 1, 1, 2, 3, 5, 12])):
+            board[cell // GRID_SIZE][cell % GRID_SIZE] = rng.choice(ALPHABET)
+        solver.update(board)
+        assert set(solver.paths) == set(solve_board(board, dictionary, diagonal=diagonal))
+        for word, (path, _) in solver.solutions().items():
+            assert_valid_path(board, word, path, diagonal)
+
+
+def test_incremental_solver_update_reports_changed_cells(dictionary):
+    board = random_board(random.Random(6))
+    solver = IncrementalSolver(dictionary, board)
+    assert solver.update(board) == []
+    board[1][2] = 'z'
+    assert solver.update(board) == [1 * GRID_SIZE + 2]
+    assert not any('z' in word for word in solver.paths)
+
+
+def test_incremental_solver_keeps_a_word_whose_path_moved_elsewhere(tmp_path):
+    compile_dictionary(['ten'], str(tmp_path / 'ten.dawg'))
+    board = [['t', 'e', 'n', 'a', 'a']] + [['a'] * GRID_SIZE for _ in range(3)] + [['t', 'e', 'n', 'a', 'a']]
+    solver = IncrementalSolver(PackedDictionary(str(tmp_path / 'ten.dawg')), board)
+    assert solver.paths == {'ten': (0, 1, 2)}  # One path kept per word
+    board[0][0] = 'a'
+    solver.update(board)
+    assert solver.paths == {'ten': (20, 21, 22)}  # Not through the changed cell, so looked up on its own
+    board[4][0] = 'a'
+    solver.update(board)
+    assert solver.paths == {}
+
+
+def test_solver_cache_updates_and_evicts(dictionary):
+    rng = random.Random(7)
+    cache = SolverCache(dictionary, max_solvers=2)
+    board = random_board(rng)
+    first = cache.solver('a', board)
+    board[0][0] = 'z' if board[0][0] != 'z' else 'a'
+    assert cache.solver('a', board) is first
+    assert set(first.paths) == set(solve_board(board, dictionary))
+    cache.solver('b', random_board(rng))
+    cache.solver('c', random_board(rng))
+    assert len(cache) == 2
+    assert cache.solver('a', board) is not first